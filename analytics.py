@@ -0,0 +1,152 @@
+"""
+FINANZAS PRO - Category Analytics
+Per-category, per-period expense aggregates
+
+Single-period breakdowns come from one cached columnar slice per (user,
+range): the rows are fetched once, kept as a pandas DataFrame with
+categorical columns, and every breakdown is a groupby over that frame.
+Multi-month series read the trigger-maintained category_spend totals
+instead, so their cost does not grow with the number of transactions. Cache
+keys include the user's data version, so any save or delete invalidates them,
+and the cache epoch (database.get_cache_epoch), so writes from other
+processes show up within the read coalescer's TTL.
+"""
+
+from datetime import date
+from typing import Optional
+
+import pandas as pd
+import streamlit as st
+
+from database import get_cache_epoch, get_category_spend, get_data_version, get_transactions_in_range
+
+EXPENSE_TYPES = ["Fixed", "Debit", "Card"]
+
+# ============================================
+# COLUMNAR SLICE (Cached)
+# ============================================
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _load_expense_frame(
+    user_id: str,
+    start: date,
+    end: date,
+    data_version: int,
+    epoch: int
+) -> pd.DataFrame:
+    """
+    Load expenses with payment_date in [start, end) as a compact DataFrame.
+    data_version and epoch are only part of the cache key.
+    """
+    rows = get_transactions_in_range(
+        user_id,
+        start.strftime("%Y-%m-%d"),
+        end.strftime("%Y-%m-%d"),
+        columns="payment_date, type, category, amount"
+    )
+
+    frame = pd.DataFrame({
+        "payment_date": [row.payment_date for row in rows],
+        "type": [row.type for row in rows],
+        "category": [row.category for row in rows],
+        "amount": [row.amount for row in rows],
+    })
+    frame = frame[frame["type"].isin(EXPENSE_TYPES)]
+
+    return pd.DataFrame({
+        "month": pd.to_datetime(frame["payment_date"]).dt.strftime("%Y-%m").astype("category"),
+        "type": frame["type"].astype("category"),
+        "category": _category_labels(frame["category"]),
+        "amount": frame["amount"].astype("float64"),
+    })
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _load_spend_frame(
+    user_id: str,
+    start: date,
+    end: date,
+    data_version: int,
+    epoch: int
+) -> pd.DataFrame:
+    """
+    Load monthly spend per category for months in [start, end) from category_spend.
+    data_version and epoch are only part of the cache key.
+    """
+    records = get_category_spend(user_id, start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"))
+
+    frame = pd.DataFrame({
+        "month": [f"{record['year']}-{record['month']:02d}" for record in records],
+        "category": [record["category"] for record in records],
+        "amount": [record["amount"] for record in records],
+    })
+
+    return pd.DataFrame({
+        "month": frame["month"].astype("category"),
+        "category": _category_labels(frame["category"]),
+        "amount": frame["amount"].astype("float64"),
+    })
+
+
+def _category_labels(categories: pd.Series) -> pd.Series:
+    """Blank categories grouped as "Sin categoría", as a categorical column"""
+    return categories.fillna("").astype(str).str.strip().replace("", "Sin categoría").astype("category")
+
+
+def get_expense_frame(user_id: str, start: date, end: date) -> pd.DataFrame:
+    """Get the cached expense slice for [start, end)"""
+    return _load_expense_frame(user_id, start, end, get_data_version(user_id), get_cache_epoch())
+
+# ============================================
+# AGGREGATES
+# ============================================
+
+def get_category_totals(user_id: str, start: date, end: date) -> pd.DataFrame:
+    """
+    Get total spend per category for [start, end), largest first.
+    Returns: DataFrame with columns category, amount, share (0-1 of total spend)
+    """
+    frame = get_expense_frame(user_id, start, end)
+
+    totals = frame.groupby("category", observed=True)["amount"].sum().sort_values(ascending=False)
+    grand_total = totals.sum()
+
+    result = totals.reset_index()
+    result["share"] = result["amount"] / grand_total if grand_total else 0.0
+    return result
+
+
+def get_top_categories(user_id: str, start: date, end: date, limit: int = 5) -> pd.DataFrame:
+    """Get the `limit` categories with the highest spend in [start, end)"""
+    return get_category_totals(user_id, start, end).head(limit)
+
+
+def get_category_month_totals(
+    user_id: str,
+    start: date,
+    end: date,
+    top: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Get a category x month matrix of spend for the months in [start, end).
+    If `top` is given, categories outside the top N are folded into "Otras".
+    Returns: DataFrame indexed by month ("YYYY-MM"), one column per category
+    """
+    frame = _load_spend_frame(user_id, start, end, get_data_version(user_id), get_cache_epoch())
+
+    if top is not None:
+        totals = frame.groupby("category", observed=True)["amount"].sum()
+        top_categories = totals.sort_values(ascending=False).head(top).index
+        keep = frame["category"].isin(top_categories)
+        frame = frame.assign(
+            category=frame["category"].astype(str).where(keep, "Otras")
+        )
+
+    return frame.pivot_table(
+        index="month",
+        columns="category",
+        values="amount",
+        aggfunc="sum",
+        fill_value=0.0,
+        observed=True
+    )
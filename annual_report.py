@@ -0,0 +1,236 @@
+"""
+FINANZAS PRO - Annual Report
+Yearly totals, categories, merchants, card/cash split and installment load
+
+Everything comes from one range fetch of the year's transactions (by
+payment_date) folded in a single pass; month-over-month deltas and rankings
+are derived from the accumulated totals afterwards. Reports are cached per
+(user, year) data version, so they are rebuilt only after a write touches
+that year, and per cache epoch (database.get_cache_epoch), so writes from
+other processes show up within the read coalescer's TTL.
+"""
+
+import csv
+import io
+import re
+from typing import Dict, Iterable, List, Optional
+
+import streamlit as st
+
+from database import MONTH_NAMES, get_cache_epoch, get_data_version, get_transactions_in_range
+from models import Transaction
+
+TYPES = ["Income", "Fixed", "Debit", "Card"]
+CASH_TYPES = ["Fixed", "Debit"]
+
+TOP_MERCHANTS = 10
+
+TOTAL_LABELS = {
+    "income": "Ingresos",
+    "fixed": "Gastos Fijos",
+    "debit": "Débito",
+    "card": "Tarjetas",
+    "expenses": "Gastos Totales",
+    "net_balance": "Balance Neto"
+}
+
+REPORT_COLUMNS = (
+    "date, payment_date, amount, category, description, type, "
+    "card_id, installments_total, installment_number"
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+# ============================================
+# SINGLE-PASS AGGREGATION
+# ============================================
+
+def _merchant(description: str) -> Optional[str]:
+    """Normalized merchant key from a free-text description (None if empty)"""
+    merchant = _WHITESPACE.sub(" ", description or "").strip()
+    return merchant.casefold() if merchant else None
+
+
+def build_annual_report(year: int, rows: Iterable[Transaction]) -> Dict:
+    """
+    Fold a year of transactions (payment_date in the year) into a report.
+
+    Returns: Dict with keys:
+        - 'year', 'tx_count'
+        - 'totals': income, fixed, debit, card, expenses, net_balance
+        - 'months': 12 dicts (month, label, income, expenses, net_balance and
+          their deltas against the previous month; None for January)
+        - 'categories': [{type, category, amount, count}] largest first
+        - 'merchants': top TOP_MERCHANTS [{merchant, amount, count}] by expense
+        - 'split': card, cash (Fixed + Debit), card_share (0-1 of expenses)
+        - 'installments': amount, share of card spend, rows, plans, open_plans
+    """
+    monthly = [{trans_type: 0.0 for trans_type in TYPES} for _ in range(12)]
+    categories: Dict[tuple, List] = {}
+    merchants: Dict[str, List] = {}
+    plans: Dict[tuple, int] = {}
+    installment_amount = 0.0
+    installment_rows = 0
+    tx_count = 0
+
+    for row in rows:
+        tx_count += 1
+        amount = row.amount
+        monthly[row.payment_date.month - 1][row.type] += amount
+
+        category = categories.setdefault((row.type, row.category or "Sin categoría"), [0.0, 0])
+        category[0] += amount
+        category[1] += 1
+
+        if row.type == "Income":
+            continue
+
+        key = _merchant(row.description)
+        if key:
+            merchant = merchants.setdefault(key, [row.description.strip(), 0.0, 0])
+            merchant[1] += amount
+            merchant[2] += 1
+
+        if row.installments_total > 1:
+            installment_amount += amount
+            installment_rows += 1
+            # One plan per purchase; remember the last installment seen this year
+            plan = (row.card_id, row.date, row.installments_total, row.category, row.description)
+            plans[plan] = max(plans.get(plan, 0), row.installment_number)
+
+    # ----- Derived figures (12 months, small dicts) -----
+
+    totals = {trans_type.lower(): sum(month[trans_type] for month in monthly) for trans_type in TYPES}
+    totals["expenses"] = totals["fixed"] + totals["debit"] + totals["card"]
+    totals["net_balance"] = totals["income"] - totals["expenses"]
+
+    months = []
+    previous = None
+    for index, month in enumerate(monthly):
+        expenses = month["Fixed"] + month["Debit"] + month["Card"]
+        entry = {
+            "month": index + 1,
+            "label": MONTH_NAMES[index + 1],
+            "income": month["Income"],
+            "fixed": month["Fixed"],
+            "debit": month["Debit"],
+            "card": month["Card"],
+            "expenses": expenses,
+            "net_balance": month["Income"] - expenses,
+        }
+        for key in ("income", "expenses", "net_balance"):
+            entry[f"delta_{key}"] = entry[key] - previous[key] if previous else None
+        months.append(entry)
+        previous = entry
+
+    cash = sum(totals[trans_type.lower()] for trans_type in CASH_TYPES)
+
+    return {
+        "year": year,
+        "tx_count": tx_count,
+        "totals": totals,
+        "months": months,
+        "categories": [
+            {"type": trans_type, "category": category, "amount": amount, "count": count}
+            for (trans_type, category), (amount, count)
+            in sorted(categories.items(), key=lambda item: item[1][0], reverse=True)
+        ],
+        "merchants": [
+            {"merchant": display, "amount": amount, "count": count}
+            for display, amount, count
+            in sorted(merchants.values(), key=lambda item: item[1], reverse=True)[:TOP_MERCHANTS]
+        ],
+        "split": {
+            "card": totals["card"],
+            "cash": cash,
+            "card_share": totals["card"] / totals["expenses"] if totals["expenses"] else 0.0,
+        },
+        "installments": {
+            "amount": installment_amount,
+            "card_share": installment_amount / totals["card"] if totals["card"] else 0.0,
+            "rows": installment_rows,
+            "plans": len(plans),
+            # Plans whose last installment falls after this year
+            "open_plans": sum(1 for plan, last in plans.items() if last < plan[2]),
+        },
+    }
+
+# ============================================
+# CACHED REPORT
+# ============================================
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _load_annual_report(user_id: str, year: int, data_version: int, epoch: int) -> Dict:
+    """
+    Fetch the year once and build its report.
+    data_version and epoch are only part of the cache key.
+    """
+    rows = get_transactions_in_range(user_id, f"{year}-01-01", f"{year + 1}-01-01", columns=REPORT_COLUMNS)
+    return build_annual_report(year, rows)
+
+
+def get_annual_report(user_id: str, year: int) -> Dict:
+    """
+    Get the (cached) annual report. Any write touching the year rebuilds it,
+    and a cached report is at most coalesce_ttl seconds old.
+    """
+    return _load_annual_report(user_id, year, get_data_version(user_id, year), get_cache_epoch())
+
+# ============================================
+# EXPORT
+# ============================================
+
+def report_to_csv(report: Dict) -> str:
+    """Render a report as a sectioned CSV (one block per section, blank line between)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(["Reporte anual", report["year"]])
+    writer.writerow([])
+
+    writer.writerow(["Totales"])
+    writer.writerow(["Concepto", "Monto"])
+    for key, value in report["totals"].items():
+        writer.writerow([TOTAL_LABELS[key], f"{value:.2f}"])
+    writer.writerow([])
+
+    writer.writerow(["Meses"])
+    writer.writerow([
+        "Mes", "Ingresos", "Fijos", "Débito", "Tarjetas", "Gastos", "Balance",
+        "Δ Ingresos", "Δ Gastos", "Δ Balance"
+    ])
+    for month in report["months"]:
+        writer.writerow([
+            month["label"], *(f"{month[key]:.2f}" for key in ("income", "fixed", "debit", "card", "expenses", "net_balance")),
+            *("" if month[key] is None else f"{month[key]:.2f}"
+              for key in ("delta_income", "delta_expenses", "delta_net_balance"))
+        ])
+    writer.writerow([])
+
+    writer.writerow(["Categorías"])
+    writer.writerow(["Tipo", "Categoría", "Monto", "Movimientos"])
+    for category in report["categories"]:
+        writer.writerow([category["type"], category["category"], f"{category['amount']:.2f}", category["count"]])
+    writer.writerow([])
+
+    writer.writerow(["Comercios principales"])
+    writer.writerow(["Comercio", "Monto", "Movimientos"])
+    for merchant in report["merchants"]:
+        writer.writerow([merchant["merchant"], f"{merchant['amount']:.2f}", merchant["count"]])
+    writer.writerow([])
+
+    split, installments = report["split"], report["installments"]
+    writer.writerow(["Tarjeta vs efectivo"])
+    writer.writerow(["Tarjetas", f"{split['card']:.2f}"])
+    writer.writerow(["Efectivo/Débito/Fijos", f"{split['cash']:.2f}"])
+    writer.writerow(["% Tarjeta", f"{split['card_share'] * 100:.1f}"])
+    writer.writerow([])
+
+    writer.writerow(["Cuotas"])
+    writer.writerow(["Monto en cuotas", f"{installments['amount']:.2f}"])
+    writer.writerow(["% del gasto con tarjeta", f"{installments['card_share'] * 100:.1f}"])
+    writer.writerow(["Cuotas pagadas", installments["rows"]])
+    writer.writerow(["Compras en cuotas", installments["plans"]])
+    writer.writerow(["Compras con cuotas el año siguiente", installments["open_plans"]])
+
+    return buffer.getvalue()
@@ -4,8 +4,10 @@ Streamlit Navigation Structure
 MULTI-USER SAAS VERSION with Supabase Authentication
 """
 
+import importlib
 import streamlit as st
-from database import get_supabase_client, create_default_cards, claim_orphaned_data
+
+from views import ui
 
 # ============================================
 # PAGE CONFIGURATION
@@ -18,6 +20,23 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# ============================================
+# LAZY PAGE LOADING
+# ============================================
+
+def lazy_page(module_name: str):
+    """
+    Build a page callable that imports views.<module_name> on first navigation.
+    Only the page being rendered is imported, and Python's module cache makes
+    every later rerun of that page free.
+    """
+    def page():
+        module = importlib.import_module(f"views.{module_name}")
+        module.main()
+    
+    page.__name__ = module_name
+    return page
+
 # ============================================
 # AUTHENTICATION CHECK
 # ============================================
@@ -36,6 +55,10 @@ if st.session_state['user'] is None:
     
 else:
     # User is authenticated - show main app
+    # Data layer configuration and session binding (see views/ui.py)
+    ui.setup()
+    from database import create_default_cards, claim_orphaned_data, get_sync_status
+    
     user_id = st.session_state['user_id']
     user_email = st.session_state['user'].email
     
@@ -48,11 +71,18 @@ else:
         st.markdown(f"### 👤 {user_email}")
         st.caption(f"ID: {user_id[:8]}...")
         
+        # Pending sync status (only when the local write queue is enabled)
+        sync_status = ui.call(get_sync_status, user_id)
+        if sync_status and sync_status[0] > 0:
+            pending, failing, last_error = sync_status
+            st.info(f"⏳ {pending} movimiento(s) pendiente(s) de sincronizar")
+            if failing:
+                st.warning(f"⚠️ Reintentando sincronización: {last_error}")
+        
         # Logout button
         if st.button("🚪 Cerrar Sesión", use_container_width=True):
             try:
-                supabase = get_supabase_client()
-                supabase.auth.sign_out()
+                ui.sign_out(user_id)
             except:
                 pass  # Ignore errors on logout
             
@@ -66,41 +96,50 @@ else:
         # Try to create default cards or claim orphaned data
         if 'setup_complete' not in st.session_state:
             # Try to create default cards
-            created = create_default_cards(user_id)
+            created = ui.call(create_default_cards, user_id, default=False)
             
             if created:
                 st.success("🎉 Tarjetas iniciales creadas!")
             
             # Try to claim orphaned data (for migration from single-user)
-            trans_claimed, cards_claimed = claim_orphaned_data(user_id)
+            trans_claimed, cards_claimed = ui.call(claim_orphaned_data, user_id, default=(0, 0))
             
             if trans_claimed > 0 or cards_claimed > 0:
                 st.success(f"📦 Datos migrados: {trans_claimed} transacciones, {cards_claimed} tarjetas")
             
+            # Register recurring incomes/expenses due up to the end of this month
+            from recurring import materialize_user
+            
+            materialized = ui.call(materialize_user, user_id, default=0)
+            
+            if materialized > 0:
+                st.success(f"🔁 {materialized} movimiento(s) recurrente(s) registrados")
+            
             st.session_state['setup_complete'] = True
     
     # ============================================
     # NAVIGATION PAGES
     # ============================================
     
-    from views import dashboard, cards, incomes, fixed, investments, settings, transactions, configuration
-    
-    # Create navigation
+    # Create navigation (view modules are imported lazily, see lazy_page)
     pg = st.navigation(
         {
             "Principal": [
-                st.Page(dashboard.main, title="📊 Dashboard", url_path="dashboard", default=True)
+                st.Page(lazy_page("dashboard"), title="📊 Dashboard", url_path="dashboard", default=True),
+                st.Page(lazy_page("annual"), title="📅 Reporte Anual", url_path="annual")
             ],
             "Transacciones": [
-                st.Page(cards.main, title="💳 Tarjetas", url_path="cards"),
-                st.Page(incomes.main, title="💵 Ingresos", url_path="incomes"),
-                st.Page(fixed.main, title="📌 Gastos Fijos", url_path="fixed"),
-                st.Page(investments.main, title="📈 Inversiones", url_path="investments")
+                st.Page(lazy_page("cards"), title="💳 Tarjetas", url_path="cards"),
+                st.Page(lazy_page("incomes"), title="💵 Ingresos", url_path="incomes"),
+                st.Page(lazy_page("fixed"), title="📌 Gastos Fijos", url_path="fixed"),
+                st.Page(lazy_page("investments"), title="📈 Inversiones", url_path="investments")
             ],
             "Gestión": [
-                st.Page(transactions.main, title="🗂️ Ver/Eliminar", url_path="transactions"),
-                st.Page(configuration.main, title="💳 Mis Tarjetas", url_path="configuration"),
-                st.Page(settings.main, title="⚙️ Configuración", url_path="settings")
+                st.Page(lazy_page("transactions"), title="🗂️ Ver/Eliminar", url_path="transactions"),
+                st.Page(lazy_page("search"), title="🔎 Buscar", url_path="search"),
+                st.Page(lazy_page("statements"), title="🧾 Resúmenes", url_path="statements"),
+                st.Page(lazy_page("configuration"), title="💳 Mis Tarjetas", url_path="configuration"),
+                st.Page(lazy_page("settings"), title="⚙️ Configuración", url_path="settings")
             ]
         }
     )
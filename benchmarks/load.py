@@ -0,0 +1,289 @@
+"""
+Load Benchmark - Concurrent Sessions Against One App Instance
+Drives N simulated sessions at once through login -> dashboard -> month
+switches -> card purchase -> delete, against the local SQLite backend
+stand-in (benchmarks/local_backend.py), and reports throughput, rerun latency
+percentiles and process memory as N grows.
+
+Each session is a thread, like a Streamlit script run, with its own signed-in
+user (database.use_session) and pooled client. A step replays the data calls
+its page makes on one rerun (through month_cache, like the pages do), so
+query count, client pool, caches and locks are exercised as on the server;
+widget rendering is not (the pages are st.navigation callables, which
+AppTest cannot navigate between). The backend sleeps --latency-ms per
+request to stand in for the Supabase round-trip.
+
+Usage:
+    python -m benchmarks.load [--sessions 1,5,10,25,50] [--iterations 3] [--latency-ms 20]
+"""
+
+import argparse
+import os
+import statistics
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+
+import database
+import month_cache
+from benchmarks.local_backend import LocalBackend
+from database import Settings
+from recurring import materialize_user
+
+CATEGORIES = ["Supermercado", "Transporte", "Servicios", "Salud", "Ropa", "Restaurantes", "Varios"]
+EXPENSE_COLUMNS = "payment_date, type, category, amount"
+
+
+def rss_mib() -> float:
+    """Resident memory of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    return ordered[max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))]
+
+
+def month_range(year: int, month: int) -> Tuple[str, str]:
+    start = date(year, month, 1)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+
+def recent_months(count: int) -> List[Tuple[int, int]]:
+    """The current month and the count - 1 before it, newest first"""
+    today = date.today()
+    months = []
+    year, month = today.year, today.month
+    for _ in range(count):
+        months.append((year, month))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return months
+
+# ============================================
+# PAGE RERUNS (the data calls each page makes)
+# ============================================
+
+def login(email: str) -> str:
+    """Login form submit, then app.py's first run for the user"""
+    _, session = database.sign_in(email, "load-test")
+    database.use_session(session)
+    user_id = session.user_id
+
+    database.create_default_cards(user_id)
+    database.claim_orphaned_data(user_id)
+    materialize_user(user_id)
+    return user_id
+
+
+def dashboard(user_id: str, year: int, month: int) -> None:
+    """views/dashboard.py for one month (plus app.py's sidebar)"""
+    database.get_sync_status(user_id)
+    available_months = database.get_available_months(user_id)
+
+    month_cache.get_monthly_summary(user_id, year, month)
+    month_cache.get_monthly_transactions(user_id, year, month, "Card")
+    month_cache.get_monthly_transactions(user_id, year, month)
+
+    start, end = month_range(year, month)
+    database.get_transactions_in_range(user_id, start, end, columns=EXPENSE_COLUMNS)
+    database.get_budget_status(user_id, year, month)
+
+    month_cache.prefetch_adjacent_months(user_id, year, month, available_months)
+
+
+def card_purchase(user_id: str, purchase_date: datetime) -> None:
+    """views/cards.py: page render, then the submit rerun"""
+    cards = database.get_all_cards(user_id)
+    database.save_card_transaction(
+        user_id, cards[0].id, purchase_date, 1200.0, "Tecnología", f"load {purchase_date.isoformat()}",
+        installments=3
+    )
+    database.get_all_cards(user_id)
+
+
+def delete_newest(user_id: str, year: int, month: int) -> None:
+    """views/transactions.py: list the month, then delete its newest row (a fragment rerun)"""
+    database.get_available_months(user_id)
+    _, rows = month_cache.get_month(user_id, year, month)
+    if rows:
+        newest = max(rows, key=lambda row: row.id)
+        database.delete_transaction(user_id, newest.id)
+
+# ============================================
+# SESSIONS
+# ============================================
+
+def seed_user(email: str, months: List[Tuple[int, int]], rows_per_month: int) -> None:
+    """Give a user some history (not timed)"""
+    _, session = database.sign_in(email, "load-test")
+    database.use_session(session)
+
+    rows = []
+    for year, month in months:
+        for i in range(rows_per_month):
+            day = datetime(year, month, 1 + i % 28)
+            trans_type = ("Income", "Fixed", "Debit", "Debit")[i % 4]
+            amount = float(100 + (i * 37) % 5000)
+            rows.append(database.build_cash_row(
+                session.user_id, trans_type, day, amount, CATEGORIES[i % len(CATEGORIES)], f"seed {i}"
+            ))
+    database.import_transactions(session.user_id, rows)
+    database.use_session(None)
+
+
+def run_session(
+    email: str,
+    months: List[Tuple[int, int]],
+    iterations: int,
+    start: threading.Barrier,
+    timings: Dict[str, List[float]],
+    errors: List[str],
+    lock: threading.Lock
+) -> None:
+    def step(name: str, func, *args):
+        began = time.perf_counter()
+        try:
+            result = func(*args)
+        except Exception as e:
+            with lock:
+                errors.append(f"{name}: {e}")
+            raise
+        elapsed = time.perf_counter() - began
+        with lock:
+            timings[name].append(elapsed)
+        return result
+
+    start.wait()
+    try:
+        user_id = step("login", login, email)
+        for iteration in range(iterations):
+            for year, month in months:
+                step("dashboard", dashboard, user_id, year, month)
+
+            purchase_date = datetime.now() - timedelta(minutes=iteration)
+            step("card purchase", card_purchase, user_id, purchase_date)
+
+            year, month = months[0]
+            step("delete", delete_newest, user_id, year, month)
+    except Exception:
+        pass
+    finally:
+        database.use_session(None)
+
+
+def run_round(
+    backend: LocalBackend,
+    round_id: int,
+    sessions: int,
+    iterations: int,
+    months: List[Tuple[int, int]],
+    rows_per_month: int
+) -> Dict:
+    emails = [f"load-{round_id}-{i}@example.com" for i in range(sessions)]
+
+    latency, backend.latency = backend.latency, 0.0
+    for email in emails:
+        seed_user(email, months, rows_per_month)
+    backend.latency = latency
+
+    timings: Dict[str, List[float]] = defaultdict(list)
+    errors: List[str] = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(sessions + 1)
+    threads = [
+        threading.Thread(
+            target=run_session, args=(email, months, iterations, barrier, timings, errors, lock), daemon=True
+        )
+        for email in emails
+    ]
+    for thread in threads:
+        thread.start()
+
+    requests_before = backend.requests
+    barrier.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - began
+
+    samples = [sample for values in timings.values() for sample in values]
+    return {
+        "sessions": sessions,
+        "reruns": len(samples),
+        "errors": errors,
+        "wall": wall,
+        "requests": backend.requests - requests_before,
+        "samples": samples,
+        "timings": timings,
+        "rss": rss_mib(),
+        "clients": len(database.get_client_pool()),
+    }
+
+# ============================================
+# REPORT
+# ============================================
+
+def run_benchmark(session_counts: List[int], iterations: int, latency_ms: float, months: int, rows_per_month: int) -> None:
+    backend = LocalBackend(latency=latency_ms / 1000)
+    database.configure(Settings("local", "local", client_factory=backend.client))
+    periods = recent_months(months)
+
+    print("=" * 100)
+    print(f"LOAD BENCHMARK ({latency_ms:g} ms per backend request, {iterations} iteration(s) of "
+          f"{months} month views + purchase + delete per session)")
+    print("=" * 100)
+    print(f"{'sessions':>8} {'reruns':>7} {'errors':>6} {'wall s':>7} {'reruns/s':>9} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/rerun':>9} {'RSS MiB':>8} {'clients':>7}")
+
+    last = None
+    for round_id, sessions in enumerate(session_counts):
+        result = run_round(backend, round_id, sessions, iterations, periods, rows_per_month)
+        samples = result["samples"]
+        if not samples:
+            print(f"{sessions:>8} no completed reruns: {result['errors'][:1]}")
+            continue
+
+        print(
+            f"{sessions:>8} {result['reruns']:>7} {len(result['errors']):>6} {result['wall']:>7.2f} "
+            f"{result['reruns'] / result['wall']:>9.1f} "
+            f"{percentile(samples, 50) * 1000:>8.1f} {percentile(samples, 95) * 1000:>8.1f} "
+            f"{percentile(samples, 99) * 1000:>8.1f} {result['requests'] / result['reruns']:>9.1f} "
+            f"{result['rss']:>8.1f} {result['clients']:>7}"
+        )
+        last = result
+
+    if last:
+        print("-" * 100)
+        print(f"Per step at {last['sessions']} sessions:")
+        for name, values in last["timings"].items():
+            print(f"  {name:<14} n={len(values):<5} p50 {percentile(values, 50) * 1000:7.1f} ms   "
+                  f"p95 {percentile(values, 95) * 1000:7.1f} ms   mean {statistics.mean(values) * 1000:7.1f} ms")
+        for error in last["errors"][:5]:
+            print(f"  error: {error}")
+    print("=" * 100)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive concurrent simulated sessions against a local backend")
+    parser.add_argument("--sessions", default="1,5,10,25,50", help="Comma-separated session counts")
+    parser.add_argument("--iterations", type=int, default=3, help="Scenario repetitions per session")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated round-trip per backend request")
+    parser.add_argument("--months", type=int, default=4, help="Months each session views (current and previous)")
+    parser.add_argument("--rows-per-month", type=int, default=60, help="Seeded history per user and month")
+    args = parser.parse_args()
+
+    session_counts = [int(value) for value in args.sessions.split(",") if value.strip()]
+    run_benchmark(session_counts, args.iterations, args.latency_ms, args.months, args.rows_per_month)
+
+
+if __name__ == "__main__":
+    main()
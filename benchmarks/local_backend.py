@@ -0,0 +1,360 @@
+"""
+Local Backend - In-Process Supabase Stand-In on SQLite
+A client with the slice of the supabase-py API that database.py uses
+(table queries, the RPCs of the transaction paths, password auth), backed by
+a SQLite database with migrations/ applied. Triggers keep monthly_summary
+and category_spend up to date exactly as in Postgres.
+
+Every execute() sleeps `latency` seconds outside the database lock, standing
+in for the network round-trip, so concurrent sessions overlap the way they
+do against a real Supabase project.
+
+With rls=True, inserts and upserts are checked the way the user_id policies
+check them: a row is only written by a client signed in as its user.
+
+Usage:
+    backend = LocalBackend(latency=0.02)
+    database.configure(Settings("local", "local", client_factory=backend.client))
+"""
+
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from migrate import apply_migrations
+
+# Embedded resources ("credit_cards(name)") -> foreign key column
+FOREIGN_KEYS = {"credit_cards": "card_id"}
+
+
+class PolicyViolation(Exception):
+    """A write rejected by row level security (PostgREST code 42501)"""
+    code = "42501"
+
+
+class LocalBackend:
+    """
+    Shared state of every client: one SQLite connection (serialized by a
+    lock), the registered users, and request counters.
+    """
+
+    def __init__(self, path: str = ":memory:", latency: float = 0.0, rls: bool = False):
+        self.latency = latency
+        self.rls = rls
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.users: Dict[str, str] = {}
+
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        apply_migrations(self.conn, "sqlite")
+        self.columns = {
+            table: [row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")]
+            for (table,) in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+
+        self.rpcs: Dict[str, Callable[[Dict], Any]] = {
+            "existing_content_hashes": self._existing_content_hashes,
+            "claim_orphaned_data": lambda params: [{"transactions_claimed": 0, "cards_claimed": 0}],
+            "update_transactions": self._update_transactions,
+        }
+
+    def client(self) -> "LocalClient":
+        """Client factory for database.Settings.client_factory"""
+        return LocalClient(self)
+
+    def run(self, sql: str, params: List[Any]) -> List[Dict]:
+        """Execute one statement (one simulated round-trip)"""
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.requests += 1
+            return [dict(row) for row in self.conn.execute(sql, params).fetchall()]
+
+    def _existing_content_hashes(self, params: Dict) -> List[Dict]:
+        hashes = params["p_hashes"]
+        marks = ", ".join("?" * len(hashes))
+        return self.run(
+            f"SELECT DISTINCT content_hash FROM transactions "
+            f"WHERE user_id = ? AND payment_date >= ? AND content_hash IN ({marks})",
+            [params["p_user_id"], params["p_since"]] + hashes
+        )
+
+    def _update_transactions(self, params: Dict) -> List[Dict]:
+        edits = list(zip(params["p_ids"], params["p_amounts"], params["p_categories"], params["p_descriptions"]))
+        if not edits:
+            return []
+        values = ", ".join("(?, ?, ?, ?)" for _ in edits)
+        return self.run(
+            f"WITH u (id, amount, category, description) AS (VALUES {values}) "
+            f"UPDATE transactions SET amount = COALESCE(u.amount, transactions.amount), "
+            f"category = COALESCE(u.category, transactions.category), "
+            f"description = COALESCE(u.description, transactions.description) "
+            f"FROM u WHERE transactions.id = u.id AND transactions.user_id = ? "
+            f"RETURNING transactions.id, transactions.payment_date",
+            [value for edit in edits for value in edit] + [params["p_user_id"]]
+        )
+
+# ============================================
+# QUERY BUILDER
+# ============================================
+
+class Query:
+    """PostgREST-style builder: filters, order and range compile to one SQL statement"""
+
+    def __init__(self, backend: LocalBackend, table: str, auth: Optional["LocalAuth"] = None):
+        self.backend = backend
+        self.table = table
+        self.auth = auth
+        self.action = "select"
+        self.columns = "*"
+        self.count = None
+        self.values: Any = None
+        self.on_conflict: Optional[str] = None
+        self.ignore_duplicates = False
+        self.where: List[Tuple[str, List[Any]]] = []
+        self.order_by: List[str] = []
+        self.limit_to: Optional[int] = None
+        self.offset = 0
+
+    # Actions
+
+    def select(self, columns: str = "*", count: Optional[str] = None) -> "Query":
+        self.columns, self.count = columns, count
+        return self
+
+    def insert(self, values) -> "Query":
+        self.action, self.values = "insert", values
+        return self
+
+    def upsert(self, values, on_conflict: Optional[str] = None, ignore_duplicates: bool = False) -> "Query":
+        self.action, self.values = "upsert", values
+        self.on_conflict, self.ignore_duplicates = on_conflict, ignore_duplicates
+        return self
+
+    def update(self, values: Dict) -> "Query":
+        self.action, self.values = "update", values
+        return self
+
+    def delete(self) -> "Query":
+        self.action = "delete"
+        return self
+
+    # Filters
+
+    def _filter(self, sql: str, *params) -> "Query":
+        self.where.append((sql, list(params)))
+        return self
+
+    def eq(self, column: str, value) -> "Query":
+        return self._filter(f"{column} = ?", value)
+
+    def neq(self, column: str, value) -> "Query":
+        return self._filter(f"{column} <> ?", value)
+
+    def gt(self, column: str, value) -> "Query":
+        return self._filter(f"{column} > ?", value)
+
+    def gte(self, column: str, value) -> "Query":
+        return self._filter(f"{column} >= ?", value)
+
+    def lt(self, column: str, value) -> "Query":
+        return self._filter(f"{column} < ?", value)
+
+    def lte(self, column: str, value) -> "Query":
+        return self._filter(f"{column} <= ?", value)
+
+    def in_(self, column: str, values) -> "Query":
+        values = list(values)
+        return self._filter(f"{column} IN ({', '.join('?' * len(values))})", *values)
+
+    def or_(self, filters: str) -> "Query":
+        """Only the forms database.py uses: column.is.null and column.op.value"""
+        operators = {"eq": "=", "lt": "<", "lte": "<=", "gt": ">", "gte": ">="}
+        parts, params = [], []
+        for condition in filters.split(","):
+            column, op, value = condition.split(".", 2)
+            if op == "is" and value == "null":
+                parts.append(f"{column} IS NULL")
+            else:
+                parts.append(f"{column} {operators[op]} ?")
+                params.append(value)
+        return self._filter("(" + " OR ".join(parts) + ")", *params)
+
+    def text_search(self, column: str, query: str, options: Optional[Dict] = None) -> "Query":
+        raise NotImplementedError("Full-text search needs Postgres (migrations/008)")
+
+    # Modifiers
+
+    def order(self, column: str, desc: bool = False) -> "Query":
+        self.order_by.append(f"{column} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def limit(self, count: int) -> "Query":
+        self.limit_to = count
+        return self
+
+    def range(self, start: int, end: int) -> "Query":
+        self.offset, self.limit_to = start, end - start + 1
+        return self
+
+    # Execution
+
+    def _where_sql(self) -> Tuple[str, List[Any]]:
+        if not self.where:
+            return "", []
+        params = [param for _, values in self.where for param in values]
+        return " WHERE " + " AND ".join(sql for sql, _ in self.where), params
+
+    def _select(self) -> SimpleNamespace:
+        plain, embeds = [], []
+        for column in re.split(r",\s*(?![^()]*\))", self.columns.strip()):
+            match = re.fullmatch(r"(\w+)\((.*)\)", column.strip())
+            if match:
+                embeds.append((match.group(1), [c.strip() for c in match.group(2).split(",")]))
+            else:
+                plain.append(column.strip())
+
+        if plain == ["*"]:
+            plain = list(self.backend.columns[self.table])
+        # Foreign keys of embedded resources are needed to join them
+        fetched = plain + [FOREIGN_KEYS[name] for name, _ in embeds if FOREIGN_KEYS[name] not in plain]
+
+        where, params = self._where_sql()
+        sql = f"SELECT {', '.join(fetched)} FROM {self.table}{where}"
+        if self.order_by:
+            sql += " ORDER BY " + ", ".join(self.order_by)
+        if self.limit_to is not None:
+            sql += f" LIMIT {self.limit_to} OFFSET {self.offset}"
+        rows = self.backend.run(sql, params)
+
+        for name, columns in embeds:
+            key = FOREIGN_KEYS[name]
+            ids = sorted({row[key] for row in rows if row[key] is not None})
+            related = {}
+            if ids:
+                related = {
+                    record["id"]: {column: record[column] for column in columns}
+                    for record in self.backend.run(
+                        f"SELECT id, {', '.join(columns)} FROM {name} WHERE id IN ({', '.join('?' * len(ids))})", ids
+                    )
+                }
+            for row in rows:
+                row[name] = related.get(row[key])
+        rows = [{k: v for k, v in row.items() if k in plain or k in dict(embeds)} for row in rows]
+
+        count = None
+        if self.count:
+            count = self.backend.run(f"SELECT COUNT(*) AS n FROM {self.table}{where}", params)[0]["n"]
+        return SimpleNamespace(data=rows, count=count)
+
+    def _write(self) -> List[Dict]:
+        rows = self.values if isinstance(self.values, list) else [self.values]
+        if not rows:
+            return []
+
+        signed_in = self.auth.user_id if self.auth else None
+        if self.backend.rls and any(row.get("user_id") != signed_in for row in rows):
+            raise PolicyViolation(f'new row violates row-level security policy for table "{self.table}"')
+
+        columns = list(rows[0])
+        sql = f"INSERT INTO {self.table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        if self.action == "upsert":
+            target = self.on_conflict
+            if self.ignore_duplicates:
+                sql += " ON CONFLICT DO NOTHING"
+            elif target:
+                updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c not in target.split(","))
+                sql += f" ON CONFLICT ({target}) DO UPDATE SET {updates}"
+            else:
+                sql = "INSERT OR REPLACE" + sql[len("INSERT"):]
+        sql += " RETURNING *"
+
+        written = []
+        for row in rows:
+            written.extend(self.backend.run(sql, [row[c] for c in columns]))
+        return written
+
+    def execute(self) -> SimpleNamespace:
+        if self.action == "select":
+            return self._select()
+        if self.action in ("insert", "upsert"):
+            return SimpleNamespace(data=self._write(), count=None)
+
+        where, params = self._where_sql()
+        if self.action == "update":
+            assignments = ", ".join(f"{column} = ?" for column in self.values)
+            rows = self.backend.run(
+                f"UPDATE {self.table} SET {assignments}{where} RETURNING *", list(self.values.values()) + params
+            )
+        else:
+            rows = self.backend.run(f"DELETE FROM {self.table}{where} RETURNING *", params)
+        return SimpleNamespace(data=rows, count=None)
+
+
+class RpcCall:
+    def __init__(self, backend: LocalBackend, name: str, params: Dict):
+        self.backend, self.name, self.params = backend, name, params
+
+    def execute(self) -> SimpleNamespace:
+        if self.name not in self.backend.rpcs:
+            raise NotImplementedError(f"RPC {self.name} is not available in the local backend")
+        return SimpleNamespace(data=self.backend.rpcs[self.name](self.params))
+
+# ============================================
+# CLIENT AND AUTH
+# ============================================
+
+class LocalAuth:
+    """Password auth: any password is accepted, users are created on first sign-in"""
+
+    def __init__(self, backend: LocalBackend):
+        self.backend = backend
+        self.user_id: Optional[str] = None
+
+    def _response(self, user_id: str, email: Optional[str] = None):
+        self.user_id = user_id
+        now = time.time()
+        session = SimpleNamespace(
+            access_token=f"access-{user_id}-{now}",
+            refresh_token=f"refresh-{user_id}",
+            expires_at=now + 3600,
+            expires_in=3600
+        )
+        return SimpleNamespace(user=SimpleNamespace(id=user_id, email=email), session=session)
+
+    def _user_id(self, email: str) -> str:
+        with self.backend.lock:
+            return self.backend.users.setdefault(email, str(uuid.uuid5(uuid.NAMESPACE_URL, email)))
+
+    def sign_in_with_password(self, credentials: Dict):
+        if self.backend.latency:
+            time.sleep(self.backend.latency)
+        return self._response(self._user_id(credentials["email"]), credentials["email"])
+
+    sign_up = sign_in_with_password
+
+    def set_session(self, access_token: str, refresh_token: str):
+        return self._response(refresh_token.split("-", 1)[1])
+
+    def refresh_session(self, refresh_token: str):
+        return self._response(refresh_token.split("-", 1)[1])
+
+    def sign_out(self):
+        self.user_id = None
+
+
+class LocalClient:
+    def __init__(self, backend: LocalBackend):
+        self.backend = backend
+        self.auth = LocalAuth(backend)
+
+    def table(self, name: str) -> Query:
+        return Query(self.backend, name, self.auth)
+
+    def rpc(self, name: str, params: Optional[Dict] = None) -> RpcCall:
+        return RpcCall(self.backend, name, params or {})
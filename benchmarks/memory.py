@@ -0,0 +1,101 @@
+"""
+Memory Benchmark - Raw Query Dicts vs Slotted Records
+Builds N synthetic transaction rows the way the Supabase client delivers them
+(json.loads of a PostgREST response: one dict per row, string dates, nested
+credit_cards), then measures with tracemalloc what it costs to keep them as
+dicts versus as models.Transaction records.
+
+Usage:
+    python -m benchmarks.memory [--rows 100000]
+"""
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Callable, List, Tuple
+
+from models import Transaction
+
+CATEGORIES = ["Supermercado", "Transporte", "Servicios", "Salud", "Ropa", "Restaurantes", "Varios"]
+CARDS = ["Visa", "Mastercard", "Amex"]
+
+
+def make_payload(n_rows: int, seed: int = 7) -> str:
+    """JSON text shaped like `select=*,credit_cards(name)` on transactions"""
+    rng = random.Random(seed)
+    start = date(2020, 1, 1)
+    rows = []
+
+    for i in range(n_rows):
+        day = start + timedelta(days=rng.randrange(5 * 365))
+        trans_type = rng.choice(["Income", "Fixed", "Debit", "Card", "Card"])
+        card = trans_type == "Card"
+        rows.append({
+            "id": i + 1,
+            "created_at": f"{day.isoformat()}T12:00:00.000000+00:00",
+            "user_id": "00000000-0000-0000-0000-000000000001",
+            "date": day.isoformat(),
+            "payment_date": (day + timedelta(days=40 if card else 0)).isoformat(),
+            "amount": round(rng.uniform(100, 50000), 2),
+            "category": rng.choice(CATEGORIES),
+            "description": "",
+            "type": trans_type,
+            "card_id": rng.randrange(1, 4) if card else None,
+            "installments_total": 1,
+            "installment_number": 1,
+            "recurring_rule_id": None,
+            "credit_cards": {"name": rng.choice(CARDS)} if card else None,
+        })
+
+    return json.dumps(rows)
+
+
+def measure(build: Callable[[], list]) -> Tuple[list, int, float]:
+    """Build a structure and return (result, bytes still allocated, seconds)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained, seconds
+
+
+def run_benchmark(n_rows: int) -> None:
+    payload = make_payload(n_rows)
+
+    dict_rows, dict_bytes, dict_seconds = measure(lambda: json.loads(payload))
+
+    # Conversion cost counts, but only the records stay alive afterwards
+    def build_records() -> List[Transaction]:
+        return Transaction.from_rows(json.loads(payload))
+
+    records, record_bytes, record_seconds = measure(build_records)
+    assert len(records) == len(dict_rows)
+
+    print("=" * 60)
+    print(f"MEMORY BENCHMARK ({n_rows:,} transaction rows)")
+    print("=" * 60)
+    print(f"{'raw dicts (response.data)':<30} {dict_bytes / 2**20:8.1f} MiB   "
+          f"{dict_bytes / n_rows:6.0f} B/row   load {dict_seconds * 1000:7.0f} ms")
+    print(f"{'Transaction records':<30} {record_bytes / 2**20:8.1f} MiB   "
+          f"{record_bytes / n_rows:6.0f} B/row   load {record_seconds * 1000:7.0f} ms")
+    print(f"{'saving':<30} {(1 - record_bytes / dict_bytes) * 100:7.1f} %")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare memory of raw row dicts and slotted records")
+    parser.add_argument("--rows", type=int, default=100_000, help="Number of synthetic rows")
+    args = parser.parse_args()
+    run_benchmark(args.rows)
+
+
+if __name__ == "__main__":
+    main()
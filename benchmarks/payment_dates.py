@@ -0,0 +1,109 @@
+"""
+Payment Date Benchmark - Original Algorithm vs Precomputed Calendar
+Times a bulk recomputation (e.g. rescheduling every installment after a
+closing-day change) of N random (purchase_date, closing_day) pairs:
+
+- original:  relativedelta + try/except month clamping, per call
+- calendar:  PaymentCalendar.payment_date table lookup
+- database:  database.calculate_payment_date (calendar lookup + datetime wrapper)
+
+Usage:
+    python -m benchmarks.payment_dates [--calls 200000]
+"""
+
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Tuple
+
+from payment_calendar import PAYMENT_GRACE_DAYS, get_payment_calendar
+
+
+def original_payment_date(purchase_date: datetime, closing_day: int) -> datetime:
+    """calculate_payment_date as it was before the calendar"""
+    from dateutil.relativedelta import relativedelta
+
+    if purchase_date.day <= closing_day:
+        statement_month = purchase_date
+    else:
+        statement_month = purchase_date + relativedelta(months=1)
+
+    try:
+        technical_close_date = statement_month.replace(day=closing_day)
+    except ValueError:
+        next_month = statement_month + relativedelta(months=1)
+        technical_close_date = next_month.replace(day=1) - timedelta(days=1)
+
+    return technical_close_date + timedelta(days=PAYMENT_GRACE_DAYS)
+
+
+def make_workload(n_calls: int, seed: int = 7) -> List[Tuple[datetime, int]]:
+    rng = random.Random(seed)
+    start = date.today().replace(month=1, day=1) - timedelta(days=5 * 365)
+    return [
+        (datetime.combine(start + timedelta(days=rng.randrange(6 * 365)), datetime.min.time()),
+         rng.randint(1, 31))
+        for _ in range(n_calls)
+    ]
+
+
+def time_calls(fn: Callable, workload: List[Tuple[datetime, int]]) -> Tuple[float, list]:
+    start = time.perf_counter()
+    results = [fn(purchase_date, closing_day) for purchase_date, closing_day in workload]
+    return time.perf_counter() - start, results
+
+
+def run_benchmark(n_calls: int) -> None:
+    workload = make_workload(n_calls)
+
+    start = time.perf_counter()
+    payment_calendar = get_payment_calendar()
+    build_seconds = time.perf_counter() - start
+
+    print("=" * 60)
+    print(f"PAYMENT DATE BENCHMARK ({n_calls:,} calls)")
+    print("=" * 60)
+    print(f"{'calendar build':<24} {build_seconds * 1000:8.1f} ms   "
+          f"({len(payment_calendar):,} month x closing-day slots, "
+          f"{payment_calendar.first_year}-{payment_calendar.last_year})")
+
+    candidates = [("original", original_payment_date), ("calendar", payment_calendar.payment_date)]
+    try:
+        from database import calculate_payment_date
+        candidates.append(("database", calculate_payment_date))
+    except ImportError as e:
+        print(f"{'database':<24} skipped ({e})")
+
+    baseline = None
+    reference, reference_label = None, None
+    for label, fn in candidates:
+        try:
+            seconds, results = time_calls(fn, workload)
+        except ImportError as e:
+            print(f"{label:<24} skipped ({e})")
+            continue
+
+        dates = [result if type(result) is date else result.date() for result in results]
+        if reference is None:
+            reference, reference_label = dates, label
+        elif dates != reference:
+            raise AssertionError(f"{label} disagrees with {reference_label}")
+
+        per_call_us = seconds / n_calls * 1e6
+        speedup = f"   x{baseline / seconds:5.1f}" if baseline else ""
+        baseline = baseline or seconds
+        print(f"{label:<24} {seconds * 1000:8.1f} ms   {per_call_us:6.2f} µs/call{speedup}")
+
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare payment date calculation strategies")
+    parser.add_argument("--calls", type=int, default=200_000, help="Number of lookups")
+    args = parser.parse_args()
+    run_benchmark(args.calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Startup Benchmark - Cold Import Time and First Paint
+Every measurement runs in a fresh interpreter so module caches start empty,
+the same way a container cold start or a new server process would.
+
+Usage:
+    python -m benchmarks.startup [--repeat 5]
+
+The dashboard scenario uses the credentials in .streamlit/secrets.toml when
+present; otherwise it points at an unreachable local URL, so it measures the
+render path with every query failing fast.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules whose cold import cost matters for the first render
+IMPORT_TARGETS = [
+    "streamlit",
+    "dateutil.relativedelta",
+    "supabase",
+    "pandas",
+    "database",
+    "views.login",
+    "views.dashboard",
+]
+
+SCENARIOS = ["login", "dashboard"]
+
+
+# ============================================
+# CHILD PROCESS MEASUREMENTS
+# ============================================
+
+def measure_import(module_name: str) -> float:
+    """Import a single module and return elapsed seconds"""
+    import importlib
+    
+    start = time.perf_counter()
+    importlib.import_module(module_name)
+    return time.perf_counter() - start
+
+
+def measure_first_paint(scenario: str) -> float:
+    """
+    Run app.py once through Streamlit's AppTest and return elapsed seconds.
+    Includes every import the page triggers, like a real first render.
+    """
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+    
+    if scenario == "dashboard":
+        from types import SimpleNamespace
+        
+        user_id = "00000000-0000-0000-0000-000000000000"
+        at.session_state["user"] = SimpleNamespace(id=user_id, email="bench@example.com")
+        at.session_state["user_id"] = user_id
+        at.session_state["setup_complete"] = True
+        
+        if not os.path.exists(os.path.join(ROOT, ".streamlit", "secrets.toml")):
+            at.secrets["supabase"] = {"url": "http://127.0.0.1:9", "key": "bench.bench.bench"}
+    
+    at.run()
+    return time.perf_counter() - start
+
+
+# ============================================
+# PARENT PROCESS (ORCHESTRATION)
+# ============================================
+
+def run_child(kind: str, target: str) -> float:
+    """Run one measurement in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child", kind, target],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])["seconds"]
+
+
+def run_benchmark(repeat: int) -> None:
+    print("=" * 60)
+    print("STARTUP BENCHMARK (fresh interpreter per sample)")
+    print("=" * 60)
+    
+    rows = []
+    for module_name in IMPORT_TARGETS:
+        rows.append((f"import {module_name}", "import", module_name))
+    for scenario in SCENARIOS:
+        rows.append((f"first paint: {scenario}", "paint", scenario))
+    
+    for label, kind, target in rows:
+        try:
+            samples = [run_child(kind, target) for _ in range(repeat)]
+        except subprocess.CalledProcessError as e:
+            error = e.stderr.strip().splitlines()[-1] if e.stderr else "failed"
+            print(f"{label:<32} ERROR: {error}")
+            continue
+        
+        median_ms = statistics.median(samples) * 1000
+        best_ms = min(samples) * 1000
+        print(f"{label:<32} median {median_ms:8.1f} ms   best {best_ms:8.1f} ms")
+    
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import time and first paint")
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per measurement")
+    parser.add_argument("--child", nargs=2, metavar=("KIND", "TARGET"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        kind, target = args.child
+        sys.path.insert(0, ROOT)
+        seconds = measure_import(target) if kind == "import" else measure_first_paint(target)
+        print(json.dumps({"seconds": seconds}))
+        return
+    
+    run_benchmark(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
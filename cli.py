@@ -0,0 +1,222 @@
+"""
+FINANZAS PRO - Command Line
+Bulk operations on the same data layer as the Streamlit app, without a browser
+
+Each command runs in its own process, so a long import or recomputation never
+holds one of the interactive server's script threads. Credentials come from
+the SUPABASE_URL / SUPABASE_KEY environment variables. Commands act on any
+user's rows, so the key must be allowed to (the service role key, which
+bypasses RLS).
+
+Usage:
+    python cli.py import --user-id UID statement.csv
+    python cli.py export --user-id UID --start 2025-01-01 --end 2026-01-01 -o out.csv
+    python cli.py recompute-summaries [--user-id UID]
+    python cli.py backfill-usd-rates rates.csv
+    python cli.py reschedule-installments --user-id UID --card Visa [--from 2025-06-01]
+    python cli.py benchmark payment_dates [--calls 200000]
+    python cli.py benchmark load [--sessions 1,5,10] [--latency-ms 20]
+
+CSV columns:
+    import:             date, type, amount, category, description[, card, installments]
+                        (type: Income/Fixed/Debit, or Card with a card name)
+    backfill-usd-rates: date, official, blue
+"""
+
+import argparse
+import csv
+import importlib
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import database
+from database import Settings, build_card_rows, build_cash_row
+from errors import DataError
+
+BENCHMARKS = ["startup", "memory", "payment_dates", "load"]
+EXPORT_FIELDS = [
+    "id", "date", "payment_date", "amount", "category", "description", "type",
+    "card_name", "installments_total", "installment_number"
+]
+
+
+def _date(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+def _read_csv(path: str) -> List[Dict[str, str]]:
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        return list(csv.DictReader(handle))
+
+
+def _fail(message: str) -> int:
+    print(f"error: {message}", file=sys.stderr)
+    return 1
+
+# ============================================
+# COMMANDS
+# ============================================
+
+def import_csv(user_id: str, path: str) -> int:
+    """Import a CSV of movements; rows already imported are skipped"""
+    cards = {card.name.casefold(): card for card in database.get_all_cards(user_id)}
+
+    rows = []
+    for line, record in enumerate(_read_csv(path), start=2):
+        try:
+            date = _date(record["date"].strip())
+            amount = float(record["amount"])
+            category = record["category"].strip()
+            description = (record.get("description") or "").strip()
+            trans_type = record["type"].strip()
+
+            if trans_type == "Card":
+                card = cards.get((record.get("card") or "").strip().casefold())
+                if card is None:
+                    return _fail(f"line {line}: unknown card {record.get('card')!r}")
+                installments = int(record.get("installments") or 1)
+                rows.extend(build_card_rows(
+                    user_id, card.id, card.closing_day, date, amount, category, description, installments
+                ))
+            else:
+                rows.append(build_cash_row(user_id, trans_type, date, amount, category, description))
+        except (KeyError, ValueError) as e:
+            return _fail(f"line {line}: {e}")
+
+    inserted, skipped = database.import_transactions(user_id, rows)
+    print(f"Imported {inserted} rows ({skipped} already present)")
+    return 0
+
+
+def export_csv(user_id: str, start: datetime, end: datetime, output: Optional[str]) -> int:
+    """Write transactions with payment_date in [start, end) as CSV"""
+    transactions = database.get_transactions_in_range(
+        user_id, start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+    )
+    transactions.sort(key=lambda t: (t.payment_date, str(t.id)))
+
+    handle = open(output, "w", newline="", encoding="utf-8") if output else sys.stdout
+    try:
+        writer = csv.DictWriter(handle, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(t.to_row() for t in transactions)
+    finally:
+        if output:
+            handle.close()
+
+    if output:
+        print(f"Exported {len(transactions)} rows to {output}")
+    return 0
+
+
+def recompute_summaries(user_id: Optional[str]) -> int:
+    """Rebuild monthly_summary and category_spend from raw transactions"""
+    summary_rows = database.rebuild_monthly_summary(user_id)
+    spend_rows = database.rebuild_category_spend(user_id)
+    print(f"Rebuilt {summary_rows} monthly summary rows and {spend_rows} category spend rows")
+    return 0
+
+
+def backfill_usd_rates(path: str) -> int:
+    """Upsert USD rates from a CSV"""
+    saved = 0
+    for line, record in enumerate(_read_csv(path), start=2):
+        try:
+            date = _date(record["date"].strip())
+            official, blue = float(record["official"]), float(record["blue"])
+        except (KeyError, ValueError) as e:
+            return _fail(f"line {line}: {e}")
+
+        database.save_usd_rate(date, official, blue)
+        saved += 1
+
+    print(f"Saved {saved} USD rates")
+    return 0
+
+
+def reschedule_installments(user_id: str, card_name: str, from_date: Optional[datetime]) -> int:
+    """Recompute a card's not-yet-due payment dates with its current closing day"""
+    cards = [card for card in database.get_all_cards(user_id) if card.name.casefold() == card_name.casefold()]
+    if not cards:
+        return _fail(f"unknown card {card_name!r}")
+
+    result = database.reschedule_card_installments(user_id, cards[0].id, from_date)
+    print(f"Rescheduled {result['updated']} rows")
+    for month in result["months"]:
+        print(f"  {month['month']}: {month['before']:,.2f} -> {month['after']:,.2f}")
+    return 0
+
+
+def run_benchmark(name: str, args: List[str]) -> int:
+    """Run benchmarks.<name> with its own command-line arguments"""
+    module = importlib.import_module(f"benchmarks.{name}")
+    sys.argv = [f"benchmarks/{name}.py"] + args
+    module.main()
+    return 0
+
+# ============================================
+# ENTRY POINT
+# ============================================
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Finanzas Pro bulk operations")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("import", help="Import transactions from a CSV")
+    command.add_argument("--user-id", required=True)
+    command.add_argument("path")
+
+    command = commands.add_parser("export", help="Export transactions to CSV")
+    command.add_argument("--user-id", required=True)
+    command.add_argument("--start", type=_date, required=True, help="First payment date (YYYY-MM-DD)")
+    command.add_argument("--end", type=_date, required=True, help="Payment date after the last (YYYY-MM-DD)")
+    command.add_argument("-o", "--output", help="Output file (default: stdout)")
+
+    command = commands.add_parser("recompute-summaries", help="Rebuild monthly summaries and category spend")
+    command.add_argument("--user-id", help="Only this user (default: everyone)")
+
+    command = commands.add_parser("backfill-usd-rates", help="Load USD rates from a CSV")
+    command.add_argument("path")
+
+    command = commands.add_parser("reschedule-installments", help="Reapply a card's current closing day")
+    command.add_argument("--user-id", required=True)
+    command.add_argument("--card", required=True, help="Card name")
+    command.add_argument("--from", dest="from_date", type=_date, help="First payment date to move (default: today)")
+
+    command = commands.add_parser("benchmark", help="Run a benchmark from benchmarks/")
+    command.add_argument("name", choices=BENCHMARKS)
+    command.add_argument("args", nargs=argparse.REMAINDER, help="Arguments for the benchmark")
+
+    return parser
+
+
+def run(args: argparse.Namespace) -> int:
+    if args.command == "import":
+        return import_csv(args.user_id, args.path)
+    if args.command == "export":
+        return export_csv(args.user_id, args.start, args.end, args.output)
+    if args.command == "recompute-summaries":
+        return recompute_summaries(args.user_id)
+    if args.command == "backfill-usd-rates":
+        return backfill_usd_rates(args.path)
+    if args.command == "reschedule-installments":
+        return reschedule_installments(args.user_id, args.card, args.from_date)
+    return run_benchmark(args.name, args.args)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    # Writes go straight to Supabase: a short-lived process would exit before a
+    # local write queue synced, and the server owns its queue file
+    database.configure(Settings.from_env()._replace(write_queue_path=None))
+
+    try:
+        return run(args)
+    except DataError as e:
+        return _fail(str(e))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+FINANZAS PRO - Per-User Supabase Client Pool
+One authenticated client per signed-in user instead of one shared client
+
+A Supabase client carries auth state: signing in on it makes every later
+PostgREST call run as that user (and under that user's RLS policies). Sharing
+one process-wide client therefore mixes users' sessions and serializes
+sign-in/sign-out. The pool keeps a separate client per user:
+
+- Bounded LRU (max_clients): the least recently used client is dropped when
+  a new user needs a slot. Nothing is lost: the user's tokens live in their
+  Streamlit session, and the next checkout rebuilds the client from them.
+- Idle eviction (idle_seconds): clients unused for that long are dropped on
+  the next checkout by anyone.
+- Token refresh: a checkout refreshes the access token when it expires within
+  refresh_margin seconds, and returns the new tokens so the caller can store
+  them. Clients are created with auto-refresh off, so the pool does not start
+  one refresh timer per user.
+- Building a client (sign-in, set_session, refresh) happens under a per-user
+  lock, never under the pool lock, so slow auth round-trips of one user do
+  not block checkouts of the others.
+
+The factory decides how clients are built. database.py gives every client
+its own httpx.Client (so auth headers never leak between users) over one
+shared transport, i.e. a single keep-alive connection pool for the process.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+DEFAULT_MAX_CLIENTS = 256
+DEFAULT_IDLE_SECONDS = 30 * 60
+# Refresh access tokens that expire within this many seconds
+DEFAULT_REFRESH_MARGIN = 60
+
+
+class AuthTokens(NamedTuple):
+    """A user's Supabase session tokens (kept in the Streamlit session)"""
+    access_token: str
+    refresh_token: str
+    expires_at: float
+
+    @classmethod
+    def from_session(cls, session: Any) -> "AuthTokens":
+        """Build from a gotrue Session"""
+        expires_at = session.expires_at or time.time() + (session.expires_in or 0)
+        return cls(session.access_token, session.refresh_token, float(expires_at))
+
+
+class _Entry:
+    __slots__ = ("client", "tokens", "last_used")
+
+    def __init__(self, client: Any, tokens: AuthTokens):
+        self.client = client
+        self.tokens = tokens
+        self.last_used = time.monotonic()
+
+
+class ClientPool:
+    """
+    Bounded LRU pool of per-user authenticated clients.
+
+    Args:
+        factory: Callable returning a new, signed-out client
+        max_clients: Maximum number of pooled clients
+        idle_seconds: Clients unused for longer are evicted
+        refresh_margin: Seconds before expiry at which tokens are refreshed
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        max_clients: int = DEFAULT_MAX_CLIENTS,
+        idle_seconds: float = DEFAULT_IDLE_SECONDS,
+        refresh_margin: float = DEFAULT_REFRESH_MARGIN
+    ):
+        self.factory = factory
+        self.max_clients = max_clients
+        self.idle_seconds = idle_seconds
+        self.refresh_margin = refresh_margin
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._user_locks: Dict[str, threading.Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._entries
+
+    # ============================================
+    # POOL BOOKKEEPING (under the pool lock)
+    # ============================================
+
+    def _user_lock(self, user_id: str) -> threading.Lock:
+        with self._lock:
+            return self._user_locks.setdefault(user_id, threading.Lock())
+
+    def _lookup(self, user_id: str) -> Optional[_Entry]:
+        with self._lock:
+            self._evict_idle()
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                entry.last_used = time.monotonic()
+                self._entries.move_to_end(user_id)
+            return entry
+
+    def _store(self, user_id: str, client: Any, tokens: AuthTokens) -> None:
+        with self._lock:
+            self._entries[user_id] = _Entry(client, tokens)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_clients:
+                evicted, _ = self._entries.popitem(last=False)
+                self._user_locks.pop(evicted, None)
+
+    def _evict_idle(self) -> None:
+        deadline = time.monotonic() - self.idle_seconds
+        # Entries are in LRU order: stop at the first recently used one
+        while self._entries:
+            user_id, entry = next(iter(self._entries.items()))
+            if entry.last_used > deadline:
+                break
+            del self._entries[user_id]
+            self._user_locks.pop(user_id, None)
+
+    # ============================================
+    # AUTH
+    # ============================================
+
+    def sign_in(self, email: str, password: str) -> Tuple[Any, AuthTokens]:
+        """
+        Sign a user in on a fresh client and pool it.
+        Returns: (gotrue AuthResponse, tokens to keep in the user's session)
+        """
+        client = self.factory()
+        response = client.auth.sign_in_with_password({"email": email, "password": password})
+        tokens = AuthTokens.from_session(response.session)
+        self._store(response.user.id, client, tokens)
+        return response, tokens
+
+    def adopt(self, user_id: str, client: Any, session: Any) -> AuthTokens:
+        """Pool a client that already holds a user's session (e.g. right after sign-up)"""
+        tokens = AuthTokens.from_session(session)
+        self._store(user_id, client, tokens)
+        return tokens
+
+    def get(self, user_id: str, tokens: AuthTokens) -> Tuple[Any, AuthTokens]:
+        """
+        Check out a user's client, rebuilding it from tokens if it was evicted
+        and refreshing tokens that are about to expire.
+        Returns: (client, current tokens); store the tokens if they changed
+        """
+        entry = self._lookup(user_id)
+        if entry is not None and not self._expiring(entry.tokens):
+            return entry.client, entry.tokens
+
+        with self._user_lock(user_id):
+            # Another thread of the same user may have done the work meanwhile
+            entry = self._lookup(user_id)
+            if entry is not None and not self._expiring(entry.tokens):
+                return entry.client, entry.tokens
+
+            if entry is not None:
+                client = entry.client
+                response = client.auth.refresh_session(entry.tokens.refresh_token)
+            else:
+                client = self.factory()
+                response = client.auth.set_session(tokens.access_token, tokens.refresh_token)
+
+            fresh = AuthTokens.from_session(response.session)
+            self._store(user_id, client, fresh)
+            return client, fresh
+
+    def checkout(self, user_id: str) -> Optional[Any]:
+        """
+        Client of a pooled user without their session tokens at hand (background
+        workers), refreshed if about to expire. Returns None when the user is
+        not pooled (signed out, evicted or served by another process).
+        """
+        entry = self._lookup(user_id)
+        if entry is None:
+            return None
+        client, _ = self.get(user_id, entry.tokens)
+        return client
+
+    def sign_out(self, user_id: str) -> None:
+        """Revoke the user's session (if pooled) and drop their client"""
+        with self._lock:
+            entry = self._entries.pop(user_id, None)
+            self._user_locks.pop(user_id, None)
+
+        if entry is not None:
+            entry.client.auth.sign_out()
+
+    def _expiring(self, tokens: AuthTokens) -> bool:
+        return tokens.expires_at - time.time() < self.refresh_margin
@@ -0,0 +1,246 @@
+"""
+FINANZAS PRO - Columnar Per-Session Transaction Store
+Opt-in "local mode": load a user's history once, slice months in memory
+
+The whole history (usually a few thousand rows) is fetched once per session
+into a pandas DataFrame sorted by payment_date, with categorical `type` and
+`category` columns. A month is a contiguous slice found by binary search
+(np.searchsorted) on the sorted payment_date array, so month navigation,
+summaries and type filters never go back to Supabase.
+
+After the initial load the store catches up through the transaction change
+log (database.get_transaction_changes): right after this session writes,
+and every DELTA_SYNC_INTERVAL seconds for writes from other sessions or
+devices. Without change tracking installed it reloads fully after writes.
+
+The dashboard and transactions views import the three read functions from
+here; with local mode off they fall through to database.py, with the
+month-level reads going through month_cache.py (recent months plus a
+background prefetch of the neighbours of the month on screen).
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import database
+import month_cache
+from database import format_month, get_data_version
+from errors import DataError
+from models import Transaction
+
+COLUMNS = [
+    "id", "created_at", "date", "payment_date", "amount", "category", "description",
+    "type", "card_id", "installments_total", "installment_number", "card_name", "pending"
+]
+
+SESSION_KEY = "columnar_store"
+LOCAL_MODE_KEY = "local_mode"
+
+# Seconds between change-log checks for writes made by other sessions/devices
+DELTA_SYNC_INTERVAL = 30
+
+
+def _rows_to_frame(rows: List[Transaction]) -> pd.DataFrame:
+    """Transpose Transaction records into one column per field in COLUMNS"""
+    return pd.DataFrame(
+        {column: [getattr(row, column) for row in rows] for column in COLUMNS},
+        columns=COLUMNS
+    )
+
+
+def frame_to_transactions(rows: pd.DataFrame) -> List[Transaction]:
+    """Back to plain Python values (None instead of NaN) and records"""
+    records = rows.astype(object).where(rows.notna(), None).to_dict("records")
+    return [Transaction(**record) for record in records]
+
+
+class ColumnarTransactionStore:
+    """In-memory, payment_date-sorted columnar copy of a user's transactions"""
+
+    def __init__(self, frame: pd.DataFrame):
+        frame = frame.copy()
+        frame["amount"] = frame["amount"].astype("float64")
+        frame["type"] = frame["type"].astype("category")
+        frame["category"] = frame["category"].astype("category")
+        frame["pending"] = frame["pending"].astype(bool)
+
+        # Sort once by payment_date; every month is then a contiguous block
+        frame = frame.sort_values("payment_date", kind="stable").reset_index(drop=True)
+
+        self.frame = frame
+        self._payment_dates = frame["payment_date"].to_numpy(dtype="datetime64[D]")
+
+    @classmethod
+    def from_rows(cls, rows: List[Transaction]) -> "ColumnarTransactionStore":
+        return cls(_rows_to_frame(rows))
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def apply_changes(
+        self,
+        upserted: List[Transaction],
+        deleted_ids: List[int],
+        pending: List[Transaction]
+    ) -> "ColumnarTransactionStore":
+        """
+        Build a new store with a delta applied.
+        Pending (write queue) rows are always replaced wholesale: once flushed
+        they come back through the change log with their real IDs.
+        """
+        drop_ids = set(deleted_ids) | {row.id for row in upserted}
+        keep = self.frame[~self.frame["id"].isin(drop_ids) & ~self.frame["pending"]]
+
+        added = _rows_to_frame(upserted + pending)
+        merged = pd.concat([keep.astype(object), added.astype(object)], ignore_index=True)
+        return ColumnarTransactionStore(merged)
+
+    # ============================================
+    # MONTH SLICING
+    # ============================================
+
+    def _month_bounds(self, year: int, month: int) -> Tuple[int, int]:
+        """Row positions [lo, hi) of a month via binary search on payment_date"""
+        start = np.datetime64(f"{year:04d}-{month:02d}", "M")
+        lo, hi = np.searchsorted(
+            self._payment_dates,
+            [start.astype("datetime64[D]"), (start + 1).astype("datetime64[D]")]
+        )
+        return int(lo), int(hi)
+
+    def month_slice(self, year: int, month: int) -> pd.DataFrame:
+        lo, hi = self._month_bounds(year, month)
+        return self.frame.iloc[lo:hi]
+
+    # ============================================
+    # QUERIES (same shapes as database.py)
+    # ============================================
+
+    def available_months(self) -> List[Tuple[int, int, str]]:
+        months = np.unique(self._payment_dates.astype("datetime64[M]"))[::-1]
+        result = []
+        for value in months:
+            year, month = int(str(value)[:4]), int(str(value)[5:7])
+            result.append((year, month, format_month(year, month)))
+        return result
+
+    def monthly_summary(self, year: int, month: int) -> Dict[str, float]:
+        totals = self.month_slice(year, month).groupby("type", observed=True)["amount"].sum()
+
+        summary = {
+            "income": float(totals.get("Income", 0.0)),
+            "fixed": float(totals.get("Fixed", 0.0)),
+            "debit": float(totals.get("Debit", 0.0)),
+            "card": float(totals.get("Card", 0.0)),
+            "net_balance": 0.0
+        }
+        total_expenses = summary["fixed"] + summary["debit"] + summary["card"]
+        summary["net_balance"] = summary["income"] - total_expenses
+        return summary
+
+    def monthly_transactions(self, year: int, month: int, trans_type: Optional[str] = None) -> List[Transaction]:
+        rows = self.month_slice(year, month)
+        if trans_type:
+            rows = rows[rows["type"] == trans_type]
+
+        rows = rows.sort_values("date", ascending=False, kind="stable")
+        return frame_to_transactions(rows)
+
+# ============================================
+# SESSION INTEGRATION
+# ============================================
+
+def is_local_mode() -> bool:
+    """True if the user enabled local mode for this session"""
+    return bool(st.session_state.get(LOCAL_MODE_KEY, False))
+
+
+def get_session_store(user_id: str) -> Optional[ColumnarTransactionStore]:
+    """
+    Get this session's store, loading (or reloading after a write) on demand.
+    Returns None when local mode is off.
+    """
+    if not is_local_mode():
+        return None
+
+    version = get_data_version(user_id)
+    cached = st.session_state.get(SESSION_KEY)
+
+    if cached and cached["user_id"] == user_id:
+        written = cached["version"] != version
+        due = cached["watermark"] is not None and time.time() - cached["synced_at"] > DELTA_SYNC_INTERVAL
+
+        if not written and not due:
+            return cached["store"]
+
+        # Catch up through the change log instead of refetching everything
+        if cached["watermark"] is not None:
+            try:
+                delta = database.get_transaction_changes(user_id, cached["watermark"])
+            except DataError:
+                # Fall back to a full load
+                delta = None
+            if delta is not None:
+                upserted, deleted_ids, watermark = delta
+                store = cached["store"]
+                if upserted or deleted_ids or written:
+                    store = store.apply_changes(
+                        upserted, deleted_ids, database.get_pending_transactions(user_id)
+                    )
+                cached.update(store=store, version=version, watermark=watermark, synced_at=time.time())
+                return store
+
+    # Full load (watermark first, so changes during the load are replayed later)
+    watermark = database.get_change_watermark(user_id)
+    rows = database.get_transactions_in_range(user_id, "0001-01-01", "9999-12-31")
+    store = ColumnarTransactionStore.from_rows(rows)
+
+    st.session_state[SESSION_KEY] = {
+        "user_id": user_id,
+        "version": version,
+        "watermark": watermark,
+        "synced_at": time.time(),
+        "store": store,
+    }
+    return store
+
+
+def get_available_months(user_id: str) -> List[Tuple[int, int, str]]:
+    store = get_session_store(user_id)
+    if store is None:
+        return database.get_available_months(user_id)
+    return store.available_months()
+
+
+def get_monthly_summary(user_id: str, year: int, month: int) -> Dict[str, float]:
+    store = get_session_store(user_id)
+    if store is None:
+        return month_cache.get_monthly_summary(user_id, year, month)
+    return store.monthly_summary(year, month)
+
+
+def get_monthly_transactions(
+    user_id: str,
+    year: int,
+    month: int,
+    trans_type: Optional[str] = None
+) -> List[Transaction]:
+    store = get_session_store(user_id)
+    if store is None:
+        return month_cache.get_monthly_transactions(user_id, year, month, trans_type)
+    return store.monthly_transactions(year, month, trans_type)
+
+
+def prefetch_adjacent_months(
+    user_id: str,
+    year: int,
+    month: int,
+    available_months: List[Tuple[int, int, str]]
+) -> None:
+    """Warm the months around the one on screen (nothing to do in local mode)"""
+    if not is_local_mode():
+        month_cache.prefetch_adjacent_months(user_id, year, month, available_months)
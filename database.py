@@ -2,70 +2,663 @@
 FINANZAS PRO - Centralized Database Logic Layer
 Supabase + PostgreSQL Backend
 MULTI-USER SAAS VERSION - All functions require user_id for data isolation
+
+Streamlit-free: failures raise the exceptions in errors.py, configuration
+comes from configure() (or the environment), and the signed-in user from
+use_session() or the registered session provider. views/ui.py adapts it to
+the pages; the command line, jobs and worker threads use it directly.
 """
 
+import functools
+import hashlib
+import json
 import os
-from datetime import datetime, timedelta
+import re
+import threading
+import time
+import unicodedata
+from contextvars import ContextVar
+from datetime import datetime
 from dateutil.relativedelta import relativedelta
-from supabase import create_client, Client
-import streamlit as st
-from typing import Dict, List, Tuple, Optional
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple, Optional, TYPE_CHECKING
+
+from client_pool import DEFAULT_MAX_CLIENTS, AuthTokens, ClientPool
+from errors import ConfigurationError, ConflictError, DataError, DuplicateError, NotFoundError, ValidationError
+from models import Card, Transaction
+from payment_calendar import get_payment_calendar
+from single_flight import DEFAULT_TTL as DEFAULT_COALESCE_TTL, SingleFlight
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+class Settings(NamedTuple):
+    """
+    Data layer configuration, injected with configure(). The app builds it
+    from .streamlit/secrets.toml (views/ui.py); the command line and jobs use
+    Settings.from_env(). Optional features are off while their path is None.
+    client_factory replaces Supabase with a stand-in (benchmarks/local_backend.py).
+    service_key (the service role key) lets the write-queue worker flush rows
+    of users who are no longer signed in to this process.
+    """
+    supabase_url: Optional[str]
+    supabase_key: Optional[str]
+    write_queue_path: Optional[str] = None
+    disk_cache_path: Optional[str] = None
+    disk_cache_mb: Optional[int] = None
+    max_clients: int = DEFAULT_MAX_CLIENTS
+    coalesce_ttl: float = DEFAULT_COALESCE_TTL
+    client_factory: Optional[Callable[[], Any]] = None
+    service_key: Optional[str] = None
+    
+    @classmethod
+    def from_env(cls, supabase_url: Optional[str] = None, supabase_key: Optional[str] = None) -> "Settings":
+        """
+        Settings from the environment: SUPABASE_URL / SUPABASE_KEY (taking
+        precedence over the given credentials), FINANZAS_WRITE_QUEUE_PATH,
+        FINANZAS_DISK_CACHE_PATH, FINANZAS_DISK_CACHE_MB, FINANZAS_MAX_CLIENTS,
+        FINANZAS_COALESCE_TTL, SUPABASE_SERVICE_ROLE_KEY
+        """
+        if os.environ.get("SUPABASE_URL") and os.environ.get("SUPABASE_KEY"):
+            supabase_url, supabase_key = os.environ["SUPABASE_URL"], os.environ["SUPABASE_KEY"]
+        
+        disk_cache_mb = os.environ.get("FINANZAS_DISK_CACHE_MB")
+        return cls(
+            supabase_url=supabase_url,
+            supabase_key=supabase_key,
+            write_queue_path=os.environ.get("FINANZAS_WRITE_QUEUE_PATH") or None,
+            disk_cache_path=os.environ.get("FINANZAS_DISK_CACHE_PATH") or None,
+            disk_cache_mb=int(disk_cache_mb) if disk_cache_mb else None,
+            max_clients=int(os.environ.get("FINANZAS_MAX_CLIENTS", DEFAULT_MAX_CLIENTS)),
+            coalesce_ttl=float(os.environ.get("FINANZAS_COALESCE_TTL", DEFAULT_COALESCE_TTL)),
+            service_key=os.environ.get("SUPABASE_SERVICE_ROLE_KEY") or None
+        )
+
+
+_settings: Optional[Settings] = None
+
+
+def configure(settings: Settings) -> None:
+    """
+    Set the data layer configuration. Call it before the first query:
+    clients, the write queue and the disk cache are built once per process.
+    """
+    global _settings
+    _settings = settings
+
+
+def is_configured() -> bool:
+    return _settings is not None
+
+
+def get_settings() -> Settings:
+    """Injected settings, or Settings.from_env() when configure() was not called"""
+    if _settings is None:
+        configure(Settings.from_env())
+    return _settings
+
+
+def _process_wide(build: Callable[[], Any]) -> Callable[[], Any]:
+    """Build a resource once per process, on first use (safe across threads)"""
+    lock = threading.Lock()
+    built = []
+    
+    @functools.wraps(build)
+    def get():
+        if not built:
+            with lock:
+                if not built:
+                    built.append(build())
+        return built[0]
+    
+    return get
 
 # ============================================
 # SUPABASE CONNECTION
 # ============================================
 
-@st.cache_resource
-def get_supabase_client() -> Client:
-    """Initialize and cache Supabase client"""
-    url = st.secrets["supabase"]["url"]
-    key = st.secrets["supabase"]["key"]
-    return create_client(url, key)
+class UserSession:
+    """A signed-in user: their id and current tokens (refreshed in place)"""
+    
+    __slots__ = ("user_id", "tokens")
+    
+    def __init__(self, user_id: str, tokens: AuthTokens):
+        self.user_id = user_id
+        self.tokens = tokens
+
+
+# Session of the running thread (or task), set with use_session()
+_current_session: ContextVar[Optional[UserSession]] = ContextVar("finanzas_session", default=None)
+# Fallback lookup when no session was set (the app reads its session state)
+_session_provider: Callable[[], Optional[UserSession]] = lambda: None
+
+
+def use_session(session: Optional[UserSession]) -> None:
+    """Run the current thread's queries as `session` (None: the signed-out client)"""
+    _current_session.set(session)
+
+
+def set_session_provider(provider: Callable[[], Optional[UserSession]]) -> None:
+    """Register how to find the session when use_session() was not called"""
+    global _session_provider
+    _session_provider = provider
+
+
+def current_session() -> Optional[UserSession]:
+    return _current_session.get() or _session_provider()
+
+
+@_process_wide
+def _get_http_transport():
+    """Process-wide keep-alive connection pool shared by every client"""
+    import httpx
+    
+    return httpx.HTTPTransport(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    )
+
+
+def _new_client(key: Optional[str] = None) -> "Client":
+    """
+    Build a signed-out Supabase client (with the configured key unless another is given).
+    The supabase package (httpx, gotrue, postgrest, realtime...) is imported here
+    instead of at module level so the login page can paint before it is loaded.
+    """
+    settings = get_settings()
+    if settings.client_factory:
+        return settings.client_factory()
+    if not settings.supabase_url or not settings.supabase_key:
+        raise ConfigurationError("Supabase credentials not found")
+    
+    import httpx
+    from supabase import ClientOptions, create_client
+    
+    options = {"auto_refresh_token": False, "persist_session": False}
+    # Own httpx.Client (headers are per client) over the shared transport
+    if "httpx_client" in getattr(ClientOptions, "__dataclass_fields__", {}):
+        options["httpx_client"] = httpx.Client(transport=_get_http_transport())
+    
+    return create_client(settings.supabase_url, key or settings.supabase_key, options=ClientOptions(**options))
+
+
+@_process_wide
+def _get_base_client() -> "Client":
+    """Shared signed-out client (configured key): scheduler jobs, command line"""
+    return _new_client()
+
+
+@_process_wide
+def _get_service_client() -> Optional["Client"]:
+    """Shared client with the service role key (bypasses RLS), or None when not configured"""
+    service_key = get_settings().service_key
+    return _new_client(service_key) if service_key else None
+
+
+@_process_wide
+def get_client_pool() -> ClientPool:
+    """Process-wide pool of per-user authenticated clients"""
+    return ClientPool(_new_client, max_clients=get_settings().max_clients)
+
+
+def get_supabase_client() -> "Client":
+    """
+    Get the Supabase client for the current session: the signed-in user's own
+    client (queries run under their RLS policies), or the shared signed-out
+    client outside a signed-in session.
+    """
+    session = current_session()
+    if session is None:
+        return _get_base_client()
+    
+    client, session.tokens = get_client_pool().get(session.user_id, session.tokens)
+    return client
+
+
+def sign_in(email: str, password: str) -> Tuple[Any, UserSession]:
+    """
+    Sign in on a dedicated, pooled client.
+    Returns: (gotrue AuthResponse, session to keep for the user); raises on invalid credentials
+    """
+    response, tokens = get_client_pool().sign_in(email, password)
+    return response, UserSession(response.user.id, tokens)
+
+
+def sign_up(email: str, password: str) -> Tuple[Any, Optional[UserSession]]:
+    """
+    Register a user on a dedicated client; if Supabase returns a session
+    (email confirmation disabled) the client is pooled and the user is signed in.
+    Returns: (gotrue AuthResponse, session, or None until the email is confirmed)
+    """
+    client = _new_client()
+    response = client.auth.sign_up({"email": email, "password": password})
+    
+    if response.user and response.session:
+        tokens = get_client_pool().adopt(response.user.id, client, response.session)
+        return response, UserSession(response.user.id, tokens)
+    return response, None
+
+
+def sign_out(user_id: str) -> None:
+    """Revoke the user's session and drop their pooled client"""
+    get_client_pool().sign_out(user_id)
+
+# ============================================
+# DATA VERSIONS (Cache Invalidation)
+# ============================================
+
+# Process-wide write counters per user, per (user, year) and per (user, year, month).
+# Caches built on top of this layer include the relevant version in their key,
+# so every write path below invalidates exactly the periods it touched.
+_data_versions: Dict[tuple, int] = {}
+_data_versions_lock = threading.Lock()
+
+
+def get_data_version(user_id: str, year: Optional[int] = None, month: Optional[int] = None) -> int:
+    """
+    Get the write counter for a user, a user's year, or a user's month.
+    Returns: An int that changes whenever a write touches that scope
+    """
+    key = (user_id,) + tuple(part for part in (year, month) if part is not None)
+    return _data_versions.get(key, 0)
+
+
+def get_cache_epoch() -> int:
+    """
+    Get a counter that advances every coalesce_ttl seconds.
+    Caches keyed on a data version include it too: writes this process does
+    not count (another server process, the command line, scheduler jobs)
+    then show up within the read coalescer's TTL, as its results do.
+    """
+    ttl = get_settings().coalesce_ttl
+    if ttl <= 0:
+        # No sharing: a key that never repeats
+        return time.monotonic_ns()
+    return int(time.monotonic() // ttl)
+
+
+def _notify_write(user_id: str, payment_dates: List[str]) -> None:
+    """Bump data versions for every period touched by a write (YYYY-MM-DD dates)"""
+    scopes = {(user_id,)}
+    for payment_date in payment_dates:
+        year, month = int(payment_date[:4]), int(payment_date[5:7])
+        scopes.add((user_id, year))
+        scopes.add((user_id, year, month))
+    
+    with _data_versions_lock:
+        for scope in scopes:
+            _data_versions[scope] = _data_versions.get(scope, 0) + 1
+    
+    month_scopes = {_month_scope(user_id, *scope[1:]) for scope in scopes if len(scope) == 3}
+    coalescer = get_read_coalescer()
+    coalescer.invalidate(month_scopes | {_months_scope(user_id)})
+    
+    cache = get_disk_cache()
+    if payment_dates:
+        if cache:
+            cache.invalidate(month_scopes)
+    else:
+        # Scope unknown (e.g. a summary rebuild): drop all of the user's months
+        coalescer.invalidate_prefix(f"month:{user_id}:")
+        if cache:
+            cache.invalidate_prefix(f"month:{user_id}:")
+
+# ============================================
+# READ COALESCING
+# ============================================
+
+@_process_wide
+def get_read_coalescer() -> SingleFlight:
+    """
+    Get the process-wide single-flight layer: identical concurrent reads share
+    one query, and its result for coalesce_ttl (FINANZAS_COALESCE_TTL) seconds
+    """
+    return SingleFlight(ttl=get_settings().coalesce_ttl)
+
+
+def _coalesced(scope: str, key: Any, load, shared: bool = False):
+    """
+    Return load(), sharing it with identical reads in flight.
+    Only reads of the same session are shared (they run under the same RLS
+    policies), unless shared is set for tables every user can read.
+    """
+    if not shared:
+        session = current_session()
+        key = (key, session.user_id if session else None)
+    return get_read_coalescer().do(scope, key, load)
+
+
+def _months_scope(user_id: str) -> str:
+    return f"months:{user_id}"
+
+# ============================================
+# PERSISTENT READ CACHE (Optional)
+# ============================================
+
+@_process_wide
+def get_disk_cache():
+    """
+    Get the process-wide on-disk read cache, or None when it is disabled.
+    Enable it by pointing disk_cache_path (FINANZAS_DISK_CACHE_PATH) at a
+    SQLite file (disk_cache_mb bounds its size): card lists, USD rates and
+    closed months are then served from disk after a restart.
+    """
+    settings = get_settings()
+    if not settings.disk_cache_path:
+        return None
+    
+    from disk_cache import DEFAULT_MAX_BYTES, DiskCache
+    
+    max_bytes = settings.disk_cache_mb * 1024 * 1024 if settings.disk_cache_mb else DEFAULT_MAX_BYTES
+    return DiskCache(settings.disk_cache_path, max_bytes=max_bytes)
+
+
+def _month_scope(user_id: str, year: int, month: int) -> str:
+    return f"month:{user_id}:{year}-{month:02d}"
+
+
+def _is_closed_month(year: int, month: int) -> bool:
+    """True for payment months before the current one (only changed by our own writes)"""
+    today = datetime.now()
+    return (year, month) < (today.year, today.month)
+
+
+def _disk_cached(key: str, scope: str, load):
+    """Return load() (JSON-serializable), through the disk cache when enabled"""
+    cache = get_disk_cache()
+    if cache is None:
+        return load()
+    
+    value = cache.get(key, scope)
+    if value is None:
+        # Read before loading: a write meanwhile makes put() drop the value
+        generation = cache.generation(scope)
+        value = load()
+        cache.put(key, scope, generation, value)
+    return value
+
+
+def _invalidate_reads(scope: str) -> None:
+    """Drop a scope from the coalesced reads and the disk cache"""
+    get_read_coalescer().invalidate([scope])
+    cache = get_disk_cache()
+    if cache:
+        cache.invalidate([scope])
+
+# ============================================
+# LOCAL WRITE QUEUE (Optional)
+# ============================================
+
+@_process_wide
+def get_write_queue():
+    """
+    Get the process-wide write-ahead queue, or None when it is disabled.
+    Enable it by pointing write_queue_path (FINANZAS_WRITE_QUEUE_PATH) at a
+    SQLite file: transaction saves then return instantly and a background
+    worker flushes them to Supabase in batches.
+    """
+    path = get_settings().write_queue_path
+    if not path:
+        return None
+    
+    from write_queue import WriteQueue
+    
+    queue = WriteQueue(path, _flush_queued_rows)
+    queue.start()
+    return queue
+
+
+def _flush_queued_rows(rows: List[Dict]) -> None:
+    """
+    Write-queue flush: upsert each user's rows through that user's pooled
+    client, so their RLS policies apply, or through the service role client
+    when the user is not signed in here. Without either the batch fails and
+    is retried once the user signs in again.
+    The queue calls it with one user's rows at a time and deletes them once
+    it returns, so a failure never sends rows already written again.
+    """
+    by_user: Dict[str, List[Dict]] = {}
+    for row in rows:
+        # Bulk writes need the same keys on every row (rows queued before 009 have no hash)
+        row.setdefault("content_hash", None)
+        by_user.setdefault(row["user_id"], []).append(row)
+    
+    for user_id, user_rows in by_user.items():
+        supabase = get_client_pool().checkout(user_id) or _get_service_client()
+        if supabase is None:
+            raise ConfigurationError(
+                f"User {user_id} is not signed in and no service role key is configured"
+            )
+        
+        supabase.table("transactions") \
+            .upsert(user_rows, on_conflict=CONTENT_HASH_CONFLICT, ignore_duplicates=True) \
+            .execute()
+        
+        # Cached months were read without these (then pending) rows
+        scopes = {
+            _month_scope(user_id, int(row["payment_date"][:4]), int(row["payment_date"][5:7]))
+            for row in user_rows
+        }
+        get_read_coalescer().invalidate(scopes | {_months_scope(user_id)})
+        cache = get_disk_cache()
+        if cache:
+            cache.invalidate(scopes)
+
+
+def _insert_transactions(rows: List[Dict], card_name: Optional[str] = None) -> None:
+    """
+    Insert transaction rows in one call, through the write queue when enabled.
+    Rows whose content_hash already exists are skipped by the unique index.
+    """
+    queue = get_write_queue()
+    
+    if queue:
+        queue.enqueue(rows, card_name=card_name)
+    else:
+        get_supabase_client().table("transactions") \
+            .upsert(rows, on_conflict=CONTENT_HASH_CONFLICT, ignore_duplicates=True) \
+            .execute()
+
+
+def get_pending_transactions(
+    user_id: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    trans_type: Optional[str] = None
+) -> List[Transaction]:
+    """Get queued (not yet synced) rows so reads stay consistent with saves"""
+    queue = get_write_queue()
+    if not queue:
+        return []
+    
+    rows = Transaction.from_rows(queue.pending_rows(user_id, start_date, end_date))
+    if trans_type:
+        rows = [row for row in rows if row.type == trans_type]
+    return rows
+
+
+def get_sync_status(user_id: str) -> Optional[Tuple[int, int, Optional[str]]]:
+    """
+    Get the write queue status for a user.
+    Returns: (pending_rows, failing_rows, last_error), or None if the queue is disabled
+    """
+    try:
+        queue = get_write_queue()
+        return queue.status(user_id) if queue else None
+    except Exception as e:
+        raise DataError.wrap("Error reading sync status", e)
+
+# ============================================
+# IDEMPOTENCY (Content Hashes)
+# ============================================
+
+# Unique index (migrations/009) that makes a repeated row a no-op
+CONTENT_HASH_CONFLICT = "user_id,payment_date,content_hash"
+
+
+def content_hash(row: Dict, occurrence: int = 0) -> str:
+    """
+    Hash of what identifies a transaction: user, type, purchase date, amount,
+    category, description, card and installment (not payment_date, so a
+    re-import still matches after a closing-day change).
+    Text is compared casefolded with collapsed whitespace.
+    """
+    key = [
+        row["user_id"],
+        row["type"],
+        row["date"],
+        f"{float(row['amount']):.2f}",
+        " ".join((row.get("category") or "").split()).casefold(),
+        " ".join((row.get("description") or "").split()).casefold(),
+        row.get("card_id"),
+        row.get("installments_total") or 1,
+        row.get("installment_number") or 1,
+        occurrence
+    ]
+    payload = json.dumps(key, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def assign_content_hashes(rows: List[Dict]) -> List[Dict]:
+    """
+    Stamp content_hash on rows (in place). Identical rows within one batch,
+    e.g. two equal purchases on one statement, get distinct hashes.
+    """
+    seen: Dict[str, int] = {}
+    for row in rows:
+        base = content_hash(row)
+        occurrence = seen.get(base, 0)
+        seen[base] = occurrence + 1
+        row["content_hash"] = content_hash(row, occurrence) if occurrence else base
+    return rows
+
+
+def find_existing_hashes(user_id: str, rows: List[Dict]) -> set:
+    """
+    Which of the rows' content hashes are already stored (or queued).
+    One round-trip for any number of rows: the hashes go in the body of an
+    RPC call (migrations/009) instead of an IN list in the URL.
+    """
+    hashes = [row["content_hash"] for row in rows]
+    if not hashes:
+        return set()
+    
+    response = get_supabase_client().rpc(
+        "existing_content_hashes",
+        {
+            "p_user_id": user_id,
+            "p_hashes": hashes,
+            # payment_date is never before the purchase date
+            "p_since": min(row["date"] for row in rows)
+        }
+    ).execute()
+    existing = {record["content_hash"] for record in response.data}
+    
+    queue = get_write_queue()
+    if queue:
+        existing.update(row.get("content_hash") for row in queue.pending_rows(user_id))
+    
+    return existing & set(hashes)
+
+
+def _new_rows(user_id: str, rows: List[Dict], allow_duplicate: bool = False) -> List[Dict]:
+    """
+    Hash rows and drop the ones already stored. With allow_duplicate the
+    rows are saved without a hash (the user confirmed a genuine repeat).
+    """
+    if allow_duplicate:
+        for row in rows:
+            row["content_hash"] = None
+        return rows
+    
+    assign_content_hashes(rows)
+    existing = find_existing_hashes(user_id, rows)
+    return [row for row in rows if row["content_hash"] not in existing]
+
+
+def import_transactions(user_id: str, rows: List[Dict]) -> Tuple[int, int]:
+    """
+    Bulk-insert prepared transaction rows (e.g. a parsed statement) skipping
+    the ones already imported, with one pre-check query for the whole batch.
+    Re-importing the same rows is a no-op.
+    
+    Returns: (inserted, skipped)
+    """
+    try:
+        new_rows = _new_rows(user_id, rows)
+        
+        for i in range(0, len(new_rows), 1000):
+            _insert_transactions(new_rows[i:i + 1000])
+        if new_rows:
+            _notify_write(user_id, [row["payment_date"] for row in new_rows])
+        
+        return len(new_rows), len(rows) - len(new_rows)
+        
+    except Exception as e:
+        raise DataError.wrap("Error importing transactions", e)
 
 # ============================================
 # LOGIC A: CASH TRANSACTIONS (Immediate Impact)
 # ============================================
 
+def build_cash_row(
+    user_id: str,
+    trans_type: str,
+    date: datetime,
+    amount: float,
+    category: str,
+    description: str = ""
+) -> Dict:
+    """Transaction row for a Cash/Debit/Fixed/Income movement (payment_date = date)"""
+    # Validate type
+    if trans_type not in ['Income', 'Fixed', 'Debit']:
+        raise ValidationError(f"Invalid type for cash transaction: {trans_type}")
+    
+    # Prepare data with user_id
+    return {
+        "user_id": user_id,
+        "date": date.strftime("%Y-%m-%d"),
+        "payment_date": date.strftime("%Y-%m-%d"),  # LOGIC A: Same as transaction date
+        "amount": amount,
+        "category": category,
+        "description": description,
+        "type": trans_type,
+        "card_id": None,
+        "installments_total": 1,
+        "installment_number": 1
+    }
+
+
 def save_cash_transaction(
     user_id: str,
     trans_type: str,  # 'Income', 'Fixed', 'Debit'
     date: datetime,
     amount: float,
     category: str,
-    description: str = ""
+    description: str = "",
+    allow_duplicate: bool = False
 ) -> bool:
     """
     Save Cash/Debit/Fixed/Income transaction with user isolation.
     Rule: payment_date = date (Immediate impact)
+    An identical existing transaction (double submit) is not saved again
+    unless allow_duplicate is set.
     """
     try:
-        supabase = get_supabase_client()
+        data = build_cash_row(user_id, trans_type, date, amount, category, description)
         
-        # Validate type
-        if trans_type not in ['Income', 'Fixed', 'Debit']:
-            raise ValueError(f"Invalid type for cash transaction: {trans_type}")
+        if not _new_rows(user_id, [data], allow_duplicate):
+            raise DuplicateError("Ya existe un movimiento idéntico; no se guardó de nuevo.")
         
-        # Prepare data with user_id
-        data = {
-            "user_id": user_id,
-            "date": date.strftime("%Y-%m-%d"),
-            "payment_date": date.strftime("%Y-%m-%d"),  # LOGIC A: Same as transaction date
-            "amount": amount,
-            "category": category,
-            "description": description,
-            "type": trans_type,
-            "card_id": None,
-            "installments_total": 1,
-            "installment_number": 1
-        }
-        
-        # Insert into database
-        supabase.table("transactions").insert(data).execute()
+        # Insert into database (or the local write queue)
+        _insert_transactions([data])
+        _notify_write(user_id, [data["payment_date"]])
         return True
         
     except Exception as e:
-        st.error(f"Error saving transaction: {str(e)}")
-        return False
+        raise DataError.wrap("Error saving transaction", e)
 
 # ============================================
 # LOGIC B: CARD TRANSACTIONS (Calculated Payment Date)
@@ -98,34 +691,61 @@ def calculate_payment_date(
       → 29 > 28, so Next Month's statement (Jan 28)
       → Payment: Jan 28 + 10 days = Feb 7
     
-    Returns: Exact payment date (not first of month)
-    """
-    purchase_day = purchase_date.day
+    If closing_day doesn't exist in the statement month (e.g., Feb 30),
+    the last day of that month is the technical close.
     
-    # Step 1: Determine which statement month this purchase belongs to
-    if purchase_day <= closing_day:
-        # This month's statement
-        statement_month = purchase_date
-    else:
-        # Next month's statement
-        statement_month = purchase_date + relativedelta(months=1)
+    The dates come from the precomputed payment calendar (payment_calendar.py),
+    so bulk recomputations are table lookups.
     
-    # Step 2: Calculate Technical Close Date
-    # Handle edge case: if closing_day doesn't exist in statement month (e.g., Feb 30)
-    # Use the last day of that month instead
-    try:
-        technical_close_date = statement_month.replace(day=closing_day)
-    except ValueError:
-        # Closing day doesn't exist in this month (e.g., Feb 30)
-        # Use last day of the month
-        next_month = statement_month + relativedelta(months=1)
-        technical_close_date = next_month.replace(day=1) - timedelta(days=1)
+    Returns: Exact payment date (not first of month), of the purchase's type:
+    a date for a date, a datetime (same time of day) for a datetime
+    """
+    payment_date = get_payment_calendar().payment_date(purchase_date, closing_day)
+    timetz = getattr(purchase_date, "timetz", None)
+    if timetz is None:
+        return payment_date
+    return datetime.combine(payment_date, timetz())
+
+
+
+def build_card_rows(
+    user_id: str,
+    card_id: int,
+    closing_day: int,
+    date: datetime,
+    amount: float,
+    category: str,
+    description: str = "",
+    installments: int = 1
+) -> List[Dict]:
+    """Installment rows of a card purchase, scheduled from the card's closing_day"""
+    # Calculate starting payment month
+    base_payment_date = calculate_payment_date(date, closing_day)
     
-    # Step 3: Add 10-day grace period
-    payment_date = technical_close_date + timedelta(days=10)
+    # Calculate amount per installment
+    amount_per_installment = round(amount / installments, 2)
     
-    return payment_date
-
+    # Generate installment rows
+    rows = []
+    for i in range(installments):
+        # Calculate payment date for this installment
+        installment_payment_date = base_payment_date + relativedelta(months=i)
+        
+        # Prepare installment data with user_id
+        rows.append({
+            "user_id": user_id,
+            "date": date.strftime("%Y-%m-%d"),
+            "payment_date": installment_payment_date.strftime("%Y-%m-%d"),
+            "amount": amount_per_installment,
+            "category": category,
+            "description": description,
+            "type": "Card",
+            "card_id": card_id,
+            "installments_total": installments,
+            "installment_number": i + 1
+        })
+    
+    return rows
 
 
 def save_card_transaction(
@@ -135,12 +755,15 @@ def save_card_transaction(
     amount: float,
     category: str,
     description: str = "",
-    installments: int = 1
+    installments: int = 1,
+    allow_duplicate: bool = False
 ) -> Tuple[bool, List[str]]:
     """
     Save Credit Card transaction with installments and user isolation.
     
     Rule: payment_date is calculated at insertion time based on card's CURRENT closing_day.
+    Installments already stored (double submit) are not saved again unless
+    allow_duplicate is set.
     Returns: (success: bool, affected_months: List[str])
     """
     try:
@@ -149,108 +772,99 @@ def save_card_transaction(
         
         # Fetch card's current closing_day (must belong to user)
         card_response = supabase.table("credit_cards") \
-            .select("closing_day") \
+            .select("closing_day, name") \
             .eq("id", card_id) \
             .eq("user_id", user_id) \
             .execute()
         
         if not card_response.data:
-            st.error("Card not found or doesn't belong to you")
-            return False, []
+            raise NotFoundError("Card not found or doesn't belong to you")
         
         closing_day = card_response.data[0]["closing_day"]
         
-        # Calculate starting payment month
-        base_payment_date = calculate_payment_date(date, closing_day)
-        
-        # Calculate amount per installment
-        amount_per_installment = round(amount / installments, 2)
+        rows = build_card_rows(user_id, card_id, closing_day, date, amount, category, description, installments)
         
-        # Generate installment rows
-        for i in range(installments):
-            # Calculate payment date for this installment
-            installment_payment_date = base_payment_date + relativedelta(months=i)
-            
-            # Track affected month
-            month_str = installment_payment_date.strftime("%B %Y")
+        # Track affected months
+        for row in rows:
+            month_str = datetime.strptime(row["payment_date"], "%Y-%m-%d").strftime("%B %Y")
             if month_str not in affected_months:
                 affected_months.append(month_str)
-            
-            # Prepare installment data with user_id
-            data = {
-                "user_id": user_id,
-                "date": date.strftime("%Y-%m-%d"),
-                "payment_date": installment_payment_date.strftime("%Y-%m-%d"),
-                "amount": amount_per_installment,
-                "category": category,
-                "description": description,
-                "type": "Card",
-                "card_id": card_id,
-                "installments_total": installments,
-                "installment_number": i + 1
-            }
-            
-            # Insert into database
-            supabase.table("transactions").insert(data).execute()
+        
+        rows = _new_rows(user_id, rows, allow_duplicate)
+        if not rows:
+            raise DuplicateError("Esta compra ya estaba registrada; no se guardó de nuevo.")
+        
+        # Insert all installments in a single call (or the local write queue)
+        _insert_transactions(rows, card_name=card_response.data[0]["name"])
+        _notify_write(user_id, [row["payment_date"] for row in rows])
         
         return True, affected_months
         
     except Exception as e:
-        st.error(f"Error saving card transaction: {str(e)}")
-        return False, []
+        raise DataError.wrap("Error saving card transaction", e)
 
 # ============================================
 # DASHBOARD QUERIES
 # ============================================
 
+MONTH_NAMES = {
+    1: "Enero", 2: "Febrero", 3: "Marzo", 4: "Abril",
+    5: "Mayo", 6: "Junio", 7: "Julio", 8: "Agosto",
+    9: "Septiembre", 10: "Octubre", 11: "Noviembre", 12: "Diciembre"
+}
+
+
+# Transaction type -> monthly summary key
+SUMMARY_KEYS = {
+    "Income": "income",
+    "Fixed": "fixed",
+    "Debit": "debit",
+    "Card": "card"
+}
+
+
+def format_month(year: int, month: int) -> str:
+    """Display string for a month selector entry (e.g. 'Enero 2025')"""
+    return f"{MONTH_NAMES[month]} {year}"
+
+
 def get_available_months(user_id: str) -> List[Tuple[int, int, str]]:
     """
     Get list of months with transactions based on payment_date (user-specific).
+    Reads the trigger-maintained monthly_summary table (one row per month).
     Returns: List of (year, month, display_string) tuples
     """
     try:
         supabase = get_supabase_client()
         
-        # Get distinct payment_dates for this user
-        response = supabase.table("transactions") \
-            .select("payment_date") \
-            .eq("user_id", user_id) \
-            .execute()
+        def fetch_months() -> List[Dict]:
+            return supabase.table("monthly_summary") \
+                .select("year, month") \
+                .eq("user_id", user_id) \
+                .execute() \
+                .data
         
-        if not response.data:
-            return []
+        records = _coalesced(_months_scope(user_id), "available", fetch_months)
+        months_set = {(record["year"], record["month"]) for record in records}
         
-        # Extract unique year-month combinations
-        months_set = set()
-        for record in response.data:
-            payment_date = datetime.strptime(record["payment_date"], "%Y-%m-%d")
-            months_set.add((payment_date.year, payment_date.month))
+        # Include rows still waiting in the local write queue
+        for record in get_pending_transactions(user_id):
+            months_set.add((record.payment_date.year, record.payment_date.month))
         
         # Sort by year, month (most recent first)
         sorted_months = sorted(months_set, reverse=True)
         
         # Convert to display format
-        month_names = {
-            1: "Enero", 2: "Febrero", 3: "Marzo", 4: "Abril",
-            5: "Mayo", 6: "Junio", 7: "Julio", 8: "Agosto",
-            9: "Septiembre", 10: "Octubre", 11: "Noviembre", 12: "Diciembre"
-        }
-        
-        result = []
-        for year, month in sorted_months:
-            display = f"{month_names[month]} {year}"
-            result.append((year, month, display))
-        
-        return result
+        return [(year, month, format_month(year, month)) for year, month in sorted_months]
         
     except Exception as e:
-        st.error(f"Error fetching available months: {str(e)}")
-        return []
+        raise DataError.wrap("Error fetching available months", e)
 
 
 def get_monthly_summary(user_id: str, year: int, month: int) -> Dict[str, float]:
     """
     Get financial summary for a specific month based on payment_date (user-specific).
+    Reads one pre-aggregated monthly_summary row instead of the month's transactions.
     
     Returns: Dict with keys:
         - 'income': Total income
@@ -262,20 +876,22 @@ def get_monthly_summary(user_id: str, year: int, month: int) -> Dict[str, float]
     try:
         supabase = get_supabase_client()
         
-        # Build date range for the month
-        start_date = datetime(year, month, 1)
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1)
+        def fetch_summary() -> List[Dict]:
+            return supabase.table("monthly_summary") \
+                .select("income, fixed, debit, card") \
+                .eq("user_id", user_id) \
+                .eq("year", year) \
+                .eq("month", month) \
+                .execute() \
+                .data
+        
+        scope = _month_scope(user_id, year, month)
+        if _is_closed_month(year, month):
+            records = _coalesced(scope, "summary", lambda: _disk_cached(
+                f"summary:{user_id}:{year}-{month:02d}", scope, fetch_summary
+            ))
         else:
-            end_date = datetime(year, month + 1, 1)
-        
-        # Query transactions for the month (user-specific)
-        response = supabase.table("transactions") \
-            .select("type, amount") \
-            .eq("user_id", user_id) \
-            .gte("payment_date", start_date.strftime("%Y-%m-%d")) \
-            .lt("payment_date", end_date.strftime("%Y-%m-%d")) \
-            .execute()
+            records = _coalesced(scope, "summary", fetch_summary)
         
         # Initialize summary
         summary = {
@@ -286,52 +902,269 @@ def get_monthly_summary(user_id: str, year: int, month: int) -> Dict[str, float]
             "net_balance": 0.0
         }
         
-        # Aggregate by type
-        for record in response.data:
-            trans_type = record["type"]
-            amount = float(record["amount"])
+        for record in records:
+            for key in ("income", "fixed", "debit", "card"):
+                summary[key] += float(record[key])
+        
+        # Include rows still waiting in the local write queue
+        start_date = datetime(year, month, 1)
+        end_date = start_date + relativedelta(months=1)
+        pending = get_pending_transactions(
+            user_id, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+        )
+        
+        for record in pending:
+            key = SUMMARY_KEYS.get(record.type)
+            if key:
+                summary[key] += record.amount
+        
+        # Calculate net balance
+        total_expenses = summary["fixed"] + summary["debit"] + summary["card"]
+        summary["net_balance"] = summary["income"] - total_expenses
+        
+        return summary
+        
+    except Exception as e:
+        raise DataError.wrap("Error fetching monthly summary", e)
+
+
+def rebuild_monthly_summary(user_id: Optional[str] = None) -> int:
+    """
+    Recompute monthly_summary from raw transactions (one user, or everyone).
+    Returns: Number of summary rows written
+    """
+    try:
+        supabase = get_supabase_client()
+        response = supabase.rpc("rebuild_monthly_summary", {"p_user_id": user_id}).execute()
+        
+        if user_id:
+            _notify_write(user_id, [])
+        
+        return int(response.data or 0)
+        
+    except Exception as e:
+        raise DataError.wrap("Error rebuilding monthly summary", e)
+
+
+def check_monthly_summary(user_id: Optional[str] = None) -> List[Dict]:
+    """
+    Compare monthly_summary against the raw transactions.
+    Returns: List of mismatching (user, year, month) rows with summary_* and
+             actual_* columns (empty if consistent)
+    """
+    try:
+        supabase = get_supabase_client()
+        response = supabase.rpc("check_monthly_summary", {"p_user_id": user_id}).execute()
+        return response.data or []
+        
+    except Exception as e:
+        raise DataError.wrap("Error checking monthly summary", e)
+
+# ============================================
+# CATEGORY BUDGETS
+# ============================================
+
+def get_category_budgets(user_id: str) -> List[Dict]:
+    """Get the user's category budgets (category, monthly_limit, alert_pct)"""
+    try:
+        supabase = get_supabase_client()
+        
+        def fetch_budgets() -> List[Dict]:
+            return supabase.table("category_budgets") \
+                .select("category, monthly_limit, alert_pct") \
+                .eq("user_id", user_id) \
+                .order("category") \
+                .execute() \
+                .data
+        
+        return _coalesced(f"budgets:{user_id}", "all", fetch_budgets)
+        
+    except Exception as e:
+        raise DataError.wrap("Error fetching budgets", e)
+
+
+def save_category_budget(user_id: str, category: str, monthly_limit: float, alert_pct: int = 80) -> bool:
+    """Create or update the monthly budget of a category"""
+    try:
+        supabase = get_supabase_client()
+        
+        supabase.table("category_budgets").upsert({
+            "user_id": user_id,
+            "category": category,
+            "monthly_limit": monthly_limit,
+            "alert_pct": alert_pct
+        }, on_conflict="user_id,category").execute()
+        
+        _invalidate_reads(f"budgets:{user_id}")
+        return True
+        
+    except Exception as e:
+        raise DataError.wrap("Error saving budget", e)
+
+
+def delete_category_budget(user_id: str, category: str) -> bool:
+    """Remove a category's budget (its spend keeps being tracked)"""
+    try:
+        supabase = get_supabase_client()
+        
+        supabase.table("category_budgets") \
+            .delete() \
+            .eq("user_id", user_id) \
+            .eq("category", category) \
+            .execute()
+        
+        _invalidate_reads(f"budgets:{user_id}")
+        return True
+        
+    except Exception as e:
+        raise DataError.wrap("Error deleting budget", e)
+
+
+def get_budget_status(user_id: str, year: int, month: int) -> List[Dict]:
+    """
+    Compare each budget with the month's spend (by payment_date).
+    Reads the budgets and one trigger-maintained category_spend row per
+    budgeted category, so the cost grows with budgets, not transactions.
+    
+    Returns: List of dicts (most consumed first) with keys:
+        - 'category', 'limit', 'spent', 'remaining', 'alert_pct'
+        - 'ratio': spent / limit
+        - 'status': 'ok', 'warning' (ratio >= alert_pct) or 'exceeded' (ratio > 1)
+    """
+    try:
+        budgets = get_category_budgets(user_id)
+        if not budgets:
+            return []
+        
+        supabase = get_supabase_client()
+        categories = tuple(budget["category"] for budget in budgets)
+        
+        def fetch_spend() -> List[Dict]:
+            return supabase.table("category_spend") \
+                .select("category, amount") \
+                .eq("user_id", user_id) \
+                .eq("year", year) \
+                .eq("month", month) \
+                .in_("category", list(categories)) \
+                .execute() \
+                .data
+        
+        records = _coalesced(_month_scope(user_id, year, month), ("spend", categories), fetch_spend)
+        spent = {record["category"]: float(record["amount"]) for record in records}
+        
+        # Include expenses still waiting in the local write queue
+        start_date = datetime(year, month, 1)
+        end_date = start_date + relativedelta(months=1)
+        for record in get_pending_transactions(
+            user_id, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+        ):
+            if record.type != "Income":
+                spent[record.category] = spent.get(record.category, 0.0) + record.amount
+        
+        status = []
+        for budget in budgets:
+            limit = float(budget["monthly_limit"])
+            amount = spent.get(budget["category"], 0.0)
+            ratio = amount / limit
+            
+            if ratio > 1:
+                level = "exceeded"
+            elif ratio * 100 >= budget["alert_pct"]:
+                level = "warning"
+            else:
+                level = "ok"
             
-            if trans_type == "Income":
-                summary["income"] += amount
-            elif trans_type == "Fixed":
-                summary["fixed"] += amount
-            elif trans_type == "Debit":
-                summary["debit"] += amount
-            elif trans_type == "Card":
-                summary["card"] += amount
+            status.append({
+                "category": budget["category"],
+                "limit": limit,
+                "spent": amount,
+                "remaining": limit - amount,
+                "alert_pct": budget["alert_pct"],
+                "ratio": ratio,
+                "status": level
+            })
+        
+        return sorted(status, key=lambda item: item["ratio"], reverse=True)
+        
+    except Exception as e:
+        raise DataError.wrap("Error fetching budget status", e)
+
+
+def get_category_spend(user_id: str, start_date: str, end_date: str) -> List[Dict]:
+    """
+    Get expenses per category and month for months in [start_date, end_date).
+    Reads the trigger-maintained category_spend rows (one per month and
+    category) instead of the raw transactions, plus rows still waiting in the
+    local write queue.
+    
+    Returns: List of dicts with keys 'year', 'month', 'category', 'amount'
+    """
+    try:
+        supabase = get_supabase_client()
+        start = datetime.strptime(start_date, "%Y-%m-%d")
+        end = datetime.strptime(end_date, "%Y-%m-%d")
         
-        # Calculate net balance
-        total_expenses = summary["fixed"] + summary["debit"] + summary["card"]
-        summary["net_balance"] = summary["income"] - total_expenses
+        records = supabase.table("category_spend") \
+            .select("year, month, category, amount") \
+            .eq("user_id", user_id) \
+            .gte("year", start.year) \
+            .lte("year", end.year) \
+            .execute() \
+            .data
+        
+        spend = {}
+        for record in records:
+            if (start.year, start.month) <= (record["year"], record["month"]) < (end.year, end.month):
+                key = (record["year"], record["month"], record["category"])
+                spend[key] = float(record["amount"])
+        
+        for record in get_pending_transactions(user_id, start_date, end_date):
+            if record.type != "Income":
+                key = (record.payment_date.year, record.payment_date.month, record.category)
+                spend[key] = spend.get(key, 0.0) + record.amount
+        
+        return [
+            {"year": year, "month": month, "category": category, "amount": amount}
+            for (year, month, category), amount in spend.items()
+        ]
         
-        return summary
+    except Exception as e:
+        raise DataError.wrap("Error fetching category spend", e)
+
+
+def rebuild_category_spend(user_id: Optional[str] = None) -> int:
+    """
+    Recompute category_spend from raw transactions (one user, or everyone).
+    Returns: Number of rows written
+    """
+    try:
+        supabase = get_supabase_client()
+        response = supabase.rpc("rebuild_category_spend", {"p_user_id": user_id}).execute()
+        return int(response.data or 0)
         
     except Exception as e:
-        st.error(f"Error fetching monthly summary: {str(e)}")
-        return {
-            "income": 0.0,
-            "fixed": 0.0,
-            "debit": 0.0,
-            "card": 0.0,
-            "net_balance": 0.0
-        }
+        raise DataError.wrap("Error rebuilding category spend", e)
 
 # ============================================
 # CARD MANAGEMENT
 # ============================================
 
-def get_all_cards(user_id: str) -> List[Dict]:
+def get_all_cards(user_id: str) -> List[Card]:
     """Get all credit cards for the authenticated user"""
     try:
         supabase = get_supabase_client()
-        response = supabase.table("credit_cards") \
-            .select("*") \
-            .eq("user_id", user_id) \
-            .execute()
-        return response.data
+        
+        def fetch_cards() -> List[Dict]:
+            return supabase.table("credit_cards") \
+                .select("*") \
+                .eq("user_id", user_id) \
+                .execute() \
+                .data
+        
+        scope = f"cards:{user_id}"
+        return Card.from_rows(_coalesced(scope, "all", lambda: _disk_cached(scope, scope, fetch_cards)))
     except Exception as e:
-        st.error(f"Error fetching cards: {str(e)}")
-        return []
+        raise DataError.wrap("Error fetching cards", e)
 
 
 def update_card_closing(user_id: str, card_id: int, new_closing_day: int) -> bool:
@@ -344,8 +1177,7 @@ def update_card_closing(user_id: str, card_id: int, new_closing_day: int) -> boo
         
         # Validate closing day
         if not (1 <= new_closing_day <= 31):
-            st.error("Closing day must be between 1 and 31")
-            return False
+            raise ValidationError("Closing day must be between 1 and 31")
         
         # Update card (only if user owns it)
         supabase.table("credit_cards") \
@@ -354,11 +1186,108 @@ def update_card_closing(user_id: str, card_id: int, new_closing_day: int) -> boo
             .eq("user_id", user_id) \
             .execute()
         
+        _invalidate_reads(f"cards:{user_id}")
         return True
         
     except Exception as e:
-        st.error(f"Error updating card: {str(e)}")
-        return False
+        raise DataError.wrap("Error updating card", e)
+
+
+def reschedule_card_installments(
+    user_id: str,
+    card_id: int,
+    from_date: Optional[datetime] = None
+) -> Dict:
+    """
+    Recompute payment_date of a card's not-yet-due rows with its CURRENT closing_day.
+    
+    Opt-in exception to Snapshot Date Logic, for when the bank moves the
+    closing date. Rows with payment_date >= from_date (default: today) are
+    recomputed as calculate_payment_date(date, closing_day) + (installment_number - 1) months.
+    Each distinct purchase date / month offset is computed once, and all changed
+    rows are written with a single bulk update.
+    
+    Returns:
+        Dict with keys:
+            - 'updated': Number of rows whose payment_date changed
+            - 'months': [{'month': 'YYYY-MM', 'before': total, 'after': total}] for affected months
+    """
+    try:
+        supabase = get_supabase_client()
+        from_date = from_date or datetime.now()
+        
+        card_response = supabase.table("credit_cards") \
+            .select("closing_day") \
+            .eq("id", card_id) \
+            .eq("user_id", user_id) \
+            .execute()
+        
+        if not card_response.data:
+            raise NotFoundError("Card not found or doesn't belong to you")
+        
+        closing_day = card_response.data[0]["closing_day"]
+        
+        rows = _fetch_all_pages(
+            lambda: supabase.table("transactions")
+                .select("id, date, payment_date, amount, installment_number")
+                .eq("user_id", user_id)
+                .eq("card_id", card_id)
+                .gte("payment_date", from_date.strftime("%Y-%m-%d"))
+                .order("id")
+        )
+        
+        # Distinct purchase dates and month offsets repeat across installments,
+        # so each one is computed once for the whole pass
+        base_dates: Dict[str, datetime] = {}
+        shifted: Dict[Tuple[str, int], str] = {}
+        
+        ids, new_dates, old_dates = [], [], []
+        totals_before: Dict[str, float] = {}
+        totals_after: Dict[str, float] = {}
+        
+        for row in rows:
+            key = (row["date"], row["installment_number"])
+            if key not in shifted:
+                if row["date"] not in base_dates:
+                    base_dates[row["date"]] = calculate_payment_date(
+                        datetime.strptime(row["date"], "%Y-%m-%d"), closing_day
+                    )
+                new_date = base_dates[row["date"]] + relativedelta(months=row["installment_number"] - 1)
+                shifted[key] = new_date.strftime("%Y-%m-%d")
+            
+            new_payment_date = shifted[key]
+            amount = float(row["amount"])
+            
+            old_month, new_month = row["payment_date"][:7], new_payment_date[:7]
+            totals_before[old_month] = totals_before.get(old_month, 0.0) + amount
+            totals_after[new_month] = totals_after.get(new_month, 0.0) + amount
+            
+            if new_payment_date != row["payment_date"]:
+                ids.append(row["id"])
+                new_dates.append(new_payment_date)
+                old_dates.append(row["payment_date"])
+        
+        if ids:
+            supabase.rpc("reschedule_transactions", {
+                "p_user_id": user_id,
+                "p_ids": ids,
+                "p_payment_dates": new_dates
+            }).execute()
+            
+            _notify_write(user_id, old_dates + new_dates)
+        
+        # Card payments per month (this card's not-yet-due rows) before and after
+        months = []
+        for month in sorted(set(totals_before) | set(totals_after)):
+            previous_total = round(totals_before.get(month, 0.0), 2)
+            new_total = round(totals_after.get(month, 0.0), 2)
+            if previous_total != new_total:
+                months.append({"month": month, "before": previous_total, "after": new_total})
+        
+        return {"updated": len(ids), "months": months}
+        
+    except Exception as e:
+        raise DataError.wrap("Error rescheduling installments", e)
 
 
 def create_default_cards(user_id: str) -> bool:
@@ -384,11 +1313,11 @@ def create_default_cards(user_id: str) -> bool:
         ]
         
         supabase.table("credit_cards").insert(default_cards).execute()
+        _invalidate_reads(f"cards:{user_id}")
         return True
         
     except Exception as e:
-        st.error(f"Error creating default cards: {str(e)}")
-        return False
+        raise DataError.wrap("Error creating default cards", e)
 
 
 def create_card(user_id: str, name: str, closing_day: int) -> bool:
@@ -408,13 +1337,11 @@ def create_card(user_id: str, name: str, closing_day: int) -> bool:
         
         # Validate closing day
         if not (1 <= closing_day <= 31):
-            st.error("El día de cierre debe estar entre 1 y 31")
-            return False
+            raise ValidationError("El día de cierre debe estar entre 1 y 31")
         
         # Validate name
         if not name or not name.strip():
-            st.error("El nombre de la tarjeta no puede estar vacío")
-            return False
+            raise ValidationError("El nombre de la tarjeta no puede estar vacío")
         
         # Check for duplicate name for this user
         existing = supabase.table("credit_cards") \
@@ -424,8 +1351,7 @@ def create_card(user_id: str, name: str, closing_day: int) -> bool:
             .execute()
         
         if existing.data:
-            st.error(f"Ya tienes una tarjeta con el nombre '{name}'")
-            return False
+            raise DuplicateError(f"Ya tienes una tarjeta con el nombre '{name}'")
         
         # Create the card
         data = {
@@ -435,11 +1361,11 @@ def create_card(user_id: str, name: str, closing_day: int) -> bool:
         }
         
         supabase.table("credit_cards").insert(data).execute()
+        _invalidate_reads(f"cards:{user_id}")
         return True
         
     except Exception as e:
-        st.error(f"Error creating card: {str(e)}")
-        return False
+        raise DataError.wrap("Error creating card", e)
 
 
 def delete_card(user_id: str, card_id: int) -> bool:
@@ -465,8 +1391,7 @@ def delete_card(user_id: str, card_id: int) -> bool:
             .execute()
         
         if transactions.data:
-            st.warning("⚠️ No se puede eliminar la tarjeta porque tiene transacciones asociadas. Elimina las transacciones primero.")
-            return False
+            raise ConflictError("No se puede eliminar la tarjeta porque tiene transacciones asociadas. Elimina las transacciones primero.")
         
         # Delete the card (only if user owns it)
         response = supabase.table("credit_cards") \
@@ -476,26 +1401,183 @@ def delete_card(user_id: str, card_id: int) -> bool:
             .execute()
         
         if response.data:
-            st.success(f"✅ Tarjeta eliminada correctamente")
+            _invalidate_reads(f"cards:{user_id}")
             return True
         else:
-            st.warning("⚠️ No se encontró la tarjeta o no te pertenece")
-            return False
+            raise NotFoundError("No se encontró la tarjeta o no te pertenece")
             
     except Exception as e:
-        st.error(f"Error deleting card: {str(e)}")
-        return False
+        raise DataError.wrap("Error deleting card", e)
+
+# ============================================
+# RECURRING RULES
+# ============================================
+
+def get_recurring_rules(user_id: str, trans_type: Optional[str] = None) -> List[Dict]:
+    """Get the user's recurring rules, optionally filtered by type"""
+    try:
+        supabase = get_supabase_client()
+        query = supabase.table("recurring_rules") \
+            .select("*") \
+            .eq("user_id", user_id)
+        
+        if trans_type:
+            query = query.eq("type", trans_type)
+        
+        return query.order("day_of_month").execute().data
+    except Exception as e:
+        raise DataError.wrap("Error fetching recurring rules", e)
+
+
+def create_recurring_rule(
+    user_id: str,
+    trans_type: str,
+    amount: float,
+    category: str,
+    day_of_month: int,
+    start_date: datetime,
+    end_date: Optional[datetime] = None,
+    description: str = "",
+    indexation_pct: float = 0.0,
+    indexation_every_months: int = 12
+) -> bool:
+    """
+    Create a monthly recurring income/expense rule.
+    
+    Args:
+        user_id: User's ID
+        trans_type: 'Income', 'Fixed' or 'Debit' (Logic A types only)
+        amount: Amount of the first occurrence
+        category: Category of every occurrence
+        day_of_month: 1-31, clamped to the month's last day (e.g. 31 → Feb 28)
+        start_date: First date an occurrence may fall on
+        end_date: Last date an occurrence may fall on (None = open-ended)
+        description: Description of every occurrence
+        indexation_pct: Percentage increase applied every indexation_every_months
+        indexation_every_months: Indexation period in months
+        
+    Returns:
+        bool: True if creation was successful
+    """
+    try:
+        supabase = get_supabase_client()
+        
+        if trans_type not in ['Income', 'Fixed', 'Debit']:
+            raise ValidationError(f"Tipo inválido para una regla recurrente: {trans_type}")
+        
+        if not (1 <= day_of_month <= 31):
+            raise ValidationError("El día del mes debe estar entre 1 y 31")
+        
+        if end_date and end_date < start_date:
+            raise ValidationError("La fecha de fin no puede ser anterior a la de inicio")
+        
+        data = {
+            "user_id": user_id,
+            "type": trans_type,
+            "amount": amount,
+            "category": category,
+            "description": description,
+            "day_of_month": day_of_month,
+            "start_date": start_date.strftime("%Y-%m-%d"),
+            "end_date": end_date.strftime("%Y-%m-%d") if end_date else None,
+            "indexation_pct": indexation_pct,
+            "indexation_every_months": indexation_every_months
+        }
+        
+        supabase.table("recurring_rules").insert(data).execute()
+        return True
+        
+    except Exception as e:
+        raise DataError.wrap("Error creating recurring rule", e)
+
+
+def get_due_recurring_rules(through: str, user_id: Optional[str] = None) -> List[Dict]:
+    """
+    Get rules with occurrences not yet materialized up to `through` (YYYY-MM-DD).
+    With user_id=None, returns due rules for every user (scheduler job).
+    """
+    try:
+        supabase = get_supabase_client()
+        
+        def build_query():
+            query = supabase.table("recurring_rules") \
+                .select("*") \
+                .lte("start_date", through) \
+                .or_(f"materialized_through.is.null,materialized_through.lt.{through}")
+            if user_id:
+                query = query.eq("user_id", user_id)
+            return query.order("id")
+        
+        return _fetch_all_pages(build_query)
+    except Exception as e:
+        raise DataError.wrap("Error fetching recurring rules", e)
+
+
+def save_recurring_occurrences(rows: List[Dict], rule_ids: List[int], through: str) -> bool:
+    """
+    Bulk-insert materialized occurrences and advance the rules' watermark.
+    Occurrences already present (same rule and payment_date) are skipped,
+    so re-running after a partial failure is safe.
+    """
+    try:
+        supabase = get_supabase_client()
+        
+        for i in range(0, len(rows), 1000):
+            supabase.table("transactions") \
+                .upsert(rows[i:i + 1000], on_conflict="recurring_rule_id,payment_date", ignore_duplicates=True) \
+                .execute()
+        
+        for i in range(0, len(rule_ids), 500):
+            supabase.table("recurring_rules") \
+                .update({"materialized_through": through}) \
+                .in_("id", rule_ids[i:i + 500]) \
+                .execute()
+        
+        dates_by_user: Dict[str, List[str]] = {}
+        for row in rows:
+            dates_by_user.setdefault(row["user_id"], []).append(row["payment_date"])
+        for user_id, payment_dates in dates_by_user.items():
+            _notify_write(user_id, payment_dates)
+        
+        return True
+        
+    except Exception as e:
+        raise DataError.wrap("Error saving recurring occurrences", e)
+
+
+def delete_recurring_rule(user_id: str, rule_id: int) -> bool:
+    """
+    Delete a recurring rule (user must own it).
+    Occurrences already materialized stay as regular transactions.
+    """
+    try:
+        supabase = get_supabase_client()
+        response = supabase.table("recurring_rules") \
+            .delete() \
+            .eq("id", rule_id) \
+            .eq("user_id", user_id) \
+            .execute()
+        return bool(response.data)
+    except Exception as e:
+        raise DataError.wrap("Error deleting recurring rule", e)
 
 # ============================================
 # TRANSACTION QUERIES
 # ============================================
 
+# Explicit column list: "*" would also ship the search_vector column
+TRANSACTION_COLUMNS = (
+    "id, created_at, user_id, date, payment_date, amount, category, description, type, "
+    "card_id, installments_total, installment_number, recurring_rule_id, credit_cards(name)"
+)
+
+
 def get_monthly_transactions(
     user_id: str,
     year: int,
     month: int,
     trans_type: Optional[str] = None
-) -> List[Dict]:
+) -> List[Transaction]:
     """
     Get all transactions for a specific month (user-specific).
     Optionally filter by type.
@@ -512,7 +1594,7 @@ def get_monthly_transactions(
         
         # Build query (user-specific)
         query = supabase.table("transactions") \
-            .select("*, credit_cards(name)") \
+            .select(TRANSACTION_COLUMNS) \
             .eq("user_id", user_id) \
             .gte("payment_date", start_date.strftime("%Y-%m-%d")) \
             .lt("payment_date", end_date.strftime("%Y-%m-%d"))
@@ -522,13 +1604,246 @@ def get_monthly_transactions(
             query = query.eq("type", trans_type)
         
         # Execute and order by date
-        response = query.order("date", desc=True).execute()
+        def fetch_rows() -> List[Dict]:
+            return query.order("date", desc=True).execute().data
+        
+        scope = _month_scope(user_id, year, month)
+        key = f"transactions:{trans_type or 'all'}"
+        if _is_closed_month(year, month):
+            rows = _coalesced(scope, key, lambda: _disk_cached(
+                f"transactions:{user_id}:{year}-{month:02d}:{trans_type or 'all'}", scope, fetch_rows
+            ))
+        else:
+            rows = _coalesced(scope, key, fetch_rows)
+        
+        # Include rows still waiting in the local write queue
+        pending = get_pending_transactions(
+            user_id, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"), trans_type
+        )
+        transactions = Transaction.from_rows(rows)
+        if pending:
+            return sorted(transactions + pending, key=lambda t: t.date, reverse=True)
         
-        return response.data
+        return transactions
         
     except Exception as e:
-        st.error(f"Error fetching transactions: {str(e)}")
-        return []
+        raise DataError.wrap("Error fetching transactions", e)
+
+
+def get_transactions_in_range(
+    user_id: str,
+    start_date: str,
+    end_date: str,
+    columns: str = TRANSACTION_COLUMNS,
+    card_id: Optional[int] = None
+) -> List[Transaction]:
+    """
+    Get every transaction with payment_date in [start_date, end_date) (user-specific).
+    Pages through results so multi-year ranges are not cut at the API row limit.
+    Includes rows still waiting in the local write queue.
+    With card_id, only that card's rows (served by the (user_id, card_id, payment_date) index).
+    """
+    try:
+        supabase = get_supabase_client()
+        
+        def build_query():
+            query = supabase.table("transactions") \
+                .select(columns) \
+                .eq("user_id", user_id)
+            if card_id is not None:
+                query = query.eq("card_id", card_id)
+            return query \
+                .gte("payment_date", start_date) \
+                .lt("payment_date", end_date) \
+                .order("id")
+        
+        pending = get_pending_transactions(user_id, start_date, end_date)
+        if card_id is not None:
+            pending = [row for row in pending if row.card_id == card_id]
+        
+        return Transaction.from_rows(_fetch_all_pages(build_query)) + pending
+        
+    except Exception as e:
+        raise DataError.wrap("Error fetching transactions", e)
+
+
+def _fetch_all_pages(build_query, page_size: int = 1000) -> List[Dict]:
+    """
+    Run a query page by page until exhausted.
+    build_query must return a fresh, ordered query builder on every call.
+    """
+    rows = []
+    offset = 0
+    
+    while True:
+        page = build_query().range(offset, offset + page_size - 1).execute().data
+        rows.extend(page)
+        
+        if len(page) < page_size:
+            return rows
+        offset += page_size
+
+
+# ============================================
+# SEARCH
+# ============================================
+
+def search_terms(text: str) -> List[str]:
+    """
+    Split a search query or a description into accent-free, casefolded words
+    (the same normalization as the search_vector column).
+    """
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return re.findall(r"\w+", stripped.casefold())
+
+
+def search_transactions(
+    user_id: str,
+    query: str,
+    page: int = 0,
+    page_size: int = 25,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    trans_type: Optional[str] = None
+) -> Tuple[List[Transaction], int]:
+    """
+    Full-text search over description and category (user-specific).
+    Every word must match as a prefix ("merca libre" finds "Mercado Libre").
+    
+    Args:
+        user_id: User's ID
+        query: Free text; empty matches everything (filters only)
+        page: Zero-based page number
+        page_size: Rows per page
+        min_amount / max_amount: Inclusive amount bounds
+        start_date / end_date: Inclusive purchase date bounds (YYYY-MM-DD)
+        trans_type: Optional type filter
+        
+    Returns:
+        (page of transactions, newest purchase first; total number of matches)
+    """
+    try:
+        supabase = get_supabase_client()
+        
+        query_builder = supabase.table("transactions") \
+            .select(TRANSACTION_COLUMNS, count="exact") \
+            .eq("user_id", user_id)
+        
+        terms = search_terms(query)
+        if terms:
+            tsquery = " & ".join(f"{term}:*" for term in terms)
+            query_builder = query_builder.text_search("search_vector", tsquery, options={"config": "simple"})
+        if min_amount is not None:
+            query_builder = query_builder.gte("amount", min_amount)
+        if max_amount is not None:
+            query_builder = query_builder.lte("amount", max_amount)
+        if start_date:
+            query_builder = query_builder.gte("date", start_date)
+        if end_date:
+            query_builder = query_builder.lte("date", end_date)
+        if trans_type:
+            query_builder = query_builder.eq("type", trans_type)
+        
+        offset = page * page_size
+        response = query_builder \
+            .order("date", desc=True) \
+            .order("id", desc=True) \
+            .range(offset, offset + page_size - 1) \
+            .execute()
+        
+        return Transaction.from_rows(response.data), response.count or 0
+        
+    except Exception as e:
+        raise DataError.wrap("Error searching transactions", e)
+
+# ============================================
+# DELTA SYNC (Change Log)
+# ============================================
+
+# PostgREST error codes for a table that does not exist (migration not applied)
+MISSING_RELATION_CODES = ("42P01", "PGRST205")
+
+
+def get_change_watermark(user_id: str) -> Optional[int]:
+    """
+    Get the latest change-log sequence number for a user (0 if none).
+    Take it BEFORE a full load: changes made during the load are then
+    replayed by the next delta, and replaying is idempotent.
+    Returns None if change tracking (migrations/002) is not installed.
+    """
+    try:
+        supabase = get_supabase_client()
+        response = supabase.table("transaction_changes") \
+            .select("seq") \
+            .eq("user_id", user_id) \
+            .order("seq", desc=True) \
+            .limit(1) \
+            .execute()
+        return response.data[0]["seq"] if response.data else 0
+    except Exception as e:
+        if getattr(e, "code", None) in MISSING_RELATION_CODES:
+            return None
+        raise DataError.wrap("Error fetching change watermark", e)
+
+
+def get_transaction_changes(
+    user_id: str,
+    since: int
+) -> Tuple[List[Transaction], List[int], int]:
+    """
+    Get transactions inserted, updated or deleted after a watermark (user-specific).
+    
+    Args:
+        user_id: User's ID
+        since: Last change-log seq already applied by the caller
+        
+    Returns:
+        (upserted_rows, deleted_ids, new_watermark).
+        upserted_rows are Transaction records, like get_monthly_transactions returns.
+    """
+    try:
+        supabase = get_supabase_client()
+        
+        changes = _fetch_all_pages(
+            lambda: supabase.table("transaction_changes")
+                .select("seq, transaction_id, op")
+                .eq("user_id", user_id)
+                .gt("seq", since)
+                .order("seq")
+        )
+        
+        if not changes:
+            return [], [], since
+        
+        # Only the latest operation per transaction matters
+        latest_op = {}
+        for change in changes:
+            latest_op[change["transaction_id"]] = change["op"]
+        
+        deleted_ids = [tid for tid, op in latest_op.items() if op == "D"]
+        live_ids = [tid for tid, op in latest_op.items() if op != "D"]
+        
+        # Fetch current versions of changed rows in chunks (URL length limit)
+        rows = []
+        for i in range(0, len(live_ids), 200):
+            response = supabase.table("transactions") \
+                .select(TRANSACTION_COLUMNS) \
+                .eq("user_id", user_id) \
+                .in_("id", live_ids[i:i + 200]) \
+                .execute()
+            rows.extend(Transaction.from_rows(response.data))
+        
+        # Rows deleted after the change log was read count as deleted
+        found_ids = {row.id for row in rows}
+        deleted_ids.extend(tid for tid in live_ids if tid not in found_ids)
+        
+        return rows, deleted_ids, changes[-1]["seq"]
+        
+    except Exception as e:
+        raise DataError.wrap("Error fetching transaction changes", e)
 
 
 def delete_transaction(user_id: str, transaction_id: int) -> bool:
@@ -540,7 +1855,7 @@ def delete_transaction(user_id: str, transaction_id: int) -> bool:
         transaction_id: The database ID of the transaction to delete
         
     Returns:
-        bool: True if deletion was successful, False otherwise
+        bool: True (raises NotFoundError if the user has no such transaction)
     """
     try:
         supabase = get_supabase_client()
@@ -555,18 +1870,86 @@ def delete_transaction(user_id: str, transaction_id: int) -> bool:
         # Check if deletion was successful
         if response.data:
             # Row was deleted successfully
-            st.success(f"✅ Transacción eliminada correctamente (ID: {transaction_id})")
+            _notify_write(user_id, [row["payment_date"] for row in response.data])
             return True
         else:
             # No rows were deleted (transaction doesn't exist or doesn't belong to user)
-            st.warning(f"⚠️ No se encontró la transacción o no te pertenece (ID: {transaction_id})")
-            return False
+            raise NotFoundError(f"No se encontró la transacción o no te pertenece (ID: {transaction_id})")
             
     except Exception as e:
         # Catch and display any errors
-        st.error(f"❌ Error borrando transacción (ID: {transaction_id}): {str(e)}")
-        st.error(f"Detalles técnicos: {type(e).__name__}")
-        return False
+        raise DataError.wrap(f"❌ Error borrando transacción (ID: {transaction_id})", e)
+
+
+# Columns the transaction grid may change. date and type decide payment_date
+# (Snapshot Date Logic), so those still mean deleting and re-entering the row.
+EDITABLE_COLUMNS = ("amount", "category", "description")
+
+
+def update_transactions(user_id: str, updates: List[Dict]) -> int:
+    """
+    Apply edits to many transactions in one call (user must own them).
+    
+    Args:
+        user_id: The authenticated user's ID
+        updates: One dict per row: 'id' plus any of EDITABLE_COLUMNS
+                 (columns left out keep their current value)
+        
+    Returns:
+        int: Number of rows updated (rows the user doesn't own are skipped)
+    """
+    if not updates:
+        return 0
+    
+    try:
+        unknown = {column for update in updates for column in update} - {"id", *EDITABLE_COLUMNS}
+        if unknown:
+            raise ValidationError(f"Columnas no editables: {', '.join(sorted(unknown))}")
+        
+        supabase = get_supabase_client()
+        
+        # One statement for the whole batch (migrations/011)
+        response = supabase.rpc("update_transactions", {
+            "p_user_id": user_id,
+            "p_ids": [update["id"] for update in updates],
+            "p_amounts": [update.get("amount") for update in updates],
+            "p_categories": [update.get("category") for update in updates],
+            "p_descriptions": [update.get("description") for update in updates]
+        }).execute()
+        
+        rows = response.data or []
+        if rows:
+            _notify_write(user_id, [row["payment_date"] for row in rows])
+        return len(rows)
+        
+    except Exception as e:
+        raise DataError.wrap("Error updating transactions", e)
+
+
+def delete_transactions(user_id: str, transaction_ids: List[int]) -> int:
+    """
+    Delete many transactions (user must own them), one call per 200 IDs.
+    Returns: Number of rows deleted (IDs the user doesn't own are skipped)
+    """
+    try:
+        supabase = get_supabase_client()
+        
+        deleted = []
+        # Chunked: the IDs travel in the URL
+        for i in range(0, len(transaction_ids), 200):
+            response = supabase.table("transactions") \
+                .delete() \
+                .eq("user_id", user_id) \
+                .in_("id", transaction_ids[i:i + 200]) \
+                .execute()
+            deleted.extend(response.data)
+        
+        if deleted:
+            _notify_write(user_id, [row["payment_date"] for row in deleted])
+        return len(deleted)
+        
+    except Exception as e:
+        raise DataError.wrap("Error deleting transactions", e)
 
 # ============================================
 # USER MANAGEMENT
@@ -589,13 +1972,20 @@ def claim_orphaned_data(user_id: str) -> Tuple[int, int]:
         
         if response.data and len(response.data) > 0:
             result = response.data[0]
-            return result.get('transactions_claimed', 0), result.get('cards_claimed', 0)
+            transactions_claimed = result.get('transactions_claimed', 0)
+            cards_claimed = result.get('cards_claimed', 0)
+            
+            if transactions_claimed:
+                _notify_write(user_id, [])
+            if cards_claimed:
+                _invalidate_reads(f"cards:{user_id}")
+            
+            return transactions_claimed, cards_claimed
         
         return 0, 0
         
     except Exception as e:
-        st.error(f"Error claiming orphaned data: {str(e)}")
-        return 0, 0
+        raise DataError.wrap("Error claiming orphaned data", e)
 
 # ============================================
 # USD RATES (Future Enhancement)
@@ -614,11 +2004,11 @@ def save_usd_rate(date: datetime, official: float, blue: float) -> bool:
         
         # Upsert (insert or update)
         supabase.table("usd_rates").upsert(data).execute()
+        _invalidate_reads("usd_rates")
         return True
         
     except Exception as e:
-        st.error(f"Error saving USD rate: {str(e)}")
-        return False
+        raise DataError.wrap("Error saving USD rate", e)
 
 
 def get_usd_rate(date: datetime) -> Optional[Dict[str, float]]:
@@ -626,15 +2016,18 @@ def get_usd_rate(date: datetime) -> Optional[Dict[str, float]]:
     try:
         supabase = get_supabase_client()
         
-        response = supabase.table("usd_rates") \
-            .select("official, blue") \
-            .eq("date", date.strftime("%Y-%m-%d")) \
-            .execute()
-        
-        if response.data:
-            return response.data[0]
+        def fetch_rate() -> List[Dict]:
+            return supabase.table("usd_rates") \
+                .select("official, blue") \
+                .eq("date", date.strftime("%Y-%m-%d")) \
+                .execute() \
+                .data
+        
+        key = f"usd_rates:{date.strftime('%Y-%m-%d')}"
+        records = _coalesced("usd_rates", key, lambda: _disk_cached(key, "usd_rates", fetch_rate), shared=True)
+        if records:
+            return records[0]
         return None
         
     except Exception as e:
-        st.error(f"Error fetching USD rate: {str(e)}")
-        return None
+        raise DataError.wrap("Error fetching USD rate", e)
@@ -0,0 +1,181 @@
+"""
+FINANZAS PRO - Persistent Read Cache
+SQLite-backed cache for read-mostly data that survives server restarts
+
+In-memory caches start empty after every restart or redeploy. This cache
+keeps read-mostly query results in a local SQLite file instead: card lists,
+USD rates, and the summaries and rows of closed past months (their payment
+dates are fixed at insertion, so they only change through this app's own
+write paths).
+
+- Keys are global (they include the user id) and start with CACHE_FORMAT,
+  so a change in what is stored starts a fresh keyspace instead of
+  misreading old entries.
+- Every entry belongs to a scope ("cards:<user>", "month:<user>:2025-01").
+  Write paths invalidate scopes, which deletes their entries and bumps the
+  scope's generation. A value loaded while a write happened is stored with
+  the generation read before loading, so it is rejected instead of caching
+  pre-write data.
+- Size-bounded: past max_bytes, least recently read entries are evicted
+  down to EVICT_TO of the budget. Entries older than max_age are ignored,
+  as a backstop for writes made outside the app.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Iterable, Optional
+
+# Bump when the shape of cached values changes
+CACHE_FORMAT = 1
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+# Eviction frees space down to this fraction of max_bytes
+EVICT_TO = 0.9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    generation INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_scope ON entries (scope);
+CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access);
+CREATE TABLE IF NOT EXISTS generations (
+    scope TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL
+);
+"""
+
+
+class DiskCache:
+    """
+    Scoped, generation-checked key/value cache of JSON values in SQLite.
+
+    Args:
+        path: SQLite file (created if missing; shared safely between processes)
+        max_bytes: Upper bound of the stored payload size
+        max_age: Seconds after which an entry is no longer served
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, max_age: float = DEFAULT_MAX_AGE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    @staticmethod
+    def _key(key: str) -> str:
+        return f"v{CACHE_FORMAT}:{key}"
+
+    def generation(self, scope: str) -> int:
+        """Current generation of a scope (read it before loading a value to put)"""
+        with self._lock:
+            # Materialize the row so prefix invalidations also bump it
+            self._conn.execute("INSERT OR IGNORE INTO generations (scope, generation) VALUES (?, 0)", (scope,))
+            row = self._conn.execute("SELECT generation FROM generations WHERE scope = ?", (scope,)).fetchone()
+            return row[0]
+
+    def get(self, key: str, scope: str) -> Optional[Any]:
+        """Cached value, or None on a miss (stale generation, too old, or absent)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT e.payload, e.stored_at FROM entries e "
+                "JOIN generations g ON g.scope = e.scope AND g.generation = e.generation "
+                "WHERE e.key = ? AND e.scope = ?",
+                (self._key(key), scope)
+            ).fetchone()
+
+            if row is None or time.time() - row[1] > self.max_age:
+                return None
+
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), self._key(key)))
+            return json.loads(row[0])
+
+    def put(self, key: str, scope: str, generation: int, value: Any) -> bool:
+        """
+        Store a value loaded under `generation` (from generation()).
+        Returns: False if the scope was invalidated meanwhile (value dropped)
+        """
+        payload = json.dumps(value, default=str, separators=(",", ":"))
+        now = time.time()
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, scope, generation, payload, size, stored_at, last_access) "
+                "SELECT ?, ?, ?, ?, ?, ?, ? FROM generations WHERE scope = ? AND generation = ?",
+                (self._key(key), scope, generation, payload, len(payload), now, now, scope, generation)
+            )
+            if not cursor.rowcount:
+                return False
+
+            self._evict()
+            return True
+
+    def invalidate(self, scopes: Iterable[str]) -> None:
+        """Drop every entry of the scopes and bump their generations"""
+        scopes = list(scopes)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO generations (scope, generation) VALUES (?, 1) "
+                    "ON CONFLICT (scope) DO UPDATE SET generation = generation + 1",
+                    [(scope,) for scope in scopes]
+                )
+                self._conn.executemany("DELETE FROM entries WHERE scope = ?", [(scope,) for scope in scopes])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        """Invalidate every scope starting with prefix (e.g. all months of a user)"""
+        pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE generations SET generation = generation + 1 WHERE scope LIKE ? ESCAPE '\\'", (pattern,)
+                )
+                self._conn.execute("DELETE FROM entries WHERE scope LIKE ? ESCAPE '\\'", (pattern,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def size(self) -> int:
+        """Total stored payload bytes"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _evict(self) -> None:
+        """Drop least recently read entries until under EVICT_TO * max_bytes (lock held)"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - int(self.max_bytes * EVICT_TO)
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def close(self) -> None:
+        self._conn.close()
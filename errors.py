@@ -0,0 +1,44 @@
+"""
+FINANZAS PRO - Data Layer Errors
+Exceptions raised by database.py instead of rendering Streamlit messages
+
+The data layer runs in page scripts, worker threads, the command line and
+scheduler jobs, so it reports failures by raising and leaves rendering to the
+caller (views/ui.py on the pages). Messages are meant for the user.
+"""
+
+
+class DataError(Exception):
+    """A data layer operation failed (network, PostgREST, or a subclass below)"""
+
+    @classmethod
+    def wrap(cls, action: str, error: Exception) -> "DataError":
+        """
+        Error to raise for `error` caught while doing `action`: data layer
+        errors pass through, anything else becomes "<action>: <error>"
+        """
+        if isinstance(error, DataError):
+            return error
+        wrapped = cls(f"{action}: {error}")
+        wrapped.__cause__ = error
+        return wrapped
+
+
+class ConfigurationError(DataError):
+    """Supabase credentials are missing"""
+
+
+class ValidationError(DataError, ValueError):
+    """Invalid input (closing day out of range, empty name...)"""
+
+
+class NotFoundError(DataError):
+    """The row does not exist or belongs to another user"""
+
+
+class DuplicateError(DataError):
+    """The row is already stored (repeated save, card name taken)"""
+
+
+class ConflictError(DataError):
+    """Existing data prevents the operation (deleting a card with transactions)"""
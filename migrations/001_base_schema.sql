@@ -0,0 +1,52 @@
+-- ============================================
+-- 001: Base schema
+-- Tables the app has always expected (see README "Database Schema")
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS credit_cards (
+    id BIGSERIAL PRIMARY KEY,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    user_id UUID,
+    name TEXT NOT NULL,
+    closing_day INTEGER NOT NULL CHECK (closing_day BETWEEN 1 AND 31)
+);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    id BIGSERIAL PRIMARY KEY,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    user_id UUID,
+    date DATE NOT NULL,
+    payment_date DATE NOT NULL,
+    amount NUMERIC(14, 2) NOT NULL,
+    category TEXT NOT NULL,
+    description TEXT DEFAULT '',
+    type TEXT NOT NULL CHECK (type IN ('Income', 'Fixed', 'Debit', 'Card')),
+    card_id BIGINT REFERENCES credit_cards (id),
+    installments_total INTEGER NOT NULL DEFAULT 1,
+    installment_number INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS usd_rates (
+    date DATE PRIMARY KEY,
+    official NUMERIC(14, 4),
+    blue NUMERIC(14, 4)
+);
+
+-- Migration helper from the single-user version (rows with NULL user_id)
+CREATE OR REPLACE FUNCTION claim_orphaned_data(claiming_user_id UUID)
+RETURNS TABLE (transactions_claimed INTEGER, cards_claimed INTEGER)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    n_transactions INTEGER;
+    n_cards INTEGER;
+BEGIN
+    UPDATE credit_cards SET user_id = claiming_user_id WHERE user_id IS NULL;
+    GET DIAGNOSTICS n_cards = ROW_COUNT;
+
+    UPDATE transactions SET user_id = claiming_user_id WHERE user_id IS NULL;
+    GET DIAGNOSTICS n_transactions = ROW_COUNT;
+
+    RETURN QUERY SELECT n_transactions, n_cards;
+END;
+$$;
@@ -0,0 +1,30 @@
+-- 001: Base schema (SQLite stand-in)
+
+CREATE TABLE IF NOT EXISTS credit_cards (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    user_id TEXT,
+    name TEXT NOT NULL,
+    closing_day INTEGER NOT NULL CHECK (closing_day BETWEEN 1 AND 31)
+);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    user_id TEXT,
+    date TEXT NOT NULL,
+    payment_date TEXT NOT NULL,
+    amount REAL NOT NULL,
+    category TEXT NOT NULL,
+    description TEXT DEFAULT '',
+    type TEXT NOT NULL CHECK (type IN ('Income', 'Fixed', 'Debit', 'Card')),
+    card_id INTEGER REFERENCES credit_cards (id),
+    installments_total INTEGER NOT NULL DEFAULT 1,
+    installment_number INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS usd_rates (
+    date TEXT PRIMARY KEY,
+    official REAL,
+    blue REAL
+);
@@ -0,0 +1,45 @@
+-- ============================================
+-- 002: Transaction change log (delta sync)
+-- Every insert/update/delete on transactions appends one row here.
+-- Clients keep the last `seq` they applied as their watermark and ask for
+-- changes with seq > watermark (see database.get_transaction_changes).
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS transaction_changes (
+    seq BIGSERIAL PRIMARY KEY,
+    user_id UUID,
+    transaction_id BIGINT NOT NULL,
+    op CHAR(1) NOT NULL CHECK (op IN ('I', 'U', 'D')),
+    changed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_transaction_changes_user_seq
+    ON transaction_changes (user_id, seq);
+
+CREATE OR REPLACE FUNCTION log_transaction_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO transaction_changes (user_id, transaction_id, op)
+        VALUES (OLD.user_id, OLD.id, 'D');
+        RETURN OLD;
+    END IF;
+
+    -- A row that changes owner (claim_orphaned_data) is a delete for the old owner
+    IF TG_OP = 'UPDATE' AND OLD.user_id IS DISTINCT FROM NEW.user_id THEN
+        INSERT INTO transaction_changes (user_id, transaction_id, op)
+        VALUES (OLD.user_id, OLD.id, 'D');
+    END IF;
+
+    INSERT INTO transaction_changes (user_id, transaction_id, op)
+    VALUES (NEW.user_id, NEW.id, LEFT(TG_OP, 1));
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS transactions_change_log ON transactions;
+CREATE TRIGGER transactions_change_log
+    AFTER INSERT OR UPDATE OR DELETE ON transactions
+    FOR EACH ROW EXECUTE FUNCTION log_transaction_change();
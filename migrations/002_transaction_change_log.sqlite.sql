@@ -0,0 +1,32 @@
+-- 002: Transaction change log (SQLite stand-in)
+
+CREATE TABLE IF NOT EXISTS transaction_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT,
+    transaction_id INTEGER NOT NULL,
+    op TEXT NOT NULL CHECK (op IN ('I', 'U', 'D')),
+    changed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_transaction_changes_user_seq
+    ON transaction_changes (user_id, seq);
+
+CREATE TRIGGER IF NOT EXISTS transactions_change_log_insert
+AFTER INSERT ON transactions
+BEGIN
+    INSERT INTO transaction_changes (user_id, transaction_id, op) VALUES (NEW.user_id, NEW.id, 'I');
+END;
+
+CREATE TRIGGER IF NOT EXISTS transactions_change_log_update
+AFTER UPDATE ON transactions
+BEGIN
+    INSERT INTO transaction_changes (user_id, transaction_id, op)
+        SELECT OLD.user_id, OLD.id, 'D' WHERE OLD.user_id IS NOT NEW.user_id;
+    INSERT INTO transaction_changes (user_id, transaction_id, op) VALUES (NEW.user_id, NEW.id, 'U');
+END;
+
+CREATE TRIGGER IF NOT EXISTS transactions_change_log_delete
+AFTER DELETE ON transactions
+BEGIN
+    INSERT INTO transaction_changes (user_id, transaction_id, op) VALUES (OLD.user_id, OLD.id, 'D');
+END;
@@ -0,0 +1,34 @@
+-- ============================================
+-- 003: Recurring rules (rent, salary, subscriptions...)
+-- Occurrences are materialized into `transactions` by recurring.py.
+-- materialized_through is the per-rule watermark; the unique index makes a
+-- repeated or concurrent run a no-op for occurrences already inserted.
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS recurring_rules (
+    id BIGSERIAL PRIMARY KEY,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    user_id UUID NOT NULL,
+    type TEXT NOT NULL CHECK (type IN ('Income', 'Fixed', 'Debit')),
+    amount NUMERIC(14, 2) NOT NULL CHECK (amount > 0),
+    category TEXT NOT NULL,
+    description TEXT DEFAULT '',
+    day_of_month INTEGER NOT NULL CHECK (day_of_month BETWEEN 1 AND 31),
+    start_date DATE NOT NULL,
+    end_date DATE,
+    -- Optional indexation: amount grows by indexation_pct every indexation_every_months
+    indexation_pct NUMERIC(6, 3) NOT NULL DEFAULT 0,
+    indexation_every_months INTEGER NOT NULL DEFAULT 12 CHECK (indexation_every_months > 0),
+    materialized_through DATE,
+    CHECK (end_date IS NULL OR end_date >= start_date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_recurring_rules_user
+    ON recurring_rules (user_id);
+
+ALTER TABLE transactions
+    ADD COLUMN IF NOT EXISTS recurring_rule_id BIGINT REFERENCES recurring_rules (id) ON DELETE SET NULL;
+
+-- NULLs are distinct, so manually entered rows never conflict
+CREATE UNIQUE INDEX IF NOT EXISTS uq_transactions_recurring_occurrence
+    ON transactions (recurring_rule_id, payment_date);
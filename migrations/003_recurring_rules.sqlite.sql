@@ -0,0 +1,27 @@
+-- 003: Recurring rules (SQLite stand-in)
+
+CREATE TABLE IF NOT EXISTS recurring_rules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    user_id TEXT NOT NULL,
+    type TEXT NOT NULL CHECK (type IN ('Income', 'Fixed', 'Debit')),
+    amount REAL NOT NULL CHECK (amount > 0),
+    category TEXT NOT NULL,
+    description TEXT DEFAULT '',
+    day_of_month INTEGER NOT NULL CHECK (day_of_month BETWEEN 1 AND 31),
+    start_date TEXT NOT NULL,
+    end_date TEXT,
+    indexation_pct REAL NOT NULL DEFAULT 0,
+    indexation_every_months INTEGER NOT NULL DEFAULT 12 CHECK (indexation_every_months > 0),
+    materialized_through TEXT,
+    CHECK (end_date IS NULL OR end_date >= start_date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_recurring_rules_user
+    ON recurring_rules (user_id);
+
+ALTER TABLE transactions
+    ADD COLUMN recurring_rule_id INTEGER REFERENCES recurring_rules (id) ON DELETE SET NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_transactions_recurring_occurrence
+    ON transactions (recurring_rule_id, payment_date);
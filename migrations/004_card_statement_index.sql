@@ -0,0 +1,10 @@
+-- portable: sqlite
+-- ============================================
+-- 004: Card statement index
+-- Serves statements.py: one range scan per card and cycle window
+--   WHERE user_id = ? AND card_id = ? AND payment_date >= ? AND payment_date < ?
+-- Its (user_id, card_id) prefix also serves delete_card's "has transactions?" check.
+-- ============================================
+
+CREATE INDEX IF NOT EXISTS idx_transactions_user_card_payment_date
+    ON transactions (user_id, card_id, payment_date);
@@ -0,0 +1,28 @@
+-- ============================================
+-- 005: Bulk payment_date update
+-- One statement for any number of rows, used by
+-- database.reschedule_card_installments:
+--   SELECT reschedule_transactions(user_id, ARRAY[ids], ARRAY[new_dates]);
+-- ============================================
+
+CREATE OR REPLACE FUNCTION reschedule_transactions(
+    p_user_id UUID,
+    p_ids BIGINT[],
+    p_payment_dates DATE[]
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    n_updated INTEGER;
+BEGIN
+    UPDATE transactions AS t
+    SET payment_date = u.payment_date
+    FROM unnest(p_ids, p_payment_dates) AS u (id, payment_date)
+    WHERE t.id = u.id
+      AND t.user_id = p_user_id;
+
+    GET DIAGNOSTICS n_updated = ROW_COUNT;
+    RETURN n_updated;
+END;
+$$;
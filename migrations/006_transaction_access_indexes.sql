@@ -0,0 +1,17 @@
+-- ============================================
+-- 006: Covering indexes for the dashboard access paths
+--
+-- get_monthly_summary:      WHERE user_id = ? AND payment_date >= ? AND payment_date < ?  → type, amount
+-- get_monthly_transactions: WHERE user_id = ? AND payment_date >= ? AND payment_date < ? [AND type = ?]
+-- get_available_months:     WHERE user_id = ?  → payment_date
+--
+-- INCLUDE (type, amount) lets the summary and month list run as index-only
+-- scans. (user_id, card_id) lookups (delete_card, statements) are served by
+-- idx_transactions_user_card_payment_date from 004.
+-- ============================================
+
+CREATE INDEX IF NOT EXISTS idx_transactions_user_payment_date
+    ON transactions (user_id, payment_date) INCLUDE (type, amount);
+
+CREATE INDEX IF NOT EXISTS idx_credit_cards_user
+    ON credit_cards (user_id);
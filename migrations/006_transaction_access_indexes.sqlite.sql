@@ -0,0 +1,7 @@
+-- 006: Covering indexes (SQLite stand-in: no INCLUDE, so trailing key columns)
+
+CREATE INDEX IF NOT EXISTS idx_transactions_user_payment_date
+    ON transactions (user_id, payment_date, type, amount);
+
+CREATE INDEX IF NOT EXISTS idx_credit_cards_user
+    ON credit_cards (user_id);
@@ -0,0 +1,171 @@
+-- ============================================
+-- 007: monthly_summary (trigger-maintained dashboard totals)
+-- One row per (user_id, year, month of payment_date). Statement-level
+-- triggers fold each INSERT/UPDATE/DELETE statement into one upsert per
+-- touched month, so a 24-installment purchase or a bulk materialization
+-- costs a single summary write per month. Months whose tx_count drops to 0
+-- are removed, so the table doubles as the month list.
+--
+--   SELECT rebuild_monthly_summary();           -- backfill (all users)
+--   SELECT rebuild_monthly_summary(user_id);    -- one user
+--   SELECT * FROM check_monthly_summary();      -- rows that disagree with transactions
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS monthly_summary (
+    user_id UUID NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    income NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    fixed NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    debit NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    card NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    tx_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, year, month)
+);
+
+-- Folds the statement's transition tables into the summary as signed deltas
+-- (+1 for new rows, -1 for old rows). EXECUTE lets one function serve all
+-- three triggers, since each only defines the transition tables of its event.
+CREATE OR REPLACE FUNCTION monthly_summary_refresh()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    deltas TEXT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        deltas := 'SELECT user_id, payment_date, type, amount, 1 AS sign FROM new_rows';
+    ELSIF TG_OP = 'DELETE' THEN
+        deltas := 'SELECT user_id, payment_date, type, -amount, -1 FROM old_rows';
+    ELSE
+        deltas := 'SELECT user_id, payment_date, type, amount, 1 AS sign FROM new_rows '
+               || 'UNION ALL SELECT user_id, payment_date, type, -amount, -1 FROM old_rows';
+    END IF;
+
+    EXECUTE format($sql$
+        WITH deltas (user_id, payment_date, type, amount, sign) AS (%s),
+        upserted AS (
+            INSERT INTO monthly_summary AS s (user_id, year, month, income, fixed, debit, card, tx_count)
+            SELECT
+                user_id,
+                EXTRACT(YEAR FROM payment_date)::INTEGER,
+                EXTRACT(MONTH FROM payment_date)::INTEGER,
+                COALESCE(SUM(amount) FILTER (WHERE type = 'Income'), 0),
+                COALESCE(SUM(amount) FILTER (WHERE type = 'Fixed'), 0),
+                COALESCE(SUM(amount) FILTER (WHERE type = 'Debit'), 0),
+                COALESCE(SUM(amount) FILTER (WHERE type = 'Card'), 0),
+                SUM(sign)
+            FROM deltas
+            WHERE user_id IS NOT NULL
+            GROUP BY 1, 2, 3
+            ON CONFLICT (user_id, year, month) DO UPDATE SET
+                income = s.income + EXCLUDED.income,
+                fixed = s.fixed + EXCLUDED.fixed,
+                debit = s.debit + EXCLUDED.debit,
+                card = s.card + EXCLUDED.card,
+                tx_count = s.tx_count + EXCLUDED.tx_count
+            RETURNING s.user_id, s.year, s.month, s.tx_count
+        )
+        DELETE FROM monthly_summary AS s
+        USING upserted AS u
+        WHERE s.user_id = u.user_id AND s.year = u.year AND s.month = u.month
+          AND u.tx_count <= 0
+    $sql$, deltas);
+
+    RETURN NULL;
+END;
+$$;
+
+-- Transition tables allow only one event per trigger
+DROP TRIGGER IF EXISTS monthly_summary_insert ON transactions;
+CREATE TRIGGER monthly_summary_insert
+    AFTER INSERT ON transactions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION monthly_summary_refresh();
+
+DROP TRIGGER IF EXISTS monthly_summary_delete ON transactions;
+CREATE TRIGGER monthly_summary_delete
+    AFTER DELETE ON transactions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION monthly_summary_refresh();
+
+DROP TRIGGER IF EXISTS monthly_summary_update ON transactions;
+CREATE TRIGGER monthly_summary_update
+    AFTER UPDATE ON transactions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION monthly_summary_refresh();
+
+-- Backfill / repair from raw rows
+CREATE OR REPLACE FUNCTION rebuild_monthly_summary(p_user_id UUID DEFAULT NULL)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    n_rows INTEGER;
+BEGIN
+    DELETE FROM monthly_summary WHERE p_user_id IS NULL OR user_id = p_user_id;
+
+    INSERT INTO monthly_summary (user_id, year, month, income, fixed, debit, card, tx_count)
+    SELECT
+        user_id,
+        EXTRACT(YEAR FROM payment_date)::INTEGER,
+        EXTRACT(MONTH FROM payment_date)::INTEGER,
+        COALESCE(SUM(amount) FILTER (WHERE type = 'Income'), 0),
+        COALESCE(SUM(amount) FILTER (WHERE type = 'Fixed'), 0),
+        COALESCE(SUM(amount) FILTER (WHERE type = 'Debit'), 0),
+        COALESCE(SUM(amount) FILTER (WHERE type = 'Card'), 0),
+        COUNT(*)
+    FROM transactions
+    WHERE user_id IS NOT NULL
+      AND (p_user_id IS NULL OR user_id = p_user_id)
+    GROUP BY 1, 2, 3;
+
+    GET DIAGNOSTICS n_rows = ROW_COUNT;
+    RETURN n_rows;
+END;
+$$;
+
+-- Consistency checker: every (user, month) where the summary disagrees with raw rows
+CREATE OR REPLACE FUNCTION check_monthly_summary(p_user_id UUID DEFAULT NULL)
+RETURNS TABLE (
+    user_id UUID, year INTEGER, month INTEGER,
+    summary_income NUMERIC, actual_income NUMERIC,
+    summary_fixed NUMERIC, actual_fixed NUMERIC,
+    summary_debit NUMERIC, actual_debit NUMERIC,
+    summary_card NUMERIC, actual_card NUMERIC,
+    summary_tx_count INTEGER, actual_tx_count INTEGER
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH actual AS (
+        SELECT
+            t.user_id,
+            EXTRACT(YEAR FROM t.payment_date)::INTEGER AS year,
+            EXTRACT(MONTH FROM t.payment_date)::INTEGER AS month,
+            COALESCE(SUM(t.amount) FILTER (WHERE t.type = 'Income'), 0) AS income,
+            COALESCE(SUM(t.amount) FILTER (WHERE t.type = 'Fixed'), 0) AS fixed,
+            COALESCE(SUM(t.amount) FILTER (WHERE t.type = 'Debit'), 0) AS debit,
+            COALESCE(SUM(t.amount) FILTER (WHERE t.type = 'Card'), 0) AS card,
+            COUNT(*)::INTEGER AS tx_count
+        FROM transactions t
+        WHERE t.user_id IS NOT NULL
+          AND (p_user_id IS NULL OR t.user_id = p_user_id)
+        GROUP BY 1, 2, 3
+    ),
+    summary AS (
+        SELECT * FROM monthly_summary s
+        WHERE p_user_id IS NULL OR s.user_id = p_user_id
+    )
+    SELECT
+        COALESCE(s.user_id, a.user_id), COALESCE(s.year, a.year), COALESCE(s.month, a.month),
+        s.income, a.income, s.fixed, a.fixed, s.debit, a.debit, s.card, a.card, s.tx_count, a.tx_count
+    FROM summary s
+    FULL OUTER JOIN actual a
+        ON a.user_id = s.user_id AND a.year = s.year AND a.month = s.month
+    WHERE s.user_id IS NULL OR a.user_id IS NULL
+       OR s.income <> a.income OR s.fixed <> a.fixed OR s.debit <> a.debit
+       OR s.card <> a.card OR s.tx_count <> a.tx_count;
+$$;
+
+SELECT rebuild_monthly_summary();
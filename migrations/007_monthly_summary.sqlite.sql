@@ -0,0 +1,111 @@
+-- 007: monthly_summary (SQLite stand-in: row-level triggers, no rebuild/check functions)
+
+CREATE TABLE IF NOT EXISTS monthly_summary (
+    user_id TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    income REAL NOT NULL DEFAULT 0,
+    fixed REAL NOT NULL DEFAULT 0,
+    debit REAL NOT NULL DEFAULT 0,
+    card REAL NOT NULL DEFAULT 0,
+    tx_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, year, month)
+);
+
+CREATE TRIGGER IF NOT EXISTS monthly_summary_insert
+AFTER INSERT ON transactions
+WHEN NEW.user_id IS NOT NULL
+BEGIN
+    INSERT INTO monthly_summary (user_id, year, month, income, fixed, debit, card, tx_count)
+    VALUES (
+        NEW.user_id,
+        CAST(strftime('%Y', NEW.payment_date) AS INTEGER),
+        CAST(strftime('%m', NEW.payment_date) AS INTEGER),
+        CASE WHEN NEW.type = 'Income' THEN NEW.amount ELSE 0 END,
+        CASE WHEN NEW.type = 'Fixed' THEN NEW.amount ELSE 0 END,
+        CASE WHEN NEW.type = 'Debit' THEN NEW.amount ELSE 0 END,
+        CASE WHEN NEW.type = 'Card' THEN NEW.amount ELSE 0 END,
+        1
+    )
+    ON CONFLICT (user_id, year, month) DO UPDATE SET
+        income = income + excluded.income,
+        fixed = fixed + excluded.fixed,
+        debit = debit + excluded.debit,
+        card = card + excluded.card,
+        tx_count = tx_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS monthly_summary_delete
+AFTER DELETE ON transactions
+WHEN OLD.user_id IS NOT NULL
+BEGIN
+    UPDATE monthly_summary SET
+        income = income - CASE WHEN OLD.type = 'Income' THEN OLD.amount ELSE 0 END,
+        fixed = fixed - CASE WHEN OLD.type = 'Fixed' THEN OLD.amount ELSE 0 END,
+        debit = debit - CASE WHEN OLD.type = 'Debit' THEN OLD.amount ELSE 0 END,
+        card = card - CASE WHEN OLD.type = 'Card' THEN OLD.amount ELSE 0 END,
+        tx_count = tx_count - 1
+    WHERE user_id = OLD.user_id
+      AND year = CAST(strftime('%Y', OLD.payment_date) AS INTEGER)
+      AND month = CAST(strftime('%m', OLD.payment_date) AS INTEGER);
+
+    DELETE FROM monthly_summary
+    WHERE user_id = OLD.user_id
+      AND year = CAST(strftime('%Y', OLD.payment_date) AS INTEGER)
+      AND month = CAST(strftime('%m', OLD.payment_date) AS INTEGER)
+      AND tx_count <= 0;
+END;
+
+-- An update is the old row leaving its month and the new row entering its month
+CREATE TRIGGER IF NOT EXISTS monthly_summary_update
+AFTER UPDATE OF user_id, payment_date, type, amount ON transactions
+BEGIN
+    UPDATE monthly_summary SET
+        income = income - CASE WHEN OLD.type = 'Income' THEN OLD.amount ELSE 0 END,
+        fixed = fixed - CASE WHEN OLD.type = 'Fixed' THEN OLD.amount ELSE 0 END,
+        debit = debit - CASE WHEN OLD.type = 'Debit' THEN OLD.amount ELSE 0 END,
+        card = card - CASE WHEN OLD.type = 'Card' THEN OLD.amount ELSE 0 END,
+        tx_count = tx_count - 1
+    WHERE user_id = OLD.user_id
+      AND year = CAST(strftime('%Y', OLD.payment_date) AS INTEGER)
+      AND month = CAST(strftime('%m', OLD.payment_date) AS INTEGER);
+
+    DELETE FROM monthly_summary
+    WHERE user_id = OLD.user_id
+      AND year = CAST(strftime('%Y', OLD.payment_date) AS INTEGER)
+      AND month = CAST(strftime('%m', OLD.payment_date) AS INTEGER)
+      AND tx_count <= 0;
+
+    INSERT INTO monthly_summary (user_id, year, month, income, fixed, debit, card, tx_count)
+    SELECT
+        NEW.user_id,
+        CAST(strftime('%Y', NEW.payment_date) AS INTEGER),
+        CAST(strftime('%m', NEW.payment_date) AS INTEGER),
+        CASE WHEN NEW.type = 'Income' THEN NEW.amount ELSE 0 END,
+        CASE WHEN NEW.type = 'Fixed' THEN NEW.amount ELSE 0 END,
+        CASE WHEN NEW.type = 'Debit' THEN NEW.amount ELSE 0 END,
+        CASE WHEN NEW.type = 'Card' THEN NEW.amount ELSE 0 END,
+        1
+    WHERE NEW.user_id IS NOT NULL
+    ON CONFLICT (user_id, year, month) DO UPDATE SET
+        income = income + excluded.income,
+        fixed = fixed + excluded.fixed,
+        debit = debit + excluded.debit,
+        card = card + excluded.card,
+        tx_count = tx_count + 1;
+END;
+
+-- Backfill
+INSERT INTO monthly_summary (user_id, year, month, income, fixed, debit, card, tx_count)
+SELECT
+    user_id,
+    CAST(strftime('%Y', payment_date) AS INTEGER),
+    CAST(strftime('%m', payment_date) AS INTEGER),
+    SUM(CASE WHEN type = 'Income' THEN amount ELSE 0 END),
+    SUM(CASE WHEN type = 'Fixed' THEN amount ELSE 0 END),
+    SUM(CASE WHEN type = 'Debit' THEN amount ELSE 0 END),
+    SUM(CASE WHEN type = 'Card' THEN amount ELSE 0 END),
+    COUNT(*)
+FROM transactions
+WHERE user_id IS NOT NULL
+GROUP BY 1, 2, 3;
@@ -0,0 +1,31 @@
+-- ============================================
+-- 008: Full-text search over description and category
+-- Serves database.search_transactions:
+--   WHERE user_id = ? AND search_vector @@ to_tsquery('simple', 'merca:* & libre:*')
+--
+-- 'simple' config (no stemming: merchant names are not Spanish words) over
+-- unaccented text, so "debito" finds "Débito". The Python side strips
+-- accents from queries the same way. Adding the stored column rewrites the
+-- table once.
+-- ============================================
+
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- unaccent() is only STABLE; generated columns and indexes need IMMUTABLE
+CREATE OR REPLACE FUNCTION immutable_unaccent(value TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE PARALLEL SAFE STRICT
+AS $$
+    SELECT public.unaccent('public.unaccent'::regdictionary, value);
+$$;
+
+ALTER TABLE transactions
+    ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (
+        to_tsvector('simple', immutable_unaccent(coalesce(category, '') || ' ' || coalesce(description, '')))
+    ) STORED;
+
+-- Combined with idx_transactions_user_payment_date (user_id) via a BitmapAnd
+CREATE INDEX IF NOT EXISTS idx_transactions_search
+    ON transactions USING GIN (search_vector);
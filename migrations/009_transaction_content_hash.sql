@@ -0,0 +1,35 @@
+-- ============================================
+-- 009: Content hashes for idempotent saves and imports
+--
+-- database.py stores a hash of (user, type, date, amount, category,
+-- description, card, installment) in content_hash. The unique index turns
+-- a repeated submit or a re-imported statement into a no-op
+-- (upsert ... ON CONFLICT DO NOTHING). payment_date is part of the key
+-- because unique indexes on the partitioned table (optional 101) must
+-- include the partition key. Existing rows keep content_hash NULL, which
+-- never conflicts.
+--
+-- existing_content_hashes answers the pre-check of an import (thousands
+-- of hashes) in one round-trip: the hashes travel in the request body
+-- instead of an IN (...) list in the URL. payment_date >= p_since (the
+-- batch's earliest purchase date; payment_date is never earlier) keeps
+-- the scan to a range of the index.
+-- ============================================
+
+ALTER TABLE transactions
+    ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_transactions_content_hash
+    ON transactions (user_id, payment_date, content_hash);
+
+CREATE OR REPLACE FUNCTION existing_content_hashes(p_user_id UUID, p_hashes TEXT[], p_since DATE)
+RETURNS TABLE (content_hash TEXT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT DISTINCT t.content_hash
+    FROM transactions t
+    WHERE t.user_id = p_user_id
+      AND t.payment_date >= p_since
+      AND t.content_hash = ANY (p_hashes);
+$$;
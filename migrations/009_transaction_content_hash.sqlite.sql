@@ -0,0 +1,6 @@
+-- 009: Content hashes for idempotent saves and imports (SQLite: no pre-check function)
+
+ALTER TABLE transactions ADD COLUMN content_hash TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_transactions_content_hash
+    ON transactions (user_id, payment_date, content_hash);
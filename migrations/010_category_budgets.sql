@@ -0,0 +1,128 @@
+-- ============================================
+-- 010: Category budgets and trigger-maintained category spend
+--
+-- category_budgets: one monthly limit per (user, category), with the
+-- percentage at which the dashboard starts warning.
+--
+-- category_spend: expenses (Fixed, Debit, Card) per (user, month of
+-- payment_date, category), kept current by statement-level triggers the
+-- same way as monthly_summary (007). Saves, installment plans, deletes and
+-- reschedules each cost one upsert per touched (month, category), and the
+-- dashboard's budget bars read one row per budgeted category.
+--
+--   SELECT rebuild_category_spend();           -- backfill (all users)
+--   SELECT rebuild_category_spend(user_id);    -- one user
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS category_budgets (
+    user_id UUID NOT NULL,
+    category TEXT NOT NULL,
+    monthly_limit NUMERIC(14, 2) NOT NULL CHECK (monthly_limit > 0),
+    alert_pct INTEGER NOT NULL DEFAULT 80 CHECK (alert_pct BETWEEN 1 AND 100),
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (user_id, category)
+);
+
+CREATE TABLE IF NOT EXISTS category_spend (
+    user_id UUID NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    amount NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    tx_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, year, month, category)
+);
+
+-- Signed deltas from the statement's transition tables, as in monthly_summary_refresh
+CREATE OR REPLACE FUNCTION category_spend_refresh()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    deltas TEXT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        deltas := 'SELECT user_id, payment_date, type, category, amount, 1 AS sign FROM new_rows';
+    ELSIF TG_OP = 'DELETE' THEN
+        deltas := 'SELECT user_id, payment_date, type, category, -amount, -1 FROM old_rows';
+    ELSE
+        deltas := 'SELECT user_id, payment_date, type, category, amount, 1 AS sign FROM new_rows '
+               || 'UNION ALL SELECT user_id, payment_date, type, category, -amount, -1 FROM old_rows';
+    END IF;
+
+    EXECUTE format($sql$
+        WITH deltas (user_id, payment_date, type, category, amount, sign) AS (%s),
+        upserted AS (
+            INSERT INTO category_spend AS s (user_id, year, month, category, amount, tx_count)
+            SELECT
+                user_id,
+                EXTRACT(YEAR FROM payment_date)::INTEGER,
+                EXTRACT(MONTH FROM payment_date)::INTEGER,
+                category,
+                SUM(amount),
+                SUM(sign)
+            FROM deltas
+            WHERE user_id IS NOT NULL AND category IS NOT NULL AND type <> 'Income'
+            GROUP BY 1, 2, 3, 4
+            ON CONFLICT (user_id, year, month, category) DO UPDATE SET
+                amount = s.amount + EXCLUDED.amount,
+                tx_count = s.tx_count + EXCLUDED.tx_count
+            RETURNING s.user_id, s.year, s.month, s.category, s.tx_count
+        )
+        DELETE FROM category_spend AS s
+        USING upserted AS u
+        WHERE s.user_id = u.user_id AND s.year = u.year AND s.month = u.month
+          AND s.category = u.category AND u.tx_count <= 0
+    $sql$, deltas);
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS category_spend_insert ON transactions;
+CREATE TRIGGER category_spend_insert
+    AFTER INSERT ON transactions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION category_spend_refresh();
+
+DROP TRIGGER IF EXISTS category_spend_delete ON transactions;
+CREATE TRIGGER category_spend_delete
+    AFTER DELETE ON transactions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION category_spend_refresh();
+
+DROP TRIGGER IF EXISTS category_spend_update ON transactions;
+CREATE TRIGGER category_spend_update
+    AFTER UPDATE ON transactions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION category_spend_refresh();
+
+-- Backfill / repair from raw rows
+CREATE OR REPLACE FUNCTION rebuild_category_spend(p_user_id UUID DEFAULT NULL)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    n_rows INTEGER;
+BEGIN
+    DELETE FROM category_spend WHERE p_user_id IS NULL OR user_id = p_user_id;
+
+    INSERT INTO category_spend (user_id, year, month, category, amount, tx_count)
+    SELECT
+        user_id,
+        EXTRACT(YEAR FROM payment_date)::INTEGER,
+        EXTRACT(MONTH FROM payment_date)::INTEGER,
+        category,
+        SUM(amount),
+        COUNT(*)
+    FROM transactions
+    WHERE user_id IS NOT NULL AND category IS NOT NULL AND type <> 'Income'
+      AND (p_user_id IS NULL OR user_id = p_user_id)
+    GROUP BY 1, 2, 3, 4;
+
+    GET DIAGNOSTICS n_rows = ROW_COUNT;
+    RETURN n_rows;
+END;
+$$;
+
+SELECT rebuild_category_spend();
@@ -0,0 +1,105 @@
+-- 010: Category budgets and category spend (SQLite stand-in: row-level triggers, no rebuild function)
+
+CREATE TABLE IF NOT EXISTS category_budgets (
+    user_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    monthly_limit REAL NOT NULL CHECK (monthly_limit > 0),
+    alert_pct INTEGER NOT NULL DEFAULT 80 CHECK (alert_pct BETWEEN 1 AND 100),
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, category)
+);
+
+CREATE TABLE IF NOT EXISTS category_spend (
+    user_id TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    amount REAL NOT NULL DEFAULT 0,
+    tx_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, year, month, category)
+);
+
+CREATE TRIGGER IF NOT EXISTS category_spend_insert
+AFTER INSERT ON transactions
+WHEN NEW.user_id IS NOT NULL AND NEW.category IS NOT NULL AND NEW.type <> 'Income'
+BEGIN
+    INSERT INTO category_spend (user_id, year, month, category, amount, tx_count)
+    VALUES (
+        NEW.user_id,
+        CAST(strftime('%Y', NEW.payment_date) AS INTEGER),
+        CAST(strftime('%m', NEW.payment_date) AS INTEGER),
+        NEW.category,
+        NEW.amount,
+        1
+    )
+    ON CONFLICT (user_id, year, month, category) DO UPDATE SET
+        amount = amount + excluded.amount,
+        tx_count = tx_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS category_spend_delete
+AFTER DELETE ON transactions
+WHEN OLD.user_id IS NOT NULL AND OLD.category IS NOT NULL AND OLD.type <> 'Income'
+BEGIN
+    UPDATE category_spend SET
+        amount = amount - OLD.amount,
+        tx_count = tx_count - 1
+    WHERE user_id = OLD.user_id
+      AND year = CAST(strftime('%Y', OLD.payment_date) AS INTEGER)
+      AND month = CAST(strftime('%m', OLD.payment_date) AS INTEGER)
+      AND category = OLD.category;
+
+    DELETE FROM category_spend
+    WHERE user_id = OLD.user_id
+      AND year = CAST(strftime('%Y', OLD.payment_date) AS INTEGER)
+      AND month = CAST(strftime('%m', OLD.payment_date) AS INTEGER)
+      AND category = OLD.category
+      AND tx_count <= 0;
+END;
+
+-- An update is the old row leaving its (month, category) and the new row entering its own
+CREATE TRIGGER IF NOT EXISTS category_spend_update
+AFTER UPDATE OF user_id, payment_date, type, category, amount ON transactions
+BEGIN
+    UPDATE category_spend SET
+        amount = amount - OLD.amount,
+        tx_count = tx_count - 1
+    WHERE OLD.type <> 'Income'
+      AND user_id = OLD.user_id
+      AND year = CAST(strftime('%Y', OLD.payment_date) AS INTEGER)
+      AND month = CAST(strftime('%m', OLD.payment_date) AS INTEGER)
+      AND category = OLD.category;
+
+    DELETE FROM category_spend
+    WHERE user_id = OLD.user_id
+      AND year = CAST(strftime('%Y', OLD.payment_date) AS INTEGER)
+      AND month = CAST(strftime('%m', OLD.payment_date) AS INTEGER)
+      AND category = OLD.category
+      AND tx_count <= 0;
+
+    INSERT INTO category_spend (user_id, year, month, category, amount, tx_count)
+    SELECT
+        NEW.user_id,
+        CAST(strftime('%Y', NEW.payment_date) AS INTEGER),
+        CAST(strftime('%m', NEW.payment_date) AS INTEGER),
+        NEW.category,
+        NEW.amount,
+        1
+    WHERE NEW.user_id IS NOT NULL AND NEW.category IS NOT NULL AND NEW.type <> 'Income'
+    ON CONFLICT (user_id, year, month, category) DO UPDATE SET
+        amount = amount + excluded.amount,
+        tx_count = tx_count + 1;
+END;
+
+-- Backfill
+INSERT INTO category_spend (user_id, year, month, category, amount, tx_count)
+SELECT
+    user_id,
+    CAST(strftime('%Y', payment_date) AS INTEGER),
+    CAST(strftime('%m', payment_date) AS INTEGER),
+    category,
+    SUM(amount),
+    COUNT(*)
+FROM transactions
+WHERE user_id IS NOT NULL AND category IS NOT NULL AND type <> 'Income'
+GROUP BY 1, 2, 3, 4;
@@ -0,0 +1,32 @@
+-- ============================================
+-- 011: Batched edits from the transaction grid
+-- One statement for any number of edited rows, used by
+-- database.update_transactions. A NULL array element keeps the column's
+-- current value, so each row only changes what was edited:
+--   SELECT * FROM update_transactions(user_id, ARRAY[ids], ARRAY[amounts],
+--                                     ARRAY[categories], ARRAY[descriptions]);
+-- Returns the payment_date of every updated row (for cache invalidation).
+-- The monthly_summary (007) and category_spend (010) statement triggers
+-- see the whole batch as one UPDATE. content_hash (009) is left as is: the
+-- edited row still stands for the statement line it was imported from.
+-- ============================================
+
+CREATE OR REPLACE FUNCTION update_transactions(
+    p_user_id UUID,
+    p_ids BIGINT[],
+    p_amounts NUMERIC[],
+    p_categories TEXT[],
+    p_descriptions TEXT[]
+)
+RETURNS TABLE (id BIGINT, payment_date DATE)
+LANGUAGE sql
+AS $$
+    UPDATE transactions AS t
+    SET amount = COALESCE(u.amount, t.amount),
+        category = COALESCE(u.category, t.category),
+        description = COALESCE(u.description, t.description)
+    FROM unnest(p_ids, p_amounts, p_categories, p_descriptions) AS u (id, amount, category, description)
+    WHERE t.id = u.id
+      AND t.user_id = p_user_id
+    RETURNING t.id, t.payment_date;
+$$;
@@ -0,0 +1,73 @@
+-- ============================================
+-- 012: monthly_summary drops emptied months again
+-- In 007 the zero-count DELETE shared one statement with the upsert CTE.
+-- All parts of a statement see the same snapshot, so the DELETE never saw
+-- the counts the upsert had just written: a month whose transactions were
+-- all deleted or rescheduled kept a tx_count = 0 row, and the month list
+-- (get_available_months) showed it. The refresh now runs the upsert and
+-- then a separate DELETE of the touched months that reached zero.
+-- Rows already left behind are removed below.
+-- ============================================
+
+CREATE OR REPLACE FUNCTION monthly_summary_refresh()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    deltas TEXT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        deltas := 'SELECT user_id, payment_date, type, amount, 1 AS sign FROM new_rows';
+    ELSIF TG_OP = 'DELETE' THEN
+        deltas := 'SELECT user_id, payment_date, type, -amount, -1 FROM old_rows';
+    ELSE
+        deltas := 'SELECT user_id, payment_date, type, amount, 1 AS sign FROM new_rows '
+               || 'UNION ALL SELECT user_id, payment_date, type, -amount, -1 FROM old_rows';
+    END IF;
+
+    EXECUTE format($sql$
+        WITH deltas (user_id, payment_date, type, amount, sign) AS (%s)
+        INSERT INTO monthly_summary AS s (user_id, year, month, income, fixed, debit, card, tx_count)
+        SELECT
+            user_id,
+            EXTRACT(YEAR FROM payment_date)::INTEGER,
+            EXTRACT(MONTH FROM payment_date)::INTEGER,
+            COALESCE(SUM(amount) FILTER (WHERE type = 'Income'), 0),
+            COALESCE(SUM(amount) FILTER (WHERE type = 'Fixed'), 0),
+            COALESCE(SUM(amount) FILTER (WHERE type = 'Debit'), 0),
+            COALESCE(SUM(amount) FILTER (WHERE type = 'Card'), 0),
+            SUM(sign)
+        FROM deltas
+        WHERE user_id IS NOT NULL
+        GROUP BY 1, 2, 3
+        ON CONFLICT (user_id, year, month) DO UPDATE SET
+            income = s.income + EXCLUDED.income,
+            fixed = s.fixed + EXCLUDED.fixed,
+            debit = s.debit + EXCLUDED.debit,
+            card = s.card + EXCLUDED.card,
+            tx_count = s.tx_count + EXCLUDED.tx_count
+    $sql$, deltas);
+
+    -- Separate statement: sees the counts the upsert wrote
+    IF TG_OP <> 'INSERT' THEN
+        EXECUTE format($sql$
+            WITH deltas (user_id, payment_date, type, amount, sign) AS (%s)
+            DELETE FROM monthly_summary AS s
+            USING (
+                SELECT DISTINCT
+                    user_id,
+                    EXTRACT(YEAR FROM payment_date)::INTEGER AS year,
+                    EXTRACT(MONTH FROM payment_date)::INTEGER AS month
+                FROM deltas
+                WHERE user_id IS NOT NULL
+            ) AS touched
+            WHERE s.user_id = touched.user_id AND s.year = touched.year AND s.month = touched.month
+              AND s.tx_count <= 0
+        $sql$, deltas);
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+DELETE FROM monthly_summary WHERE tx_count <= 0;
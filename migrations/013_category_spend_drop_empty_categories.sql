@@ -0,0 +1,68 @@
+-- ============================================
+-- 013: category_spend drops emptied categories again
+-- Same fix as 012 for the refresh copied into 010: the zero-count DELETE
+-- shared one statement (one snapshot) with the upsert CTE, so a category
+-- whose expenses were all deleted, recategorized or rescheduled kept a
+-- (amount 0, tx_count 0) row, and budget status and the category charts
+-- still listed it. The upsert and the DELETE are now separate statements.
+-- Rows already left behind are removed below.
+-- ============================================
+
+CREATE OR REPLACE FUNCTION category_spend_refresh()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    deltas TEXT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        deltas := 'SELECT user_id, payment_date, type, category, amount, 1 AS sign FROM new_rows';
+    ELSIF TG_OP = 'DELETE' THEN
+        deltas := 'SELECT user_id, payment_date, type, category, -amount, -1 FROM old_rows';
+    ELSE
+        deltas := 'SELECT user_id, payment_date, type, category, amount, 1 AS sign FROM new_rows '
+               || 'UNION ALL SELECT user_id, payment_date, type, category, -amount, -1 FROM old_rows';
+    END IF;
+
+    EXECUTE format($sql$
+        WITH deltas (user_id, payment_date, type, category, amount, sign) AS (%s)
+        INSERT INTO category_spend AS s (user_id, year, month, category, amount, tx_count)
+        SELECT
+            user_id,
+            EXTRACT(YEAR FROM payment_date)::INTEGER,
+            EXTRACT(MONTH FROM payment_date)::INTEGER,
+            category,
+            SUM(amount),
+            SUM(sign)
+        FROM deltas
+        WHERE user_id IS NOT NULL AND category IS NOT NULL AND type <> 'Income'
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (user_id, year, month, category) DO UPDATE SET
+            amount = s.amount + EXCLUDED.amount,
+            tx_count = s.tx_count + EXCLUDED.tx_count
+    $sql$, deltas);
+
+    -- Separate statement: sees the counts the upsert wrote
+    IF TG_OP <> 'INSERT' THEN
+        EXECUTE format($sql$
+            WITH deltas (user_id, payment_date, type, category, amount, sign) AS (%s)
+            DELETE FROM category_spend AS s
+            USING (
+                SELECT DISTINCT
+                    user_id,
+                    EXTRACT(YEAR FROM payment_date)::INTEGER AS year,
+                    EXTRACT(MONTH FROM payment_date)::INTEGER AS month,
+                    category
+                FROM deltas
+                WHERE user_id IS NOT NULL AND category IS NOT NULL AND type <> 'Income'
+            ) AS touched
+            WHERE s.user_id = touched.user_id AND s.year = touched.year AND s.month = touched.month
+              AND s.category = touched.category AND s.tx_count <= 0
+        $sql$, deltas);
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+DELETE FROM category_spend WHERE tx_count <= 0;
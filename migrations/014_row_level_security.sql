@@ -0,0 +1,94 @@
+-- ============================================
+-- 014: Row level security on the per-user tables
+-- transaction_changes, recurring_rules, monthly_summary, category_budgets
+-- and category_spend were created without policies, so any signed-in user
+-- could read (and write) every other user's rows through the API.
+-- Each table now only exposes rows whose user_id is the caller's.
+-- The summary tables and the change log are written by triggers only:
+-- those functions run as their owner (SECURITY DEFINER, pinned search_path)
+-- so a user's own writes to transactions still keep them up to date.
+-- The all-user rebuild/check RPCs are reserved to the service role (cli.py).
+-- ============================================
+
+-- Supabase provides auth.uid(); plain Postgres (tests, self-hosting) gets the
+-- same definition, reading the JWT subject PostgREST puts in the settings.
+DO $$
+BEGIN
+    IF to_regprocedure('auth.uid()') IS NULL THEN
+        CREATE SCHEMA IF NOT EXISTS auth;
+        CREATE FUNCTION auth.uid()
+        RETURNS UUID
+        LANGUAGE sql
+        STABLE
+        AS $fn$
+            SELECT COALESCE(
+                NULLIF(current_setting('request.jwt.claim.sub', true), ''),
+                NULLIF(current_setting('request.jwt.claims', true), '')::jsonb ->> 'sub'
+            )::UUID
+        $fn$;
+    END IF;
+END;
+$$;
+
+-- Tables users edit directly
+ALTER TABLE recurring_rules ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS recurring_rules_owner ON recurring_rules;
+CREATE POLICY recurring_rules_owner ON recurring_rules
+    FOR ALL
+    USING (user_id = auth.uid())
+    WITH CHECK (user_id = auth.uid());
+
+ALTER TABLE category_budgets ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS category_budgets_owner ON category_budgets;
+CREATE POLICY category_budgets_owner ON category_budgets
+    FOR ALL
+    USING (user_id = auth.uid())
+    WITH CHECK (user_id = auth.uid());
+
+-- Tables maintained by triggers: read-only for users
+ALTER TABLE transaction_changes ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS transaction_changes_owner ON transaction_changes;
+CREATE POLICY transaction_changes_owner ON transaction_changes
+    FOR SELECT
+    USING (user_id = auth.uid());
+
+ALTER TABLE monthly_summary ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS monthly_summary_owner ON monthly_summary;
+CREATE POLICY monthly_summary_owner ON monthly_summary
+    FOR SELECT
+    USING (user_id = auth.uid());
+
+ALTER TABLE category_spend ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS category_spend_owner ON category_spend;
+CREATE POLICY category_spend_owner ON category_spend
+    FOR SELECT
+    USING (user_id = auth.uid());
+
+ALTER FUNCTION log_transaction_change() SECURITY DEFINER SET search_path = public, pg_temp;
+ALTER FUNCTION monthly_summary_refresh() SECURITY DEFINER SET search_path = public, pg_temp;
+ALTER FUNCTION category_spend_refresh() SECURITY DEFINER SET search_path = public, pg_temp;
+
+-- All-user maintenance RPCs: service role only
+REVOKE EXECUTE ON FUNCTION rebuild_monthly_summary(UUID) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION check_monthly_summary(UUID) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION rebuild_category_spend(UUID) FROM PUBLIC;
+
+DO $$
+DECLARE
+    role_name TEXT;
+BEGIN
+    FOREACH role_name IN ARRAY ARRAY['anon', 'authenticated'] LOOP
+        IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = role_name) THEN
+            EXECUTE format('REVOKE EXECUTE ON FUNCTION rebuild_monthly_summary(UUID) FROM %I', role_name);
+            EXECUTE format('REVOKE EXECUTE ON FUNCTION check_monthly_summary(UUID) FROM %I', role_name);
+            EXECUTE format('REVOKE EXECUTE ON FUNCTION rebuild_category_spend(UUID) FROM %I', role_name);
+        END IF;
+    END LOOP;
+
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+        GRANT EXECUTE ON FUNCTION rebuild_monthly_summary(UUID) TO service_role;
+        GRANT EXECUTE ON FUNCTION check_monthly_summary(UUID) TO service_role;
+        GRANT EXECUTE ON FUNCTION rebuild_category_spend(UUID) TO service_role;
+    END IF;
+END;
+$$;
@@ -0,0 +1,123 @@
+-- ============================================
+-- 101 (optional): Range-partition transactions by payment month
+-- Apply with: python migrate.py --postgres $DATABASE_URL --with-partitioning
+--
+-- Every dashboard query is a single-month payment_date range, so with one
+-- partition per month the planner prunes to one small table and old months
+-- can be detached/archived independently. Requires Postgres 13+.
+--
+-- Notes:
+-- - The primary key becomes (id, payment_date): unique indexes on a
+--   partitioned table must include the partition key.
+-- - transactions_default catches rows outside the created range; run
+--   SELECT create_transactions_partitions(...) ahead of time (e.g. yearly)
+--   to create partitions for upcoming months.
+-- ============================================
+
+CREATE OR REPLACE FUNCTION create_transactions_partitions(p_from DATE, p_to DATE)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_from)::DATE;
+    n_created INTEGER := 0;
+    partition_name TEXT;
+BEGIN
+    WHILE month_start <= p_to LOOP
+        partition_name := format('transactions_y%sm%s', to_char(month_start, 'YYYY'), to_char(month_start, 'MM'));
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF transactions FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month_start, (month_start + INTERVAL '1 month')::DATE
+            );
+            n_created := n_created + 1;
+        END IF;
+        month_start := (month_start + INTERVAL '1 month')::DATE;
+    END LOOP;
+    RETURN n_created;
+END;
+$$;
+
+-- 1. Swap in a partitioned table with the same columns, defaults, checks and generated columns
+ALTER TABLE transactions RENAME TO transactions_unpartitioned;
+
+CREATE TABLE transactions (
+    LIKE transactions_unpartitioned INCLUDING ALL EXCLUDING INDEXES
+) PARTITION BY RANGE (payment_date);
+
+ALTER TABLE transactions ADD PRIMARY KEY (id, payment_date);
+ALTER TABLE transactions
+    ADD FOREIGN KEY (card_id) REFERENCES credit_cards (id),
+    ADD FOREIGN KEY (recurring_rule_id) REFERENCES recurring_rules (id) ON DELETE SET NULL;
+
+-- The id sequence must survive dropping the old table
+ALTER SEQUENCE transactions_id_seq OWNED BY transactions.id;
+
+-- 2. Monthly partitions covering existing data plus two years ahead
+CREATE TABLE transactions_default PARTITION OF transactions DEFAULT;
+
+SELECT create_transactions_partitions(
+    COALESCE((SELECT MIN(payment_date) FROM transactions_unpartitioned), CURRENT_DATE),
+    (CURRENT_DATE + INTERVAL '24 months')::DATE
+);
+
+-- 3. Move the data and drop the old table (its indexes and triggers go with it)
+--    (generated columns such as search_vector are recomputed, not copied)
+DO $$
+DECLARE
+    column_list TEXT;
+BEGIN
+    SELECT string_agg(quote_ident(column_name), ', ' ORDER BY ordinal_position)
+    INTO column_list
+    FROM information_schema.columns
+    WHERE table_schema = current_schema()
+      AND table_name = 'transactions_unpartitioned'
+      AND is_generated = 'NEVER';
+
+    EXECUTE format('INSERT INTO transactions (%s) SELECT %s FROM transactions_unpartitioned', column_list, column_list);
+END;
+$$;
+DROP TABLE transactions_unpartitioned;
+
+-- 4. Recreate indexes (propagated to every partition) and triggers.
+--    Keep in sync with every index/trigger the numbered migrations put on transactions.
+CREATE INDEX idx_transactions_user_payment_date
+    ON transactions (user_id, payment_date) INCLUDE (type, amount);
+CREATE INDEX idx_transactions_user_card_payment_date
+    ON transactions (user_id, card_id, payment_date);
+CREATE UNIQUE INDEX uq_transactions_recurring_occurrence
+    ON transactions (recurring_rule_id, payment_date);
+CREATE INDEX idx_transactions_search
+    ON transactions USING GIN (search_vector);
+CREATE UNIQUE INDEX uq_transactions_content_hash
+    ON transactions (user_id, payment_date, content_hash);
+
+CREATE TRIGGER transactions_change_log
+    AFTER INSERT OR UPDATE OR DELETE ON transactions
+    FOR EACH ROW EXECUTE FUNCTION log_transaction_change();
+
+CREATE TRIGGER monthly_summary_insert
+    AFTER INSERT ON transactions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION monthly_summary_refresh();
+CREATE TRIGGER monthly_summary_delete
+    AFTER DELETE ON transactions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION monthly_summary_refresh();
+CREATE TRIGGER monthly_summary_update
+    AFTER UPDATE ON transactions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION monthly_summary_refresh();
+
+CREATE TRIGGER category_spend_insert
+    AFTER INSERT ON transactions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION category_spend_refresh();
+CREATE TRIGGER category_spend_delete
+    AFTER DELETE ON transactions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION category_spend_refresh();
+CREATE TRIGGER category_spend_update
+    AFTER UPDATE ON transactions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION category_spend_refresh();
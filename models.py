@@ -0,0 +1,174 @@
+"""
+FINANZAS PRO - Typed Row Records
+Compact, slotted replacements for the raw query dicts
+
+Supabase returns one dict per row with string dates and a nested
+credit_cards dict. Every public read in database.py converts those into the
+records below: __slots__ classes (no per-row __dict__), dates parsed into
+datetime.date, the card name flattened, and the repeated strings (user_id,
+type, category, card name) interned so 100k rows share them.
+
+Records keep their values in plain attributes; to_row() gives back the
+dict shape for places that need JSON-like data (exports, DataFrames).
+"""
+
+import sys
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Union
+
+
+def parse_date(value) -> Optional[date]:
+    """Parse a DATE column ('YYYY-MM-DD', or a timestamp) into a date"""
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(value[:10])
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+# ============================================
+# TRANSACTION
+# ============================================
+
+class Transaction:
+    """One row of `transactions` (or a pending write-queue row)"""
+
+    __slots__ = (
+        "id", "created_at", "user_id", "date", "payment_date", "amount", "category",
+        "description", "type", "card_id", "card_name", "installments_total",
+        "installment_number", "recurring_rule_id", "pending"
+    )
+
+    def __init__(
+        self,
+        id: Union[int, str, None] = None,
+        created_at: Optional[str] = None,
+        user_id: Optional[str] = None,
+        date: Optional[date] = None,
+        payment_date: Optional[date] = None,
+        amount: float = 0.0,
+        category: str = "",
+        description: str = "",
+        type: str = "",
+        card_id: Optional[int] = None,
+        card_name: Optional[str] = None,
+        installments_total: int = 1,
+        installment_number: int = 1,
+        recurring_rule_id: Optional[int] = None,
+        pending: bool = False
+    ):
+        self.id = id
+        self.created_at = created_at
+        self.user_id = user_id
+        self.date = date
+        self.payment_date = payment_date
+        self.amount = amount
+        self.category = category
+        self.description = description
+        self.type = type
+        self.card_id = card_id
+        self.card_name = card_name
+        self.installments_total = installments_total
+        self.installment_number = installment_number
+        self.recurring_rule_id = recurring_rule_id
+        self.pending = pending
+
+    @classmethod
+    def from_row(cls, row: Dict) -> "Transaction":
+        """
+        Build a record from a query row. Missing columns (narrow selects)
+        keep their defaults; the card name comes from the nested
+        credit_cards(name) embed or a flat card_name key.
+        """
+        card = row.get("credit_cards")
+        card_name = card.get("name") if card else row.get("card_name")
+
+        return cls(
+            id=row.get("id"),
+            created_at=row.get("created_at"),
+            user_id=_intern(row.get("user_id")),
+            date=parse_date(row.get("date")),
+            payment_date=parse_date(row.get("payment_date")),
+            amount=float(row.get("amount") or 0.0),
+            category=_intern(row.get("category")) or "",
+            description=row.get("description") or "",
+            type=_intern(row.get("type")) or "",
+            card_id=row.get("card_id"),
+            card_name=_intern(card_name),
+            installments_total=row.get("installments_total") or 1,
+            installment_number=row.get("installment_number") or 1,
+            recurring_rule_id=row.get("recurring_rule_id"),
+            pending=bool(row.get("pending", False))
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict]) -> List["Transaction"]:
+        return [cls.from_row(row) for row in rows]
+
+    def to_row(self) -> Dict:
+        """Flat dict of every field (dates stay date objects)"""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Transaction):
+            return NotImplemented
+        return self.to_row() == other.to_row()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (
+            f"Transaction(id={self.id!r}, type={self.type!r}, payment_date={self.payment_date}, "
+            f"amount={self.amount!r}, category={self.category!r})"
+        )
+
+# ============================================
+# CARD
+# ============================================
+
+class Card:
+    """One row of `credit_cards`"""
+
+    __slots__ = ("id", "created_at", "user_id", "name", "closing_day")
+
+    def __init__(
+        self,
+        id: Optional[int] = None,
+        created_at: Optional[str] = None,
+        user_id: Optional[str] = None,
+        name: str = "",
+        closing_day: int = 1
+    ):
+        self.id = id
+        self.created_at = created_at
+        self.user_id = user_id
+        self.name = name
+        self.closing_day = closing_day
+
+    @classmethod
+    def from_row(cls, row: Dict) -> "Card":
+        return cls(
+            id=row.get("id"),
+            created_at=row.get("created_at"),
+            user_id=row.get("user_id"),
+            name=row.get("name") or "",
+            closing_day=int(row.get("closing_day") or 1)
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict]) -> List["Card"]:
+        return [cls.from_row(row) for row in rows]
+
+    def to_row(self) -> Dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self.to_row() == other.to_row()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Card(id={self.id!r}, name={self.name!r}, closing_day={self.closing_day!r})"
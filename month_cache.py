@@ -0,0 +1,188 @@
+"""
+FINANZAS PRO - Month Cache with Background Prefetch
+Keeps the last few months a user looked at, and fetches the neighbours
+of the month on screen before the user steps to them
+
+Dashboard and transaction list navigation is almost always one month back
+or forward. After a page renders, prefetch_adjacent_months() fetches the
+previous and next month (summary + rows) on a small thread pool into a
+per-user LRU of MONTHS_PER_USER months, so stepping to them is a cache hit.
+Only those two months are fetched, never the whole history (that is what
+local mode in columnar_store.py is for).
+
+Entries carry the month's data version (database.get_data_version), so a
+write to a month makes its entry stale immediately. A request for a month
+that is still being prefetched waits for that fetch instead of issuing a
+second one.
+
+Writes this process does not count (another server process, the command
+line, scheduler jobs, the write-queue worker) do not bump the data version.
+Entries are therefore served as is for the read coalescer's TTL
+(coalesce_ttl) only. After that, an entry is revalidated against the user's
+change-log watermark (taken before its fetch): one small query instead of
+two, and the entry is dropped if anything changed. Without change tracking
+(migrations/002) an entry older than the TTL is fetched again.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import database
+from database import get_data_version
+from models import Transaction
+
+# Months kept per user (the one on screen, its neighbours, a few recent ones)
+MONTHS_PER_USER = 6
+# Users kept; the least recently active user's months are dropped first
+MAX_USERS = 256
+PREFETCH_WORKERS = 2
+
+# (summary, transactions of every type, newest first)
+MonthData = Tuple[Dict[str, float], List[Transaction]]
+
+
+
+class _Entry:
+    __slots__ = ("version", "watermark", "checked_at", "data")
+
+    def __init__(self, version: int, watermark: Optional[int], data: MonthData):
+        self.version = version
+        # Change-log seq taken before the fetch (None without change tracking)
+        self.watermark = watermark
+        self.checked_at = time.monotonic()
+        self.data = data
+
+
+_months: "OrderedDict[str, OrderedDict[Tuple[int, int], _Entry]]" = OrderedDict()
+_in_flight: Dict[Tuple[str, int, int, int], Future] = {}
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="month-prefetch")
+
+
+def _cached(
+    user_id: str,
+    year: int,
+    month: int,
+    version: int,
+    revalidate: bool = True
+) -> Optional[MonthData]:
+    with _lock:
+        user_months = _months.get(user_id)
+        entry = user_months.get((year, month)) if user_months else None
+        if entry is None or entry.version != version:
+            return None
+        _months.move_to_end(user_id)
+        user_months.move_to_end((year, month))
+        if time.monotonic() - entry.checked_at <= database.get_settings().coalesce_ttl:
+            return entry.data
+
+    # Past the TTL: still current only if nothing changed for the user since the fetch
+    if not revalidate or entry.watermark is None or database.get_change_watermark(user_id) != entry.watermark:
+        return None
+    entry.checked_at = time.monotonic()
+    return entry.data
+
+
+def _store(user_id: str, year: int, month: int, entry: _Entry) -> None:
+    with _lock:
+        user_months = _months.setdefault(user_id, OrderedDict())
+        user_months[(year, month)] = entry
+        user_months.move_to_end((year, month))
+        while len(user_months) > MONTHS_PER_USER:
+            user_months.popitem(last=False)
+
+        _months.move_to_end(user_id)
+        while len(_months) > MAX_USERS:
+            _months.popitem(last=False)
+
+
+def _fetch(user_id: str, year: int, month: int, version: int) -> MonthData:
+    # Watermark first, so a change made during the fetch fails the next revalidation
+    watermark = database.get_change_watermark(user_id)
+    data = (
+        database.get_monthly_summary(user_id, year, month),
+        database.get_monthly_transactions(user_id, year, month)
+    )
+    # A write during the fetch bumped the version: keep the data out of the cache
+    if get_data_version(user_id, year, month) == version:
+        _store(user_id, year, month, _Entry(version, watermark, data))
+    return data
+
+
+def get_month(user_id: str, year: int, month: int) -> MonthData:
+    """Get a month's summary and rows: cached, being prefetched, or fetched now"""
+    version = get_data_version(user_id, year, month)
+    data = _cached(user_id, year, month, version)
+    if data is not None:
+        return data
+
+    with _lock:
+        future = _in_flight.get((user_id, year, month, version))
+    if future is not None:
+        return future.result()
+
+    return _fetch(user_id, year, month, version)
+
+
+def get_monthly_summary(user_id: str, year: int, month: int) -> Dict[str, float]:
+    return get_month(user_id, year, month)[0]
+
+
+def get_monthly_transactions(
+    user_id: str,
+    year: int,
+    month: int,
+    trans_type: Optional[str] = None
+) -> List[Transaction]:
+    rows = get_month(user_id, year, month)[1]
+    if trans_type:
+        return [row for row in rows if row.type == trans_type]
+    return rows
+
+# ============================================
+# PREFETCH
+# ============================================
+
+def _prefetch_task(session, key: Tuple[str, int, int, int]) -> MonthData:
+    # Query as the page's user (pool threads are reused, so set it on every task)
+    database.use_session(session)
+    try:
+        return _fetch(*key)
+    finally:
+        with _lock:
+            _in_flight.pop(key, None)
+
+
+def prefetch_adjacent_months(
+    user_id: str,
+    year: int,
+    month: int,
+    available_months: List[Tuple[int, int, str]]
+) -> None:
+    """
+    Start background fetches of the months next to (year, month) in
+    available_months (the month selector's list). Returns immediately.
+    """
+    periods = [(y, m) for y, m, _ in available_months]
+    if (year, month) not in periods:
+        return
+
+    index = periods.index((year, month))
+    neighbours = [periods[i] for i in (index - 1, index + 1) if 0 <= i < len(periods)]
+    session = database.current_session()
+
+    for neighbour_year, neighbour_month in neighbours:
+        version = get_data_version(user_id, neighbour_year, neighbour_month)
+        # No revalidation query here: a stale neighbour is simply fetched again in the background
+        if _cached(user_id, neighbour_year, neighbour_month, version, revalidate=False) is not None:
+            continue
+
+        key = (user_id, neighbour_year, neighbour_month, version)
+        # Registered under the lock the task needs to unregister itself
+        with _lock:
+            if key in _in_flight:
+                continue
+            _in_flight[key] = _executor.submit(_prefetch_task, session, key)
@@ -0,0 +1,124 @@
+"""
+FINANZAS PRO - Precomputed Card Payment Calendar
+O(1) payment-date lookups for card purchases
+
+A purchase's payment date depends only on its calendar month, whether its
+day is on/before or after the card's closing day, and the closing day
+itself (1-31). So the calendar stores, for every month in a span of years
+and every closing day, the two possible payment dates:
+
+    on_or_before: this month's close (clamped to the month's last day) + grace
+    after:        next month's close (clamped) + grace
+
+That is 12 x 31 x 2 dates per year, built once per process on first use.
+Months outside the span fall back to the same computation behind a bounded
+lru_cache. Results are identical to the original relativedelta/try-except
+algorithm (see test_payment_calendar.py and benchmarks/payment_dates.py).
+
+The span defaults to CALENDAR_YEARS_BACK years before and
+CALENDAR_YEARS_AHEAD years after the current one; FINANZAS_PAYMENT_CALENDAR_YEARS
+("2010-2045") overrides it.
+"""
+
+import calendar
+import os
+import threading
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+# Days between a statement's technical close and its payment date
+PAYMENT_GRACE_DAYS = 10
+
+CALENDAR_YEARS_BACK = 15
+CALENDAR_YEARS_AHEAD = 30
+
+# Bound of the memo for months outside the precomputed span
+OUT_OF_SPAN_CACHE_SIZE = 4096
+
+
+def _close(year: int, month: int, closing_day: int) -> date:
+    """Technical close of a month's statement (clamped to the month's last day)"""
+    return date(year, month, min(closing_day, calendar.monthrange(year, month)[1]))
+
+
+def _month_payment_dates(year: int, month: int, closing_day: int) -> Tuple[date, date]:
+    """(payment date if purchase day <= closing_day, payment date otherwise)"""
+    grace = timedelta(days=PAYMENT_GRACE_DAYS)
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return (
+        _close(year, month, closing_day) + grace,
+        _close(next_year, next_month, closing_day) + grace
+    )
+
+
+@lru_cache(maxsize=OUT_OF_SPAN_CACHE_SIZE)
+def _out_of_span(year: int, month: int, closing_day: int) -> Tuple[date, date]:
+    return _month_payment_dates(year, month, closing_day)
+
+
+class PaymentCalendar:
+    """Precomputed (month, closing_day) -> payment dates table for [first_year, last_year]"""
+
+    def __init__(self, first_year: int, last_year: int):
+        self.first_year = first_year
+        self.last_year = last_year
+
+        # Payment date of each month's close, for every closing day (one extra
+        # month at the end so the last month has a "next month")
+        grace = timedelta(days=PAYMENT_GRACE_DAYS)
+        due: List[List[date]] = []
+        for year in range(first_year, last_year + 2):
+            for month in range(1, 13):
+                last_day = calendar.monthrange(year, month)[1]
+                month_due = [date(year, month, day) + grace for day in range(1, last_day + 1)]
+                due.append(month_due + [month_due[-1]] * (31 - last_day))
+
+        # Flat table: slot (month_index * 31 + closing_day - 1) -> (on_or_before, after)
+        self._table: List[Tuple[date, date]] = [
+            (due[index][day], due[index + 1][day])
+            for index in range((last_year - first_year + 1) * 12)
+            for day in range(31)
+        ]
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def payment_date(self, purchase_date: date, closing_day: int) -> date:
+        """Payment date of a card purchase made on purchase_date"""
+        year, month = purchase_date.year, purchase_date.month
+
+        if self.first_year <= year <= self.last_year and 1 <= closing_day <= 31:
+            slot = ((year - self.first_year) * 12 + month - 1) * 31 + closing_day - 1
+            dates = self._table[slot]
+        else:
+            dates = _out_of_span(year, month, closing_day)
+
+        return dates[0] if purchase_date.day <= closing_day else dates[1]
+
+# ============================================
+# PROCESS-WIDE CALENDAR
+# ============================================
+
+_calendar: Optional[PaymentCalendar] = None
+_calendar_lock = threading.Lock()
+
+
+def _configured_span() -> Tuple[int, int]:
+    span = os.environ.get("FINANZAS_PAYMENT_CALENDAR_YEARS")
+    if span:
+        first, last = (int(part) for part in span.split("-"))
+        return first, last
+
+    this_year = date.today().year
+    return this_year - CALENDAR_YEARS_BACK, this_year + CALENDAR_YEARS_AHEAD
+
+
+def get_payment_calendar() -> PaymentCalendar:
+    """Get the process-wide calendar, building it on first use"""
+    global _calendar
+    if _calendar is None:
+        with _calendar_lock:
+            if _calendar is None:
+                _calendar = PaymentCalendar(*_configured_span())
+    return _calendar
@@ -0,0 +1,144 @@
+"""
+FINANZAS PRO - Recurring Rules Scheduler
+Materializes monthly recurring incomes/expenses into `transactions`
+
+Occurrences are computed in Python for every due rule and written with one
+bulk upsert, so a user's login (or a whole-user-base job) costs a handful of
+round-trips instead of one per row. Each rule keeps a materialized_through
+watermark and occurrences are unique per (rule, payment_date), which makes
+runs idempotent: running twice, or concurrently, inserts nothing new.
+
+Usage (scheduler job for all users):
+    python recurring.py --through 2026-12-31
+"""
+
+import argparse
+import calendar
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from database import get_due_recurring_rules, save_recurring_occurrences
+
+# ============================================
+# OCCURRENCE CALCULATION
+# ============================================
+
+def end_of_month(day: date) -> date:
+    """Last day of the month containing `day`"""
+    return day.replace(day=calendar.monthrange(day.year, day.month)[1])
+
+
+def rule_occurrences(rule: Dict, through: date) -> List[Dict]:
+    """
+    Compute the transaction rows a rule still owes up to `through`.
+    
+    Rules:
+    - One occurrence per month on day_of_month, clamped to the month's last day
+    - Only dates in [start_date, end_date] and after materialized_through
+    - Amount = base amount * (1 + indexation_pct/100) ^ (months since start // period)
+    - Logic A: payment_date = date
+    """
+    start = date.fromisoformat(rule["start_date"])
+    first = start
+    if rule.get("materialized_through"):
+        first = max(start, date.fromisoformat(rule["materialized_through"]) + timedelta(days=1))
+    
+    last = through
+    if rule.get("end_date"):
+        last = min(last, date.fromisoformat(rule["end_date"]))
+    
+    if first > last:
+        return []
+    
+    base_amount = float(rule["amount"])
+    growth = 1 + float(rule.get("indexation_pct") or 0) / 100
+    period = int(rule.get("indexation_every_months") or 12)
+    
+    rows = []
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        day = min(rule["day_of_month"], calendar.monthrange(year, month)[1])
+        occurrence = date(year, month, day)
+        
+        if first <= occurrence <= last:
+            months_since_start = (year - start.year) * 12 + (month - start.month)
+            amount = round(base_amount * growth ** (months_since_start // period), 2)
+            
+            rows.append({
+                "user_id": rule["user_id"],
+                "date": occurrence.strftime("%Y-%m-%d"),
+                "payment_date": occurrence.strftime("%Y-%m-%d"),
+                "amount": amount,
+                "category": rule["category"],
+                "description": rule.get("description") or "",
+                "type": rule["type"],
+                "card_id": None,
+                "installments_total": 1,
+                "installment_number": 1,
+                "recurring_rule_id": rule["id"]
+            })
+        
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+    
+    return rows
+
+# ============================================
+# MATERIALIZATION
+# ============================================
+
+def materialize(rules: List[Dict], through: date) -> int:
+    """
+    Materialize occurrences of `rules` up to `through` in one bulk write.
+    Returns: Rows written (raises errors.DataError if the write failed)
+    """
+    if not rules:
+        return 0
+    
+    rows = []
+    for rule in rules:
+        rows.extend(rule_occurrences(rule, through))
+    
+    rule_ids = [rule["id"] for rule in rules]
+    save_recurring_occurrences(rows, rule_ids, through.strftime("%Y-%m-%d"))
+    return len(rows)
+
+
+def materialize_user(user_id: str, through: Optional[date] = None) -> int:
+    """
+    Materialize a user's due occurrences (called on login).
+    Defaults to the end of the current month.
+    """
+    through = through or end_of_month(date.today())
+    rules = get_due_recurring_rules(through.strftime("%Y-%m-%d"), user_id)
+    return materialize(rules, through)
+
+
+def materialize_all(through: Optional[date] = None) -> Tuple[int, int]:
+    """
+    Materialize due occurrences for every user (scheduler job).
+    Returns: (users_affected, rows_written)
+    """
+    through = through or end_of_month(date.today())
+    rules = get_due_recurring_rules(through.strftime("%Y-%m-%d"))
+    written = materialize(rules, through)
+    return len({rule["user_id"] for rule in rules}), written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Materialize recurring incomes/expenses for all users")
+    parser.add_argument(
+        "--through",
+        type=lambda value: datetime.strptime(value, "%Y-%m-%d").date(),
+        default=None,
+        help="Last date to materialize (YYYY-MM-DD, default: end of current month)"
+    )
+    args = parser.parse_args()
+    
+    users, rows = materialize_all(args.through)
+    print(f"Materialized {rows} occurrences for {users} users")
+
+
+if __name__ == "__main__":
+    main()
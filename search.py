@@ -0,0 +1,158 @@
+"""
+FINANZAS PRO - Transaction Search
+Free-text search over descriptions and categories, with amount/date filters
+
+Two backends with the same semantics (every query word must match the
+start of a word in the description or category, accents and case ignored):
+
+- Local mode: an inverted index (word -> row positions) built over the
+  session's columnar store. The sorted vocabulary turns prefix matching into
+  a binary search, posting lists are intersected across words, and the
+  amount/date filters run vectorized on the matching rows only. The index is
+  built once per store and dropped with it, so after a write it is rebuilt
+  from the caught-up store.
+- Otherwise: database.search_transactions (Postgres full-text search on the
+  GIN-indexed search_vector column, see migrations/008_transaction_search.sql).
+"""
+
+import bisect
+import weakref
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import database
+from columnar_store import ColumnarTransactionStore, frame_to_transactions, get_session_store
+from database import search_terms
+from models import Transaction
+
+PAGE_SIZE = 25
+
+# ============================================
+# INVERTED INDEX
+# ============================================
+
+class InvertedIndex:
+    """Word -> row positions index over a ColumnarTransactionStore frame"""
+
+    def __init__(self, store: ColumnarTransactionStore):
+        frame = store.frame
+        self.frame = frame
+
+        postings: Dict[str, List[int]] = {}
+        texts = zip(frame["category"].astype(object), frame["description"].astype(object))
+        for position, (category, description) in enumerate(texts):
+            for term in set(search_terms(f"{category or ''} {description or ''}")):
+                postings.setdefault(term, []).append(position)
+
+        self._postings = {term: np.array(rows, dtype=np.int64) for term, rows in postings.items()}
+        self._vocabulary = sorted(postings)
+
+        self._amounts = frame["amount"].to_numpy(dtype="float64")
+        self._dates = frame["date"].to_numpy(dtype="datetime64[D]")
+        self._types = frame["type"].astype(object).to_numpy()
+        # Newest purchase first; ties by id like the database query
+        ids = frame["id"].fillna(-1).to_numpy(dtype="float64")
+        self._rank = np.empty(len(frame), dtype=np.int64)
+        self._rank[np.lexsort((-ids, -self._dates.astype("int64")))] = np.arange(len(frame))
+
+    def _prefix_rows(self, prefix: str) -> np.ndarray:
+        """Rows containing any word that starts with prefix"""
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        matches = []
+        for term in self._vocabulary[start:]:
+            if not term.startswith(prefix):
+                break
+            matches.append(self._postings[term])
+
+        if not matches:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(matches))
+
+    def search(
+        self,
+        query: str,
+        page: int = 0,
+        page_size: int = PAGE_SIZE,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        trans_type: Optional[str] = None
+    ) -> Tuple[List[Transaction], int]:
+        """Same contract as database.search_transactions"""
+        rows = None
+        # Rarest-looking (longest) prefixes first keeps intersections small
+        for term in sorted(set(search_terms(query)), key=len, reverse=True):
+            matched = self._prefix_rows(term)
+            rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+            if not len(rows):
+                return [], 0
+
+        if rows is None:
+            rows = np.arange(len(self.frame), dtype=np.int64)
+
+        keep = np.ones(len(rows), dtype=bool)
+        if min_amount is not None:
+            keep &= self._amounts[rows] >= min_amount
+        if max_amount is not None:
+            keep &= self._amounts[rows] <= max_amount
+        if start_date:
+            keep &= self._dates[rows] >= np.datetime64(start_date, "D")
+        if end_date:
+            keep &= self._dates[rows] <= np.datetime64(end_date, "D")
+        if trans_type:
+            keep &= self._types[rows] == trans_type
+        rows = rows[keep]
+
+        rows = rows[np.argsort(self._rank[rows], kind="stable")]
+        offset = page * page_size
+        return frame_to_transactions(self.frame.iloc[rows[offset:offset + page_size]]), len(rows)
+
+# One index per store object; a caught-up store is a new object and gets a new index
+_indexes: "weakref.WeakKeyDictionary[ColumnarTransactionStore, InvertedIndex]" = weakref.WeakKeyDictionary()
+
+
+def get_index(store: ColumnarTransactionStore) -> InvertedIndex:
+    index = _indexes.get(store)
+    if index is None:
+        index = _indexes[store] = InvertedIndex(store)
+    return index
+
+# ============================================
+# SEARCH ENTRY POINT
+# ============================================
+
+def search_transactions(
+    user_id: str,
+    query: str,
+    page: int = 0,
+    page_size: int = PAGE_SIZE,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    trans_type: Optional[str] = None
+) -> Tuple[List[Transaction], int]:
+    """
+    Search a user's transactions (local index in local mode, Postgres otherwise).
+
+    Returns:
+        (page of transactions, newest purchase first; total number of matches)
+    """
+    filters = dict(
+        page=page,
+        page_size=page_size,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        start_date=start_date.isoformat() if start_date else None,
+        end_date=end_date.isoformat() if end_date else None,
+        trans_type=trans_type
+    )
+
+    store = get_session_store(user_id)
+    if store is not None:
+        return get_index(store).search(query, **filters)
+
+    return database.search_transactions(user_id, query, **filters)
@@ -0,0 +1,125 @@
+"""
+FINANZAS PRO - Single-Flight Read Coalescing
+Identical concurrent reads share one backend call and its result
+
+When many sessions load the same data at the same moment (the USD rate of
+the day, a user's month list with several tabs open, everyone's dashboard at
+the start of the month), each would fire its own identical query. Here the
+first caller of a key runs the load; callers of the same key that arrive
+while it is in flight wait for it and get the same result (or the same
+exception). The result stays shareable for `ttl` seconds after it completes,
+so a burst of reruns right behind it is also served without a round-trip.
+
+- Every key belongs to a scope ("cards:<user>", "month:<user>:2025-01"),
+  the same scopes as the disk cache. Write paths invalidate scopes: their
+  results are dropped, and a load still in flight is no longer joined by
+  new callers or kept once it completes.
+- Failures are never kept: the next caller after a failed load retries.
+- ttl bounds how stale a shared result can be for writes this process does
+  not see (another server process, the command line). ttl = 0 only shares
+  loads that are still in flight.
+- Results are shared, not copied: loads must return data callers do not
+  mutate (raw response rows, which database.py turns into new objects).
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+DEFAULT_TTL = 2.0
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error", "expires_at")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        # None while the load is running
+        self.expires_at: Optional[float] = None
+
+
+class SingleFlight:
+    """
+    Per-key coalescing of concurrent loads, with short-lived result sharing.
+
+    Args:
+        ttl: Seconds a completed result is still handed to new callers
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+        self.loads = 0
+        self.shared = 0
+
+        self._lock = threading.Lock()
+        self._scopes: Dict[str, Dict[Hashable, _Flight]] = {}
+        self._next_sweep = 0.0
+
+    def do(self, scope: str, key: Hashable, load: Callable[[], Any]) -> Any:
+        """Return load(), or the result of an identical load in flight or completed within ttl"""
+        now = time.monotonic()
+        with self._lock:
+            self._sweep(now)
+            flights = self._scopes.setdefault(scope, {})
+            flight = flights.get(key)
+            leader = flight is None or (flight.expires_at is not None and flight.expires_at <= now)
+            if leader:
+                flight = flights[key] = _Flight()
+                self.loads += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = load()
+        except BaseException as e:
+            flight.error = e
+            self._finish(scope, key, flight, keep=False)
+            raise
+
+        self._finish(scope, key, flight, keep=self.ttl > 0)
+        return flight.value
+
+    def _finish(self, scope: str, key: Hashable, flight: _Flight, keep: bool) -> None:
+        with self._lock:
+            flight.expires_at = time.monotonic() + self.ttl
+            flights = self._scopes.get(scope)
+            # Not ours anymore if the scope was invalidated while loading
+            if not keep and flights is not None and flights.get(key) is flight:
+                del flights[key]
+                if not flights:
+                    del self._scopes[scope]
+        flight.done.set()
+
+    def invalidate(self, scopes: Iterable[str]) -> None:
+        """Forget every result and in-flight load of the scopes"""
+        with self._lock:
+            for scope in scopes:
+                self._scopes.pop(scope, None)
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        """Invalidate every scope starting with prefix (e.g. all months of a user)"""
+        with self._lock:
+            for scope in [scope for scope in self._scopes if scope.startswith(prefix)]:
+                del self._scopes[scope]
+
+    def _sweep(self, now: float) -> None:
+        """Drop expired results, at most once per ttl (lock held)"""
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + max(self.ttl, 1.0)
+
+        for scope in list(self._scopes):
+            flights = self._scopes[scope]
+            for key in [key for key, flight in flights.items()
+                        if flight.expires_at is not None and flight.expires_at <= now]:
+                del flights[key]
+            if not flights:
+                del self._scopes[scope]
@@ -0,0 +1,189 @@
+"""
+FINANZAS PRO - Card Statement Cycles
+Groups Card transactions into per-card statements ("resúmenes")
+
+A card with closing day D closes once a month, on D or on the month's last
+day if shorter. A purchase's first installment is paid on its statement's
+close C + PAYMENT_GRACE_DAYS, so it falls in (previous due date, due date].
+Installment n is dated n - 1 months after the first (build_card_rows), which
+can be a few days off the due date of its own cycle: the grace period
+crosses month ends of different lengths. So each row's cycle is found from
+its first installment's date and shifted by n - 1 months (payment_cycle).
+One indexed range query on (user_id, card_id, payment_date), widened by
+INSTALLMENT_DRIFT_DAYS, loads any number of consecutive cycles.
+
+Windows use the card's current closing_day. If it was changed, rows saved
+under the old day keep their original payment_date and land in whichever
+current window contains their first installment's date.
+"""
+
+import calendar
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from dateutil.relativedelta import relativedelta
+
+from database import get_data_version, get_transactions_in_range
+from models import Card, Transaction
+from payment_calendar import PAYMENT_GRACE_DAYS
+
+# Closed statements cached per process (LRU bound)
+CLOSED_CACHE_SIZE = 2048
+
+# How far a later installment's payment_date can sit outside its cycle's window
+INSTALLMENT_DRIFT_DAYS = 7
+
+_closed_statements: "OrderedDict[tuple, Dict]" = OrderedDict()
+_closed_lock = threading.Lock()
+
+# ============================================
+# CLOSING WINDOWS
+# ============================================
+
+def closing_date(year: int, month: int, closing_day: int) -> date:
+    """Technical close of the month's statement (clamped to the month's last day)"""
+    return date(year, month, min(closing_day, calendar.monthrange(year, month)[1]))
+
+
+def statement_window(year: int, month: int, closing_day: int) -> Dict:
+    """
+    Describe the statement closing in (year, month).
+
+    Returns: Dict with keys:
+        - 'closing_date': Technical close of this cycle
+        - 'period_start': Day after the previous close (first purchase date of the cycle)
+        - 'due_date': Payment date (closing_date + grace period)
+        - 'payment_from': Exclusive lower bound on payment_date (previous due date)
+    """
+    close = closing_date(year, month, closing_day)
+    previous = date(year, month, 1) - relativedelta(months=1)
+    previous_close = closing_date(previous.year, previous.month, closing_day)
+
+    return {
+        "closing_date": close,
+        "period_start": previous_close + timedelta(days=1),
+        "due_date": close + timedelta(days=PAYMENT_GRACE_DAYS),
+        "payment_from": previous_close + timedelta(days=PAYMENT_GRACE_DAYS)
+    }
+
+
+def payment_cycle(payment_date: date, installment_number: int, closing_day: int) -> date:
+    """First day of the month whose statement bills a row (its closing month)"""
+    offset = installment_number - 1
+    first = payment_date - relativedelta(months=offset)
+
+    # The first installment is due at most PAYMENT_GRACE_DAYS into the month after its close
+    cycle = date(first.year, first.month, 1) - relativedelta(months=1)
+    while statement_window(cycle.year, cycle.month, closing_day)["due_date"] < first:
+        cycle += relativedelta(months=1)
+
+    return cycle + relativedelta(months=offset)
+
+
+def closing_windows(closing_day: int, first: date, last: date) -> List[Dict]:
+    """Statement windows for every cycle closing in the months from `first` to `last`"""
+    windows = []
+    current = date(first.year, first.month, 1)
+
+    while current <= last:
+        windows.append(statement_window(current.year, current.month, closing_day))
+        current += relativedelta(months=1)
+
+    return windows
+
+# ============================================
+# STATEMENTS
+# ============================================
+
+def _build_statement(card: Card, window: Dict, rows: List[Transaction]) -> Dict:
+    items = sorted(rows, key=lambda row: (row.date, row.installment_number))
+    return {
+        "card_id": card.id,
+        "card_name": card.name,
+        **window,
+        "closed": window["closing_date"] < date.today(),
+        "total": round(sum(row.amount for row in items), 2),
+        "items": items
+    }
+
+
+def _payment_range(window: Dict) -> tuple:
+    """Bounds [lo, hi) on payment_date of every row the window can bill"""
+    return (
+        window["payment_from"] - timedelta(days=INSTALLMENT_DRIFT_DAYS - 1),
+        window["due_date"] + timedelta(days=INSTALLMENT_DRIFT_DAYS + 1)
+    )
+
+
+def _cache_key(user_id: str, card: Card, window: Dict) -> tuple:
+    # A closed statement only changes if a write touches a payment month it can bill
+    lo, hi = _payment_range(window)
+    month = date(lo.year, lo.month, 1)
+    versions = []
+    while month < hi:
+        versions.append(get_data_version(user_id, month.year, month.month))
+        month += relativedelta(months=1)
+    return (user_id, card.id, card.closing_day, window["closing_date"], *versions)
+
+
+def get_card_statements(user_id: str, card: Card, first: date, last: date) -> List[Dict]:
+    """
+    Get a card's statements for every cycle closing from `first` to `last` (months).
+    Closed cycles come from the immutable cache; the rest are loaded with a
+    single range query covering all of them.
+
+    Args:
+        user_id: User's ID
+        card: Card record (id, name and closing_day are used)
+        first: Any date in the month of the first cycle
+        last: Any date in the month of the last cycle
+
+    Returns: List of statements (see _build_statement), oldest first
+    """
+    windows = closing_windows(card.closing_day, first, last)
+    statements: List[Optional[Dict]] = [None] * len(windows)
+    missing = []
+
+    with _closed_lock:
+        for i, window in enumerate(windows):
+            key = _cache_key(user_id, card, window)
+            cached = _closed_statements.get(key)
+            if cached is not None:
+                _closed_statements.move_to_end(key)
+                statements[i] = cached
+            else:
+                missing.append(i)
+
+    if missing:
+        lo = _payment_range(windows[missing[0]])[0]
+        hi = _payment_range(windows[missing[-1]])[1]
+        rows = get_transactions_in_range(
+            user_id, lo.strftime("%Y-%m-%d"), hi.strftime("%Y-%m-%d"), card_id=card.id
+        )
+
+        by_cycle: Dict[date, List[Transaction]] = {}
+        for row in rows:
+            cycle = payment_cycle(row.payment_date, row.installment_number, card.closing_day)
+            by_cycle.setdefault(cycle, []).append(row)
+
+        for i in missing:
+            window = windows[i]
+            cycle = date(window["closing_date"].year, window["closing_date"].month, 1)
+            statements[i] = _build_statement(card, window, by_cycle.get(cycle, []))
+
+        with _closed_lock:
+            for i in missing:
+                if statements[i]["closed"]:
+                    _closed_statements[_cache_key(user_id, card, windows[i])] = statements[i]
+            while len(_closed_statements) > CLOSED_CACHE_SIZE:
+                _closed_statements.popitem(last=False)
+
+    return statements
+
+
+def get_card_statement(user_id: str, card: Card, year: int, month: int) -> Dict:
+    """Get the card's statement closing in (year, month): totals and line items"""
+    cycle = date(year, month, 1)
+    return get_card_statements(user_id, card, cycle, cycle)[0]
@@ -0,0 +1,159 @@
+"""
+Tests for the per-user client pool (client_pool.py)
+Clients are stand-ins that record which user's session they carry; auth
+round-trips sleep to simulate network latency.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from client_pool import AuthTokens, ClientPool
+
+AUTH_LATENCY = 0.02
+
+
+class FakeAuth:
+    """Minimal gotrue stand-in: one session per client"""
+
+    def __init__(self):
+        self.user_id = None
+        self.refreshes = 0
+        self.signed_out = False
+
+    def _response(self, user_id: str, expires_in: float = 3600):
+        self.user_id = user_id
+        session = SimpleNamespace(
+            access_token=f"access-{user_id}-{self.refreshes}",
+            refresh_token=f"refresh-{user_id}",
+            expires_at=time.time() + expires_in,
+            expires_in=expires_in
+        )
+        return SimpleNamespace(user=SimpleNamespace(id=user_id), session=session)
+
+    def sign_in_with_password(self, credentials):
+        time.sleep(AUTH_LATENCY)
+        return self._response(credentials["email"].split("@")[0])
+
+    def set_session(self, access_token, refresh_token):
+        time.sleep(AUTH_LATENCY)
+        return self._response(refresh_token.split("-", 1)[1])
+
+    def refresh_session(self, refresh_token):
+        time.sleep(AUTH_LATENCY)
+        self.refreshes += 1
+        return self._response(refresh_token.split("-", 1)[1])
+
+    def sign_out(self):
+        self.signed_out = True
+
+
+class FakeClient:
+    def __init__(self):
+        self.auth = FakeAuth()
+
+
+def tokens_for(user_id: str, expires_in: float = 3600) -> AuthTokens:
+    return AuthTokens(f"access-{user_id}", f"refresh-{user_id}", time.time() + expires_in)
+
+
+def test_concurrent_sessions_are_isolated_and_built_in_parallel():
+    users = [f"user{i}" for i in range(200)]
+    pool = ClientPool(FakeClient, max_clients=len(users))
+
+    # Every user checks out from 3 sessions at once
+    checkouts = users * 3
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=64) as executor:
+        results = list(executor.map(lambda user_id: (user_id, pool.get(user_id, tokens_for(user_id))[0]), checkouts))
+    elapsed = time.perf_counter() - start
+
+    clients = {}
+    for user_id, client in results:
+        # Each session only ever sees a client carrying its own user's session...
+        assert client.auth.user_id == user_id
+        # ...and all sessions of a user share one client
+        assert clients.setdefault(user_id, client) is client
+
+    assert len({id(client) for client in clients.values()}) == len(users)
+    assert len(pool) == len(users)
+
+    # One auth round-trip per user, overlapped across users (serialized: 4s)
+    serialized = len(users) * AUTH_LATENCY
+    assert elapsed < serialized / 4, f"{elapsed:.2f}s for {len(users)} users"
+
+
+def test_sign_in_pools_a_dedicated_client():
+    pool = ClientPool(FakeClient)
+
+    _, ana_tokens = pool.sign_in("ana@example.com", "secret")
+    pool.sign_in("bob@example.com", "secret")
+
+    client, tokens = pool.get("ana", ana_tokens)
+    assert client.auth.user_id == "ana"
+    assert tokens == ana_tokens
+    assert pool.get("bob", tokens_for("bob"))[0] is not client
+
+
+def test_lru_bound_and_rebuild_from_tokens():
+    pool = ClientPool(FakeClient, max_clients=2)
+
+    first = pool.get("a", tokens_for("a"))[0]
+    pool.get("b", tokens_for("b"))
+    pool.get("a", tokens_for("a"))
+    pool.get("c", tokens_for("c"))
+
+    # "b" was the least recently used
+    assert "a" in pool and "c" in pool and "b" not in pool
+    assert pool.get("a", tokens_for("a"))[0] is first
+
+    rebuilt = pool.get("b", tokens_for("b"))[0]
+    assert rebuilt.auth.user_id == "b"
+    assert len(pool) == 2
+
+
+def test_idle_clients_are_evicted():
+    pool = ClientPool(FakeClient, idle_seconds=0.05)
+
+    pool.get("a", tokens_for("a"))
+    time.sleep(0.1)
+    pool.get("b", tokens_for("b"))
+
+    assert "a" not in pool and "b" in pool
+
+
+def test_expiring_tokens_are_refreshed_once():
+    pool = ClientPool(FakeClient, refresh_margin=60)
+
+    client, tokens = pool.get("a", tokens_for("a"))
+    # Pretend the pooled session is about to expire
+    pool._entries["a"].tokens = tokens._replace(expires_at=time.time() + 10)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: pool.get("a", tokens), range(8)))
+
+    assert client.auth.refreshes == 1
+    assert all(result[0] is client for result in results)
+    assert all(result[1].expires_at > time.time() + 60 for result in results)
+    assert results[0][1] != tokens
+
+
+def test_sign_out_revokes_and_drops_client():
+    pool = ClientPool(FakeClient)
+    client, _ = pool.get("a", tokens_for("a"))
+
+    pool.sign_out("a")
+
+    assert client.auth.signed_out
+    assert "a" not in pool
+
+
+def test_checkout_without_tokens_serves_pooled_users_only():
+    pool = ClientPool(FakeClient)
+    pool.sign_in("alice@example.com", "secret")
+
+    assert pool.checkout("alice").auth.user_id == "alice"
+    assert pool.checkout("bob") is None
+
+    pool.sign_out("alice")
+    assert pool.checkout("alice") is None
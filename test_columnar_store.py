@@ -0,0 +1,115 @@
+"""
+Tests for local mode's columnar store (columnar_store.py)
+"""
+
+from datetime import date
+
+import pytest
+
+pytest.importorskip("dateutil")
+pytest.importorskip("pandas")
+pytest.importorskip("streamlit")
+
+import database
+from benchmarks.local_backend import LocalBackend
+from columnar_store import ColumnarTransactionStore
+from database import Settings
+from models import Transaction
+
+
+def tx(id, payment_date, amount=10.0, type="Debit", pending=False):
+    day = date.fromisoformat(payment_date)
+    return Transaction(
+        id=id, date=day, payment_date=day, amount=amount, category="Super", type=type, pending=pending
+    )
+
+
+def slice_dates(store, year, month):
+    return [str(value)[:10] for value in store.month_slice(year, month)["payment_date"]]
+
+
+def test_month_slice_keeps_first_and_last_day():
+    store = ColumnarTransactionStore.from_rows([
+        tx(1, "2025-03-01"), tx(2, "2025-01-31"), tx(3, "2025-02-28"),
+        tx(4, "2025-02-01"), tx(5, "2024-02-29"), tx(6, "2024-12-31"),
+    ])
+
+    assert slice_dates(store, 2025, 1) == ["2025-01-31"]
+    assert slice_dates(store, 2025, 2) == ["2025-02-01", "2025-02-28"]
+    assert slice_dates(store, 2025, 3) == ["2025-03-01"]
+    assert slice_dates(store, 2024, 2) == ["2024-02-29"]
+    assert slice_dates(store, 2024, 12) == ["2024-12-31"]
+    assert slice_dates(store, 2025, 4) == []
+    assert [month[:2] for month in store.available_months()] == [
+        (2025, 3), (2025, 2), (2025, 1), (2024, 12), (2024, 2),
+    ]
+
+
+def test_apply_changes_inserts_updates_and_deletes():
+    store = ColumnarTransactionStore.from_rows([
+        tx(1, "2025-01-10", 100.0),
+        tx(2, "2025-01-20", 20.0),
+        tx(3, "2025-02-05", 30.0),
+        tx("pending-1", "2025-01-15", 5.0, pending=True),
+    ])
+
+    updated = store.apply_changes(
+        upserted=[tx(2, "2025-02-20", 25.0), tx(4, "2025-01-25", 40.0, type="Income")],
+        deleted_ids=[3],
+        pending=[tx("pending-2", "2025-02-01", 7.0, pending=True)]
+    )
+
+    assert [(row.id, row.amount) for row in updated.monthly_transactions(2025, 1)] == [(4, 40.0), (1, 100.0)]
+    assert [(row.id, row.amount) for row in updated.monthly_transactions(2025, 2)] == [
+        (2, 25.0), ("pending-2", 7.0),
+    ]
+    assert updated.monthly_summary(2025, 1) == {
+        "income": 40.0, "fixed": 0.0, "debit": 100.0, "card": 0.0, "net_balance": -60.0,
+    }
+    # The original store is left as it was
+    assert len(store) == 4
+    assert [row.id for row in store.monthly_transactions(2025, 2)] == [3]
+
+
+@pytest.fixture()
+def backend():
+    """A local SQLite backend with a signed-in user (backend.user_id)"""
+    previous = database._settings
+    backend = LocalBackend()
+    database.configure(Settings("local", "local", client_factory=backend.client))
+    _, session = database.sign_in("columnar@example.com", "test")
+    database.use_session(session)
+    backend.user_id = session.user_id
+    yield backend
+    database.use_session(None)
+    database.sign_out(session.user_id)
+    database._settings = previous
+
+
+def test_months_match_range_queries(backend):
+    for payment_date, amount, trans_type in [
+        ("2024-12-31", 1.0, "Debit"),
+        ("2025-01-01", 2.0, "Card"),
+        ("2025-01-15", 3.0, "Income"),
+        ("2025-01-31", 4.0, "Fixed"),
+        ("2025-02-01", 5.0, "Debit"),
+        ("2025-02-28", 6.0, "Card"),
+        ("2025-03-01", 7.0, "Debit"),
+    ]:
+        backend.run(
+            "INSERT INTO transactions (user_id, date, payment_date, amount, category, description, type) "
+            "VALUES (?, ?, ?, ?, 'Super', '', ?)",
+            [backend.user_id, payment_date, payment_date, amount, trans_type]
+        )
+
+    rows = database.get_transactions_in_range(backend.user_id, "0001-01-01", "9999-12-31")
+    store = ColumnarTransactionStore.from_rows(rows)
+
+    for start, end in [
+        ("2024-12-01", "2025-01-01"), ("2025-01-01", "2025-02-01"),
+        ("2025-02-01", "2025-03-01"), ("2025-03-01", "2025-04-01"), ("2025-04-01", "2025-05-01"),
+    ]:
+        expected = database.get_transactions_in_range(backend.user_id, start, end)
+        local = store.month_slice(int(start[:4]), int(start[5:7]))
+        assert sorted(local["id"]) == sorted(row.id for row in expected), start
+        assert local["amount"].sum() == sum(row.amount for row in expected), start
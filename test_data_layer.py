@@ -0,0 +1,182 @@
+"""
+Tests for the Streamlit-free data layer (database.py + errors.py)
+No Supabase connection: credentials are left unset, so calls fail fast.
+"""
+
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("dateutil")
+
+import database
+from benchmarks.local_backend import LocalBackend, PolicyViolation
+from database import Settings, UserSession
+from errors import ConfigurationError, DataError, ValidationError
+from write_queue import WriteQueue
+
+
+@pytest.fixture(autouse=True)
+def no_credentials():
+    previous = database._settings
+    database.configure(Settings(supabase_url=None, supabase_key=None))
+    yield
+    database._settings = previous
+
+
+@pytest.fixture()
+def backend():
+    """A local SQLite backend with a signed-in user (backend.user_id)"""
+    backend = LocalBackend()
+    database.configure(Settings("local", "local", client_factory=backend.client))
+    _, session = database.sign_in("data-layer@example.com", "test")
+    database.use_session(session)
+    backend.user_id = session.user_id
+    yield backend
+    database.use_session(None)
+    database.sign_out(session.user_id)
+
+
+def test_import_does_not_load_streamlit():
+    code = "import sys, database; print('streamlit' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_login_page_does_not_load_the_data_layer():
+    pytest.importorskip("streamlit")
+    code = "import sys; from views import login; print('database' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_failures_raise_typed_errors():
+    with pytest.raises(ConfigurationError):
+        database.get_all_cards("user-1")
+
+    with pytest.raises(ValidationError):
+        database.build_cash_row("user-1", "Card", None, 10.0, "Food")
+
+
+def test_wrap_keeps_data_errors_and_wraps_the_rest():
+    original = ValueError("timeout")
+    wrapped = DataError.wrap("Error fetching cards", original)
+    assert str(wrapped) == "Error fetching cards: timeout"
+    assert wrapped.__cause__ is original
+
+    not_found = ValidationError("bad")
+    assert DataError.wrap("Error fetching cards", not_found) is not_found
+
+
+def test_sessions_are_per_thread():
+    main_session = UserSession("main", None)
+    database.use_session(main_session)
+
+    def worker(user_id):
+        database.use_session(UserSession(user_id, None))
+        return database.current_session().user_id
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert list(executor.map(worker, ["a", "b", "c", "d"])) == ["a", "b", "c", "d"]
+
+    assert database.current_session() is main_session
+    database.use_session(None)
+
+
+def test_cache_epoch_advances_every_coalesce_ttl(monkeypatch):
+    database.configure(Settings(supabase_url=None, supabase_key=None, coalesce_ttl=2.0))
+    clock = [100.0]
+    monkeypatch.setattr(database.time, "monotonic", lambda: clock[0])
+
+    epoch = database.get_cache_epoch()
+    clock[0] = 101.5
+    assert database.get_cache_epoch() == epoch
+    clock[0] = 102.0
+    assert database.get_cache_epoch() == epoch + 1
+
+    # ttl = 0: nothing is shared, so no two calls give the same epoch
+    database.configure(Settings(supabase_url=None, supabase_key=None, coalesce_ttl=0))
+    assert database.get_cache_epoch() != database.get_cache_epoch()
+
+
+def test_category_spend_series_reads_the_monthly_totals(backend):
+    for payment_date, category, amount, trans_type in [
+        ("2024-12-20", "Super", 50.0, "Debit"),
+        ("2025-01-10", "Super", 100.0, "Debit"),
+        ("2025-01-15", "Super", 20.0, "Card"),
+        ("2025-01-15", "Sueldo", 900.0, "Income"),
+        ("2025-02-03", "Ropa", 70.0, "Fixed"),
+        ("2025-03-01", "Ropa", 10.0, "Debit"),
+    ]:
+        backend.run(
+            "INSERT INTO transactions (user_id, date, payment_date, amount, category, description, type) "
+            "VALUES (?, ?, ?, ?, ?, '', ?)",
+            [backend.user_id, payment_date, payment_date, amount, category, trans_type]
+        )
+
+    requests = backend.requests
+    spend = database.get_category_spend(backend.user_id, "2025-01-01", "2025-03-01")
+
+    assert backend.requests == requests + 1
+    assert sorted((row["year"], row["month"], row["category"], row["amount"]) for row in spend) == [
+        (2025, 1, "Super", 120.0),
+        (2025, 2, "Ropa", 70.0),
+    ]
+
+
+class FailingClient:
+    """Client whose every query fails with a PostgREST-style error code"""
+
+    def __init__(self, code):
+        self.code = code
+
+    def table(self, name):
+        error = Exception(f"{self.code}: relation {name} failed")
+        error.code = self.code
+        raise error
+
+
+@pytest.mark.parametrize("code", ["42P01", "PGRST205"])
+def test_watermark_is_none_without_change_tracking(monkeypatch, code):
+    monkeypatch.setattr(database, "get_supabase_client", lambda: FailingClient(code))
+    assert database.get_change_watermark("user-1") is None
+
+
+def test_watermark_errors_are_raised(monkeypatch):
+    monkeypatch.setattr(database, "get_supabase_client", lambda: FailingClient("57014"))
+    with pytest.raises(DataError, match="Error fetching change watermark"):
+        database.get_change_watermark("user-1")
+
+
+def test_queued_rows_are_flushed_through_their_users_client(tmp_path):
+    backend = LocalBackend(rls=True)
+    database.configure(Settings("local", "local", client_factory=backend.client))
+    _, alice = database.sign_in("alice@example.com", "test")
+    _, bob = database.sign_in("bob@example.com", "test")
+    carol = "00000000-0000-0000-0000-00000000000c"
+
+    # The stand-in rejects anonymous writes, as RLS does
+    with pytest.raises(PolicyViolation):
+        backend.client().table("transactions").insert({"user_id": alice.user_id}).execute()
+
+    queue = WriteQueue(str(tmp_path / "queue.db"), database._flush_queued_rows)
+    try:
+        queue.enqueue([
+            database.build_cash_row(user_id, "Debit", datetime(2025, 1, 10), 10.0, "Super")
+            for user_id in (alice.user_id, bob.user_id)
+        ])
+        assert queue.flush_once() == 2
+        owners = backend.run("SELECT user_id FROM transactions ORDER BY user_id", [])
+        assert [row["user_id"] for row in owners] == sorted([alice.user_id, bob.user_id])
+
+        # Not signed in here and no service role key: kept for a later retry
+        queue.enqueue([database.build_cash_row(carol, "Debit", datetime(2025, 1, 11), 5.0, "Super")])
+        assert queue.flush_once() == 0
+        pending, failing, last_error = queue.status(carol)
+        assert (pending, failing) == (1, 1) and "service role key" in last_error
+    finally:
+        database.sign_out(alice.user_id)
+        database.sign_out(bob.user_id)
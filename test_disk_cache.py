@@ -0,0 +1,75 @@
+"""
+Tests for the persistent read cache (disk_cache.py)
+"""
+
+import pytest
+
+from disk_cache import DiskCache
+
+SCOPE = "month:user-1:2025-01"
+
+
+@pytest.fixture()
+def cache_path(tmp_path):
+    return str(tmp_path / "cache.db")
+
+
+def test_values_survive_reopening(cache_path):
+    cache = DiskCache(cache_path)
+    rows = [{"id": 1, "amount": 10.5, "date": "2025-01-03", "credit_cards": {"name": "Visa"}}]
+    assert cache.put("rows:user-1:2025-01", SCOPE, cache.generation(SCOPE), rows)
+    cache.close()
+
+    # A restarted server reads what the previous process stored
+    reopened = DiskCache(cache_path)
+    assert reopened.get("rows:user-1:2025-01", SCOPE) == rows
+    assert reopened.get("rows:user-1:2025-02", SCOPE) is None
+
+
+def test_invalidation_drops_entries_and_rejects_racing_loads(cache_path):
+    cache = DiskCache(cache_path)
+    cache.put("summary", SCOPE, cache.generation(SCOPE), {"income": 1.0})
+
+    # A load starts, a write invalidates the scope, then the load finishes
+    generation = cache.generation(SCOPE)
+    cache.invalidate([SCOPE])
+    assert cache.get("summary", SCOPE) is None
+    assert not cache.put("summary", SCOPE, generation, {"income": 1.0})
+
+    assert cache.put("summary", SCOPE, cache.generation(SCOPE), {"income": 2.0})
+    assert cache.get("summary", SCOPE) == {"income": 2.0}
+
+
+def test_prefix_invalidation_only_touches_matching_scopes(cache_path):
+    cache = DiskCache(cache_path)
+    scopes = ["month:user-1:2025-01", "month:user-1:2025-02", "month:user-10:2025-01", "cards:user-1"]
+    for scope in scopes:
+        cache.put(f"value:{scope}", scope, cache.generation(scope), scope)
+
+    cache.invalidate_prefix("month:user-1:")
+
+    values = [cache.get(f"value:{scope}", scope) for scope in scopes]
+    assert values == [None, None, "month:user-10:2025-01", "cards:user-1"]
+
+
+def test_size_bound_evicts_least_recently_read(cache_path):
+    cache = DiskCache(cache_path, max_bytes=1000)
+    value = "x" * 200
+    for i in range(4):
+        cache.put(f"k{i}", SCOPE, cache.generation(SCOPE), value)
+    cache.get("k0", SCOPE)
+
+    cache.put("k4", SCOPE, cache.generation(SCOPE), value)
+    cache.put("k5", SCOPE, cache.generation(SCOPE), value)
+
+    assert cache.size() <= 1000
+    assert cache.get("k0", SCOPE) == value
+    assert cache.get("k1", SCOPE) is None
+    assert cache.get("k5", SCOPE) == value
+
+
+def test_old_entries_are_not_served(cache_path):
+    cache = DiskCache(cache_path, max_age=0)
+    cache.put("value", SCOPE, cache.generation(SCOPE), 1)
+
+    assert cache.get("value", SCOPE) is None
@@ -0,0 +1,436 @@
+"""
+Test Script for Schema Migrations and Query Plans
+Applies migrations/ to an in-memory SQLite stand-in and checks with
+EXPLAIN QUERY PLAN that every access path used by database.py hits an index.
+
+Set DATABASE_URL to also run the Postgres EXPLAIN checks against a local
+(disposable) Postgres with the migrations applied.
+"""
+
+import os
+import re
+import sqlite3
+
+import pytest
+
+from migrate import apply_migrations, connect_postgres, list_migrations
+
+USER = "00000000-0000-0000-0000-000000000001"
+
+# Parameter values by the column they are compared with, in the column's type
+# (Postgres rejects a UUID bound to a bigint); repeated columns take the next value
+PARAM_VALUES = {
+    "user_id": (USER,),
+    "year": (2025, 2025),
+    "month": (1,),
+    "card_id": (1,),
+    "seq": (0,),
+    "payment_date": ("2025-01-01", "2025-02-01"),
+    "content_hash": ("hash-1", "hash-2"),
+    "category": ("Super", "Ropa"),
+    "type": ("Debit",),
+}
+
+# Primary key index of monthly_summary (SQLite / Postgres names)
+SUMMARY_PK = ("sqlite_autoindex_monthly_summary_1", "monthly_summary_pkey")
+
+# Indexes with a (user_id, payment_date) prefix: either serves a month range seek
+USER_PAYMENT_DATE = ("idx_transactions_user_payment_date", "uq_transactions_content_hash")
+
+# (description, query as issued by database.py, index (or indexes) allowed to serve it)
+ACCESS_PATHS = [
+    (
+        "get_monthly_summary",
+        "SELECT income, fixed, debit, card FROM monthly_summary WHERE user_id = ? AND year = ? AND month = ?",
+        SUMMARY_PK,
+    ),
+    (
+        "get_transactions_in_range",
+        "SELECT type, amount FROM transactions "
+        "WHERE user_id = ? AND payment_date >= ? AND payment_date < ?",
+        USER_PAYMENT_DATE,
+    ),
+    (
+        "get_monthly_transactions",
+        "SELECT * FROM transactions "
+        "WHERE user_id = ? AND payment_date >= ? AND payment_date < ? AND type = ? ORDER BY date DESC",
+        USER_PAYMENT_DATE,
+    ),
+    (
+        "get_available_months",
+        "SELECT year, month FROM monthly_summary WHERE user_id = ?",
+        SUMMARY_PK,
+    ),
+    (
+        "delete_card (has transactions?)",
+        "SELECT id FROM transactions WHERE card_id = ? AND user_id = ? LIMIT 1",
+        "idx_transactions_user_card_payment_date",
+    ),
+    (
+        "card statements",
+        "SELECT * FROM transactions "
+        "WHERE user_id = ? AND card_id = ? AND payment_date >= ? AND payment_date < ?",
+        "idx_transactions_user_card_payment_date",
+    ),
+    (
+        "get_transaction_changes",
+        "SELECT seq, transaction_id, op FROM transaction_changes WHERE user_id = ? AND seq > ? ORDER BY seq",
+        "idx_transaction_changes_user_seq",
+    ),
+    (
+        "find_existing_hashes",
+        "SELECT DISTINCT content_hash FROM transactions "
+        "WHERE user_id = ? AND payment_date >= ? AND content_hash IN (?, ?)",
+        "uq_transactions_content_hash",
+    ),
+    (
+        "get_budget_status",
+        "SELECT category, amount FROM category_spend "
+        "WHERE user_id = ? AND year = ? AND month = ? AND category IN (?, ?)",
+        ("sqlite_autoindex_category_spend_1", "category_spend_pkey"),
+    ),
+    (
+        "get_category_spend",
+        "SELECT year, month, category, amount FROM category_spend "
+        "WHERE user_id = ? AND year >= ? AND year <= ?",
+        ("sqlite_autoindex_category_spend_1", "category_spend_pkey"),
+    ),
+    (
+        "get_category_budgets",
+        "SELECT category, monthly_limit, alert_pct FROM category_budgets WHERE user_id = ? ORDER BY category",
+        ("sqlite_autoindex_category_budgets_1", "category_budgets_pkey"),
+    ),
+    (
+        "get_all_cards",
+        "SELECT * FROM credit_cards WHERE user_id = ?",
+        "idx_credit_cards_user",
+    ),
+]
+
+
+def _uses_index(plan: str, index) -> bool:
+    candidates = (index,) if isinstance(index, str) else index
+    return any(candidate in plan for candidate in candidates)
+
+
+def _params(sql: str) -> tuple:
+    params = []
+    used = {}
+    for i in range(sql.count("?")):
+        before = "?".join(sql.split("?")[:i + 1])
+        # Column of the comparison ("col = ?", "col >= ?", "col IN (?, ?")
+        column = re.findall(r"(\w+)\s*(?:=|>=|<=|<|>|IN)\s*\(?", before)[-1]
+        values = PARAM_VALUES[column]
+        params.append(values[used.get(column, 0) % len(values)])
+        used[column] = used.get(column, 0) + 1
+    return tuple(params)
+
+
+@pytest.fixture()
+def sqlite_db():
+    conn = sqlite3.connect(":memory:")
+    apply_migrations(conn, "sqlite")
+
+    # A few thousand rows and fresh statistics, so the plans are realistic
+    conn.executemany(
+        "INSERT INTO transactions (user_id, date, payment_date, amount, category, type, card_id) "
+        "VALUES (?, ?, ?, ?, ?, ?, NULL)",
+        [
+            (f"user-{i % 50}", f"2024-{i % 12 + 1:02d}-10", f"2024-{i % 12 + 1:02d}-10", 10.0, "Varios", "Debit")
+            for i in range(5000)
+        ]
+    )
+    conn.execute("ANALYZE")
+    yield conn
+    conn.close()
+
+
+def test_sqlite_migrations_are_idempotent(sqlite_db):
+    assert apply_migrations(sqlite_db, "sqlite") == []
+
+    applied = {row[0] for row in sqlite_db.execute("SELECT version FROM schema_migrations")}
+    assert "001_base_schema" in applied
+
+
+def test_every_migration_has_a_version_prefix():
+    versions = [version for version, _ in list_migrations(include_optional=True)]
+    assert versions == sorted(versions)
+    assert len({version[:3] for version in versions}) == len(versions)
+
+
+@pytest.mark.parametrize("description, sql, index", ACCESS_PATHS)
+def test_sqlite_access_paths_use_indexes(sqlite_db, description, sql, index):
+    plan = " | ".join(row[-1] for row in sqlite_db.execute(f"EXPLAIN QUERY PLAN {sql}", _params(sql)))
+
+    assert _uses_index(plan, index), f"{description}: {plan}"
+    assert "SCAN transactions" not in plan, f"{description}: {plan}"
+
+
+def _summary_drift(conn) -> list:
+    """(user, year, month) rows where monthly_summary disagrees with transactions"""
+    actual = """
+        SELECT user_id, CAST(strftime('%Y', payment_date) AS INTEGER) AS year,
+               CAST(strftime('%m', payment_date) AS INTEGER) AS month,
+               ROUND(SUM(CASE WHEN type = 'Income' THEN amount ELSE 0 END), 2),
+               ROUND(SUM(CASE WHEN type = 'Fixed' THEN amount ELSE 0 END), 2),
+               ROUND(SUM(CASE WHEN type = 'Debit' THEN amount ELSE 0 END), 2),
+               ROUND(SUM(CASE WHEN type = 'Card' THEN amount ELSE 0 END), 2),
+               COUNT(*)
+        FROM transactions WHERE user_id IS NOT NULL GROUP BY 1, 2, 3
+    """
+    summary = """
+        SELECT user_id, year, month, ROUND(income, 2), ROUND(fixed, 2),
+               ROUND(debit, 2), ROUND(card, 2), tx_count
+        FROM monthly_summary
+    """
+    missing = conn.execute(f"SELECT * FROM ({actual}) EXCEPT SELECT * FROM ({summary})").fetchall()
+    extra = conn.execute(f"SELECT * FROM ({summary}) EXCEPT SELECT * FROM ({actual})").fetchall()
+    return missing + extra
+
+
+def test_sqlite_monthly_summary_follows_writes(sqlite_db):
+    assert _summary_drift(sqlite_db) == []
+
+    sqlite_db.executemany(
+        "INSERT INTO transactions (user_id, date, payment_date, amount, category, type) VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (USER, "2025-01-05", "2025-01-05", 1000.0, "Sueldo", "Income"),
+            (USER, "2025-01-06", "2025-02-15", 250.5, "Ropa", "Card"),
+            (USER, "2025-01-07", "2025-01-07", 80.0, "Super", "Debit"),
+            (None, "2025-01-08", "2025-01-08", 5.0, "Huérfano", "Debit"),
+        ]
+    )
+    assert _summary_drift(sqlite_db) == []
+
+    # Reschedule into another month, retype, claim an orphan, delete
+    sqlite_db.execute("UPDATE transactions SET payment_date = '2025-03-15' WHERE category = 'Ropa'")
+    sqlite_db.execute("UPDATE transactions SET type = 'Fixed', amount = 90.0 WHERE category = 'Super'")
+    sqlite_db.execute("UPDATE transactions SET user_id = ? WHERE user_id IS NULL", (USER,))
+    sqlite_db.execute("DELETE FROM transactions WHERE category = 'Sueldo'")
+    sqlite_db.execute("DELETE FROM transactions WHERE user_id = 'user-3'")
+    assert _summary_drift(sqlite_db) == []
+
+    # Emptied months disappear, so the table doubles as the month list
+    months = sqlite_db.execute(
+        "SELECT year, month FROM monthly_summary WHERE user_id = ? ORDER BY year, month", (USER,)
+    ).fetchall()
+    assert months == [(2025, 1), (2025, 3)]
+    assert sqlite_db.execute("SELECT COUNT(*) FROM monthly_summary WHERE user_id = 'user-3'").fetchone()[0] == 0
+
+
+def _category_spend_drift(conn) -> list:
+    """(user, year, month, category) rows where category_spend disagrees with transactions"""
+    actual = """
+        SELECT user_id, CAST(strftime('%Y', payment_date) AS INTEGER) AS year,
+               CAST(strftime('%m', payment_date) AS INTEGER) AS month,
+               category, ROUND(SUM(amount), 2), COUNT(*)
+        FROM transactions
+        WHERE user_id IS NOT NULL AND category IS NOT NULL AND type <> 'Income'
+        GROUP BY 1, 2, 3, 4
+    """
+    spend = "SELECT user_id, year, month, category, ROUND(amount, 2), tx_count FROM category_spend"
+    missing = conn.execute(f"SELECT * FROM ({actual}) EXCEPT SELECT * FROM ({spend})").fetchall()
+    extra = conn.execute(f"SELECT * FROM ({spend}) EXCEPT SELECT * FROM ({actual})").fetchall()
+    return missing + extra
+
+
+def test_sqlite_category_spend_follows_writes(sqlite_db):
+    assert _category_spend_drift(sqlite_db) == []
+
+    sqlite_db.executemany(
+        "INSERT INTO transactions (user_id, date, payment_date, amount, category, type) VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (USER, "2025-01-05", "2025-01-05", 1000.0, "Sueldo", "Income"),
+            (USER, "2025-01-06", "2025-02-15", 250.5, "Super", "Card"),
+            (USER, "2025-01-06", "2025-03-15", 250.5, "Super", "Card"),
+            (USER, "2025-02-07", "2025-02-07", 80.0, "Super", "Debit"),
+        ]
+    )
+    assert _category_spend_drift(sqlite_db) == []
+    assert sqlite_db.execute(
+        "SELECT amount FROM category_spend WHERE user_id = ? AND year = 2025 AND month = 2 AND category = 'Super'",
+        (USER,)
+    ).fetchone()[0] == 330.5
+
+    # Recategorize, reschedule, turn an expense into income, delete
+    sqlite_db.execute("UPDATE transactions SET category = 'Comida' WHERE type = 'Debit' AND user_id = ?", (USER,))
+    sqlite_db.execute("UPDATE transactions SET payment_date = '2025-04-15' WHERE payment_date = '2025-03-15'")
+    sqlite_db.execute("UPDATE transactions SET type = 'Income' WHERE category = 'Comida'")
+    sqlite_db.execute("DELETE FROM transactions WHERE payment_date = '2025-02-15'")
+    sqlite_db.execute("DELETE FROM transactions WHERE user_id = 'user-3'")
+    assert _category_spend_drift(sqlite_db) == []
+
+    rows = sqlite_db.execute(
+        "SELECT year, month, category FROM category_spend WHERE user_id = ? ORDER BY year, month", (USER,)
+    ).fetchall()
+    assert rows == [(2025, 4, "Super")]
+
+
+def test_sqlite_content_hash_makes_repeats_no_ops(sqlite_db):
+    insert = (
+        "INSERT INTO transactions (user_id, date, payment_date, amount, category, type, content_hash) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (user_id, payment_date, content_hash) DO NOTHING"
+    )
+    rows = [
+        (USER, "2025-01-05", "2025-01-15", 100.0, "Ropa", "Card", "hash-1"),
+        (USER, "2025-01-05", "2025-02-15", 100.0, "Ropa", "Card", "hash-2"),
+        # Saved with allow_duplicate: no hash, never conflicts
+        (USER, "2025-01-06", "2025-01-06", 5.0, "Café", "Debit", None),
+    ]
+
+    sqlite_db.executemany(insert, rows)
+    sqlite_db.executemany(insert, rows)
+
+    count = sqlite_db.execute("SELECT COUNT(*) FROM transactions WHERE user_id = ?", (USER,)).fetchone()[0]
+    assert count == 4
+    assert _summary_drift(sqlite_db) == []
+
+
+@pytest.fixture()
+def postgres_db():
+    """Migrated Postgres connection; everything a test writes is rolled back"""
+    if not os.environ.get("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+
+    conn = connect_postgres(os.environ["DATABASE_URL"])
+    try:
+        apply_migrations(conn, "postgres")
+        yield conn
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+@pytest.mark.parametrize("description, sql, index", ACCESS_PATHS)
+def test_postgres_access_paths_use_indexes(postgres_db, description, sql, index):
+    cursor = postgres_db.cursor()
+
+    # A few thousand rows over 50 users and 100 cards, and fresh statistics
+    cursor.execute(
+        "INSERT INTO credit_cards (user_id, name, closing_day) "
+        "SELECT ('00000000-0000-0000-0000-' || lpad((g % 50)::text, 12, '0'))::uuid, 'Card ' || g, 10 "
+        "FROM generate_series(1, 100) AS g"
+    )
+    cursor.execute(
+        "INSERT INTO transactions (user_id, date, payment_date, amount, category, type, card_id) "
+        "SELECT c.user_id, d, d, 10, 'Varios', 'Card', c.id "
+        "FROM credit_cards AS c, generate_series(date '2025-01-10', date '2025-12-10', interval '1 month') AS d"
+    )
+    cursor.execute(
+        "INSERT INTO transactions (user_id, date, payment_date, amount, category, type) "
+        "SELECT ('00000000-0000-0000-0000-' || lpad((g % 50)::text, 12, '0'))::uuid, d, d, 10, 'Varios', 'Debit' "
+        "FROM generate_series(1, 250) AS g, generate_series(date '2025-01-10', date '2025-12-10', interval '1 month') AS d"
+    )
+    cursor.execute("ANALYZE")
+
+    # Small tables would otherwise always be seq-scanned
+    cursor.execute("SET LOCAL enable_seqscan = off")
+    cursor.execute(f"EXPLAIN {sql.replace('?', '%s')}", _params(sql))
+    plan = " | ".join(row[0] for row in cursor.fetchall())
+
+    assert _uses_index(plan, index), f"{description}: {plan}"
+
+
+def test_postgres_monthly_summary_drops_emptied_months(postgres_db):
+    cursor = postgres_db.cursor()
+    insert = (
+        "INSERT INTO transactions (user_id, date, payment_date, amount, category, type) "
+        "VALUES (%s, %s, %s, %s, %s, %s)"
+    )
+    cursor.execute(insert, (USER, "2025-06-01", "2025-06-01", 5.0, "Cafe", "Debit"))
+    cursor.execute(insert, (USER, "2025-07-01", "2025-07-01", 100.0, "Sueldo", "Income"))
+
+    # Delete one month's only row, reschedule the other's into a new month
+    cursor.execute("DELETE FROM transactions WHERE user_id = %s AND category = 'Cafe'", (USER,))
+    cursor.execute("UPDATE transactions SET payment_date = '2025-09-01' WHERE user_id = %s", (USER,))
+
+    cursor.execute("SELECT year, month, tx_count FROM monthly_summary WHERE user_id = %s ORDER BY 1, 2", (USER,))
+    assert cursor.fetchall() == [(2025, 9, 1)]
+    cursor.execute("SELECT * FROM check_monthly_summary(%s)", (USER,))
+    assert cursor.fetchall() == []
+
+
+def test_postgres_category_spend_drops_emptied_categories(postgres_db):
+    cursor = postgres_db.cursor()
+    cursor.executemany(
+        "INSERT INTO transactions (user_id, date, payment_date, amount, category, type) "
+        "VALUES (%s, %s, %s, %s, %s, %s)",
+        [
+            (USER, "2025-06-01", "2025-06-01", 5.0, "Cafe", "Debit"),
+            (USER, "2025-06-02", "2025-06-02", 40.0, "Super", "Debit"),
+            (USER, "2025-06-03", "2025-06-03", 70.0, "Ropa", "Card"),
+        ]
+    )
+
+    # Delete, recategorize and reschedule each category's only row
+    cursor.execute("DELETE FROM transactions WHERE user_id = %s AND category = 'Cafe'", (USER,))
+    cursor.execute("UPDATE transactions SET category = 'Comida' WHERE user_id = %s AND category = 'Super'", (USER,))
+    cursor.execute("UPDATE transactions SET payment_date = '2025-07-03' WHERE user_id = %s AND category = 'Ropa'", (USER,))
+
+    cursor.execute(
+        "SELECT year, month, category, amount, tx_count FROM category_spend WHERE user_id = %s ORDER BY 1, 2, 3",
+        (USER,)
+    )
+    assert [tuple(row[:3]) + (float(row[3]), row[4]) for row in cursor.fetchall()] == [
+        (2025, 6, "Comida", 40.0, 1),
+        (2025, 7, "Ropa", 70.0, 1),
+    ]
+
+
+def _sqlstate(error):
+    # psycopg exposes .sqlstate, psycopg2 .pgcode
+    return getattr(error, "sqlstate", None) or getattr(error, "pgcode", None)
+
+
+def test_postgres_row_level_security(postgres_db):
+    other = "00000000-0000-0000-0000-000000000002"
+    cursor = postgres_db.cursor()
+    cursor.executemany(
+        "INSERT INTO transactions (user_id, date, payment_date, amount, category, type) "
+        "VALUES (%s, %s, %s, %s, %s, %s)",
+        [
+            (USER, "2025-06-01", "2025-06-01", 5.0, "Cafe", "Debit"),
+            (other, "2025-06-01", "2025-06-01", 9.0, "Cafe", "Debit"),
+        ]
+    )
+    cursor.execute("INSERT INTO category_budgets (user_id, category, monthly_limit) VALUES (%s, 'Cafe', 50)", (other,))
+
+    # A signed-in user as PostgREST runs it: a non-owner role plus the JWT subject
+    cursor.execute("CREATE ROLE finanzas_rls_test NOLOGIN")
+    cursor.execute("GRANT USAGE ON SCHEMA auth TO finanzas_rls_test")
+    cursor.execute(
+        "GRANT SELECT ON transaction_changes, recurring_rules, monthly_summary, category_spend "
+        "TO finanzas_rls_test"
+    )
+    cursor.execute("GRANT SELECT, INSERT, UPDATE, DELETE ON transactions, category_budgets TO finanzas_rls_test")
+    cursor.execute("GRANT USAGE ON ALL SEQUENCES IN SCHEMA public TO finanzas_rls_test")
+    cursor.execute("SET LOCAL ROLE finanzas_rls_test")
+    cursor.execute("SELECT set_config('request.jwt.claim.sub', %s, true)", (USER,))
+
+    for table in ("transaction_changes", "monthly_summary", "category_spend", "category_budgets"):
+        cursor.execute(f"SELECT DISTINCT user_id::text FROM {table}")
+        assert {row[0] for row in cursor.fetchall()} <= {USER}, table
+
+    # The user's own writes still reach the trigger-maintained tables
+    cursor.execute(
+        "INSERT INTO transactions (user_id, date, payment_date, amount, category, type) "
+        "VALUES (%s, '2025-06-02', '2025-06-02', 7.0, 'Cafe', 'Debit')",
+        (USER,)
+    )
+    cursor.execute("SELECT tx_count FROM monthly_summary WHERE year = 2025 AND month = 6")
+    assert cursor.fetchall() == [(2,)]
+    cursor.execute("SELECT tx_count FROM category_spend WHERE year = 2025 AND month = 6 AND category = 'Cafe'")
+    assert cursor.fetchall() == [(2,)]
+
+    # No writes on another user's behalf, no all-user RPCs
+    for statement, params in [
+        ("INSERT INTO category_budgets (user_id, category, monthly_limit) VALUES (%s, 'Ropa', 10)", (other,)),
+        ("SELECT rebuild_monthly_summary()", None),
+        ("SELECT * FROM check_monthly_summary()", None),
+        ("SELECT rebuild_category_spend()", None),
+    ]:
+        cursor.execute("SAVEPOINT denied")
+        with pytest.raises(Exception) as excinfo:
+            cursor.execute(statement, params)
+        assert _sqlstate(excinfo.value) == "42501", statement
+        cursor.execute("ROLLBACK TO SAVEPOINT denied")
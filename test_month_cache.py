@@ -0,0 +1,70 @@
+"""
+Tests for the recent-month cache (month_cache.py) against the local SQLite backend
+"""
+
+import pytest
+
+pytest.importorskip("dateutil")
+
+import database
+import month_cache
+from benchmarks.local_backend import LocalBackend
+from database import Settings
+
+
+@pytest.fixture()
+def backend(monkeypatch):
+    """A fresh local backend with a signed-in user, and an empty month cache"""
+    previous = database._settings
+    backend = LocalBackend()
+    database.configure(Settings("local", "local", client_factory=backend.client, coalesce_ttl=0))
+    # The coalescer is built once per process: give it this test's TTL
+    monkeypatch.setattr(database.get_read_coalescer(), "ttl", 0)
+    _, session = database.sign_in("months@example.com", "test")
+    database.use_session(session)
+    backend.user_id = session.user_id
+    month_cache._months.clear()
+    yield backend
+    month_cache._months.clear()
+    database.use_session(None)
+    database.sign_out(session.user_id)
+    database._settings = previous
+
+
+def add_expense(backend, amount):
+    # Written behind the data layer's back, like another process or the command line
+    backend.run(
+        "INSERT INTO transactions (user_id, date, payment_date, amount, category, description, type) "
+        "VALUES (?, '2025-01-10', '2025-01-10', ?, 'Super', '', 'Debit')",
+        [backend.user_id, amount]
+    )
+
+
+def amounts(backend):
+    return [row.amount for row in month_cache.get_monthly_transactions(backend.user_id, 2025, 1)]
+
+
+def test_entries_past_the_ttl_are_revalidated_against_the_change_log(backend):
+    add_expense(backend, 100.0)
+    assert amounts(backend) == [100.0]
+
+    # Nothing changed: one watermark query instead of a refetch
+    requests = backend.requests
+    assert amounts(backend) == [100.0]
+    assert backend.requests == requests + 1
+
+    # A write this process did not make is picked up
+    add_expense(backend, 50.0)
+    assert sorted(amounts(backend)) == [50.0, 100.0]
+
+
+def test_entries_within_the_ttl_are_served_as_is(backend):
+    database.configure(database.get_settings()._replace(coalesce_ttl=60))
+    database.get_read_coalescer().ttl = 60
+    add_expense(backend, 100.0)
+    assert amounts(backend) == [100.0]
+
+    add_expense(backend, 50.0)
+    requests = backend.requests
+    assert amounts(backend) == [100.0]
+    assert backend.requests == requests
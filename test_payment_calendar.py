@@ -0,0 +1,85 @@
+"""
+Test Script for the Precomputed Payment Calendar
+Checks every purchase day in a span, for every closing day, against an
+independent definition of the rule and against the original
+relativedelta/try-except algorithm that calculate_payment_date used to run.
+"""
+
+import calendar
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from payment_calendar import PAYMENT_GRACE_DAYS, PaymentCalendar
+
+SPAN = (2023, 2025)
+
+
+def _days(first: date, last: date):
+    day = first
+    while day <= last:
+        yield day
+        day += timedelta(days=1)
+
+
+def reference_payment_date(purchase_date: date, closing_day: int) -> date:
+    """First technical close on or after the purchase (clamped to month end) + grace"""
+    year, month = purchase_date.year, purchase_date.month
+    while True:
+        close = date(year, month, min(closing_day, calendar.monthrange(year, month)[1]))
+        if close >= purchase_date:
+            return close + timedelta(days=PAYMENT_GRACE_DAYS)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+@pytest.fixture(scope="module")
+def payment_calendar():
+    return PaymentCalendar(*SPAN)
+
+
+def test_calendar_matches_reference_for_every_day(payment_calendar):
+    # A year outside the span on each side exercises the memoized fallback
+    for purchase_date in _days(date(SPAN[0] - 1, 11, 1), date(SPAN[1] + 1, 2, 28)):
+        for closing_day in range(1, 32):
+            assert payment_calendar.payment_date(purchase_date, closing_day) == \
+                reference_payment_date(purchase_date, closing_day), (purchase_date, closing_day)
+
+
+def test_calendar_matches_original_algorithm(payment_calendar):
+    relativedelta = pytest.importorskip("dateutil.relativedelta").relativedelta
+
+    def original(purchase_date: datetime, closing_day: int) -> datetime:
+        if purchase_date.day <= closing_day:
+            statement_month = purchase_date
+        else:
+            statement_month = purchase_date + relativedelta(months=1)
+        try:
+            technical_close_date = statement_month.replace(day=closing_day)
+        except ValueError:
+            next_month = statement_month + relativedelta(months=1)
+            technical_close_date = next_month.replace(day=1) - timedelta(days=1)
+        return technical_close_date + timedelta(days=PAYMENT_GRACE_DAYS)
+
+    for purchase_date in _days(date(SPAN[0], 1, 1), date(SPAN[1], 12, 31)):
+        purchase = datetime.combine(purchase_date, datetime.min.time())
+        for closing_day in range(1, 32):
+            assert payment_calendar.payment_date(purchase_date, closing_day) == \
+                original(purchase, closing_day).date(), (purchase_date, closing_day)
+
+
+def test_known_cases(payment_calendar):
+    assert payment_calendar.payment_date(date(2024, 12, 10), 5) == date(2025, 1, 15)
+    assert payment_calendar.payment_date(date(2024, 12, 29), 28) == date(2025, 2, 7)
+    assert payment_calendar.payment_date(date(2024, 1, 30), 28) == date(2024, 3, 9)
+    # Closing day 30 in February closes on the month's last day
+    assert payment_calendar.payment_date(date(2024, 2, 29), 30) == date(2024, 3, 10)
+    assert payment_calendar.payment_date(date(2023, 2, 28), 30) == date(2023, 3, 10)
+
+
+def test_calculate_payment_date_keeps_the_input_type():
+    pytest.importorskip("dateutil")
+    from database import calculate_payment_date
+
+    assert calculate_payment_date(date(2024, 12, 10), 5) == date(2025, 1, 15)
+    assert type(calculate_payment_date(date(2024, 12, 10), 5)) is date
+    assert calculate_payment_date(datetime(2024, 12, 29, 18, 30), 28) == datetime(2025, 2, 7, 18, 30)
@@ -0,0 +1,93 @@
+"""
+Tests for local mode's inverted search index (search.py)
+"""
+
+from datetime import date
+
+import pytest
+
+pytest.importorskip("dateutil")
+pytest.importorskip("pandas")
+pytest.importorskip("streamlit")
+
+from columnar_store import ColumnarTransactionStore
+from models import Transaction
+from search import InvertedIndex, get_index
+
+
+def tx(id, day, description, amount=10.0, category="Comida", type="Debit"):
+    day = date.fromisoformat(day)
+    return Transaction(
+        id=id, date=day, payment_date=day, amount=amount,
+        category=category, description=description, type=type
+    )
+
+
+def ids(result):
+    rows, total = result
+    return [row.id for row in rows], total
+
+
+@pytest.fixture()
+def store():
+    return ColumnarTransactionStore.from_rows([
+        tx(1, "2025-01-05", "Café Martínez", 4.5),
+        tx(2, "2025-01-20", "cafe del centro", 12.0),
+        tx(3, "2025-02-10", "Supermercado Día", 80.0, category="Súper"),
+        tx(4, "2025-02-11", "Cafetería facultad", 6.0),
+        tx(5, "2025-03-01", "Zapatillas", 120.0, category="Ropa", type="Card"),
+    ])
+
+
+def test_accents_and_case_are_ignored(store):
+    index = InvertedIndex(store)
+
+    assert ids(index.search("cafe")) == ([4, 2, 1], 3)
+    assert ids(index.search("CAFÉ")) == ([4, 2, 1], 3)
+    assert ids(index.search("martinez cafe")) == ([1], 1)
+    # Categories are indexed too, accent-free
+    assert ids(index.search("super")) == ([3], 1)
+    assert ids(index.search("dia supermercado")) == ([3], 1)
+    assert ids(index.search("té")) == ([], 0)
+
+
+def test_amount_and_date_filters_combine(store):
+    index = InvertedIndex(store)
+
+    assert ids(index.search("caf", min_amount=5, max_amount=12)) == ([4, 2], 2)
+    assert ids(index.search("caf", min_amount=5, start_date="2025-01-20", end_date="2025-01-31")) == ([2], 1)
+    # Both date bounds are inclusive
+    assert ids(index.search("", start_date="2025-02-10", end_date="2025-03-01")) == ([5, 4, 3], 3)
+    assert ids(index.search("", max_amount=100, trans_type="Debit", start_date="2025-02-01")) == ([4, 3], 2)
+    assert ids(index.search("caf", min_amount=50)) == ([], 0)
+
+
+def test_pages_split_matches_without_gaps(store):
+    index = InvertedIndex(store)
+
+    assert ids(index.search("", page=0, page_size=2)) == ([5, 4], 5)
+    assert ids(index.search("", page=1, page_size=2)) == ([3, 2], 5)
+    assert ids(index.search("", page=2, page_size=2)) == ([1], 5)
+    assert ids(index.search("", page=3, page_size=2)) == ([], 5)
+    assert ids(index.search("cafe", page=0, page_size=3)) == ([4, 2, 1], 3)
+    assert ids(index.search("cafe", page=1, page_size=3)) == ([], 3)
+
+
+def test_index_follows_the_store_after_a_write(store):
+    index = get_index(store)
+    assert get_index(store) is index
+    assert ids(index.search("kiosco")) == ([], 0)
+
+    updated = store.apply_changes(
+        upserted=[tx(6, "2025-03-02", "Kiosco", 3.0), tx(2, "2025-01-20", "Panadería", 12.0)],
+        deleted_ids=[1],
+        pending=[]
+    )
+    updated_index = get_index(updated)
+
+    assert updated_index is not index
+    assert ids(updated_index.search("kiosco")) == ([6], 1)
+    assert ids(updated_index.search("cafe")) == ([4], 1)
+    assert ids(updated_index.search("panaderia")) == ([2], 1)
+    # The old store's index is unchanged
+    assert ids(index.search("cafe")) == ([4, 2, 1], 3)
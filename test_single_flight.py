@@ -0,0 +1,95 @@
+"""
+Tests for single-flight read coalescing (single_flight.py)
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from single_flight import SingleFlight
+
+SCOPE = "month:user-1:2025-01"
+
+
+def slow_load(calls, release, value):
+    def load():
+        calls.append(1)
+        release.wait(timeout=5)
+        return value
+    return load
+
+
+def test_concurrent_identical_reads_share_one_load():
+    flights = SingleFlight(ttl=0)
+    calls, release = [], threading.Event()
+    load = slow_load(calls, release, [{"year": 2025, "month": 1}])
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(flights.do, SCOPE, "summary", load) for _ in range(8)]
+        while flights.loads + flights.shared < 8:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    # ttl = 0: nothing is kept once the load completes
+    flights.do(SCOPE, "summary", load)
+    assert len(calls) == 2
+
+
+def test_results_are_kept_for_ttl():
+    flights = SingleFlight(ttl=0.2)
+    calls = []
+    load = lambda: calls.append(1) or len(calls)
+
+    assert flights.do("usd_rates", "2025-01-02", load) == 1
+    assert flights.do("usd_rates", "2025-01-02", load) == 1
+    assert flights.do("usd_rates", "2025-01-03", load) == 2
+
+    time.sleep(0.25)
+    assert flights.do("usd_rates", "2025-01-02", load) == 3
+
+
+def test_failures_reach_waiters_and_are_not_kept():
+    flights = SingleFlight(ttl=60)
+    release = threading.Event()
+
+    def failing():
+        release.wait(timeout=5)
+        raise ConnectionError("timeout")
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(flights.do, SCOPE, "rows", failing) for _ in range(3)]
+        while flights.loads + flights.shared < 3:
+            time.sleep(0.01)
+        release.set()
+        for future in futures:
+            with pytest.raises(ConnectionError):
+                future.result()
+
+    assert flights.do(SCOPE, "rows", lambda: "retried") == "retried"
+
+
+def test_invalidation_detaches_loads_in_flight():
+    flights = SingleFlight(ttl=60)
+    calls, release = [], threading.Event()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        stale = executor.submit(flights.do, SCOPE, "rows", slow_load(calls, release, "before write"))
+        while not calls:
+            time.sleep(0.01)
+
+        # A write lands while the read is in flight: later readers load again
+        flights.invalidate([SCOPE])
+        assert flights.do(SCOPE, "rows", lambda: "after write") == "after write"
+
+        release.set()
+        assert stale.result() == "before write"
+
+    assert flights.do(SCOPE, "rows", lambda: "unused") == "after write"
+
+    flights.invalidate_prefix("month:user-1:")
+    assert flights.do(SCOPE, "rows", lambda: "reloaded") == "reloaded"
@@ -0,0 +1,57 @@
+"""
+Tests for card statement cycles (statements.py)
+"""
+
+from datetime import date, datetime
+
+import pytest
+
+pytest.importorskip("dateutil")
+
+import database
+import statements
+from models import Card, Transaction
+
+
+@pytest.fixture()
+def card_rows(monkeypatch):
+    """Rows served to statements.py instead of the range query"""
+    rows = []
+
+    def in_range(user_id, start_date, end_date, card_id=None):
+        return [row for row in rows if start_date <= row.payment_date.isoformat() < end_date]
+
+    monkeypatch.setattr(statements, "get_transactions_in_range", in_range)
+    statements._closed_statements.clear()
+    return rows
+
+
+def purchase(card, when, amount, installments):
+    return Transaction.from_rows(database.build_card_rows(
+        "user-1", card.id, card.closing_day, datetime(*when), amount, "Compras", installments=installments
+    ))
+
+
+def test_each_installment_lands_in_its_own_cycle(card_rows):
+    card = Card(id=1, name="Visa", closing_day=25)
+    card_rows.extend(purchase(card, (2025, 2, 10), 300.0, 3))
+
+    # Installment 2 is dated 04-07, after March's due date (04-04)
+    assert [row.payment_date for row in card_rows] == [date(2025, 3, 7), date(2025, 4, 7), date(2025, 5, 7)]
+
+    cycles = statements.get_card_statements("user-1", card, date(2025, 1, 1), date(2025, 6, 1))
+    billed = {
+        statement["closing_date"].month: [row.installment_number for row in statement["items"]]
+        for statement in cycles
+    }
+    assert billed == {1: [], 2: [1], 3: [2], 4: [3], 5: [], 6: []}
+
+    march = statements.get_card_statement("user-1", card, 2025, 3)
+    assert march["total"] == 100.0 and march["due_date"] == date(2025, 4, 4)
+
+
+def test_payment_cycle_of_clamped_installments():
+    # Closing day 20: first installment on 01-30, the next one clamped to 02-28
+    assert statements.payment_cycle(date(2025, 1, 30), 1, 20) == date(2025, 1, 1)
+    assert statements.payment_cycle(date(2025, 2, 28), 2, 20) == date(2025, 2, 1)
+    assert statements.payment_cycle(date(2025, 3, 30), 3, 20) == date(2025, 3, 1)
@@ -0,0 +1,95 @@
+"""
+Tests for batched grid edits (transaction_editor.py, database.update_transactions
+and database.delete_transactions against the local SQLite backend)
+"""
+
+from datetime import date
+
+import pytest
+
+pytest.importorskip("dateutil")
+
+import database
+from benchmarks.local_backend import LocalBackend
+from database import Settings
+from errors import ValidationError
+
+
+@pytest.fixture()
+def backend():
+    """A fresh local backend with a signed-in user (backend.user_id)"""
+    previous = database._settings
+    backend = LocalBackend()
+    database.configure(Settings("local", "local", client_factory=backend.client))
+    _, session = database.sign_in("editor@example.com", "test")
+    database.use_session(session)
+    backend.user_id = session.user_id
+    yield backend
+    database.use_session(None)
+    database.sign_out(session.user_id)
+    database._settings = previous
+
+
+def seed(backend, rows):
+    for amount, category, payment_date in rows:
+        backend.run(
+            "INSERT INTO transactions (user_id, date, payment_date, amount, category, description, type) "
+            "VALUES (?, ?, ?, ?, ?, '', 'Debit')",
+            [backend.user_id, payment_date, payment_date, amount, category]
+        )
+    return [row["id"] for row in backend.run("SELECT id FROM transactions ORDER BY id", [])]
+
+
+def test_diff_finds_changed_and_deleted_rows_and_validates_them():
+    pd = pytest.importorskip("pandas")
+    import transaction_editor
+    from models import Transaction
+
+    transactions = [
+        Transaction(id=i, date=date(2025, 1, i), payment_date=date(2025, 1, i), amount=100.0 * i,
+                    category="Super", description="", type="Debit")
+        for i in range(1, 5)
+    ]
+    original = transaction_editor.to_frame(transactions)
+
+    edited = original.drop(index=[4]).copy()
+    edited.loc[1, "amount"] = 150.0
+    edited.loc[2, "category"] = "  "
+    edited.loc[3, "description"] = " sin cambios de monto "
+    edited = pd.concat([edited, edited.loc[[1]].set_axis([99])])  # added rows are ignored
+
+    changes = transaction_editor.diff(original, edited)
+
+    assert sorted(changes.updates.index) == [1, 2, 3]
+    assert changes.deleted_ids == [4]
+    assert list(changes.errors.index) == [2]
+    assert changes.updates.loc[3, "description"] == "sin cambios de monto"
+    assert isinstance(changes.errors, pd.Series)
+
+
+def test_batched_update_and_delete(backend):
+    user_id = backend.user_id
+    ids = seed(backend, [(100.0, "Super", "2025-01-10"), (200.0, "Ropa", "2025-01-11"), (300.0, "Ropa", "2025-02-01")])
+
+    requests = backend.requests
+    updated = database.update_transactions(user_id, [
+        {"id": ids[0], "amount": 120.0},
+        {"id": ids[1], "category": "Indumentaria", "description": "corregido"},
+        {"id": 999999, "amount": 1.0}
+    ])
+    assert updated == 2
+    assert backend.requests == requests + 1
+
+    rows = {row["id"]: row for row in backend.run("SELECT * FROM transactions", [])}
+    assert rows[ids[0]]["amount"] == 120.0 and rows[ids[0]]["category"] == "Super"
+    assert rows[ids[1]]["category"] == "Indumentaria" and rows[ids[1]]["amount"] == 200.0
+
+    # Triggers saw the edits: January now sums 120 + 200
+    january = backend.run("SELECT debit FROM monthly_summary WHERE user_id = ? AND month = 1", [user_id])
+    assert january[0]["debit"] == 320.0
+
+    assert database.delete_transactions(user_id, [ids[0], ids[2]]) == 2
+    assert [row["id"] for row in backend.run("SELECT id FROM transactions", [])] == [ids[1]]
+
+    with pytest.raises(ValidationError):
+        database.update_transactions(user_id, [{"id": ids[1], "type": "Income"}])
@@ -0,0 +1,88 @@
+"""
+Tests for the local write-ahead queue (write_queue.py)
+"""
+
+import threading
+import time
+
+import pytest
+
+from write_queue import WriteQueue
+
+
+def row(user_id, payment_date, amount=10.0):
+    return {"user_id": user_id, "payment_date": payment_date, "amount": amount, "type": "Debit"}
+
+
+@pytest.fixture()
+def queue_path(tmp_path):
+    return str(tmp_path / "queue.db")
+
+
+def test_backend_call_does_not_block_readers_or_writers(queue_path):
+    started, release = threading.Event(), threading.Event()
+    flushed = []
+
+    def slow_flush(rows):
+        if not started.is_set():
+            started.set()
+            release.wait(timeout=5)
+        flushed.extend(rows)
+
+    queue = WriteQueue(queue_path, slow_flush)
+    queue.enqueue([row("user-1", "2025-01-10")])
+
+    flusher = threading.Thread(target=queue.flush_once)
+    flusher.start()
+    assert started.wait(timeout=5)
+
+    # While the batch is in flight: reads see it, writes and status return at once
+    began = time.monotonic()
+    assert [r["amount"] for r in queue.pending_rows("user-1")] == [10.0]
+    queue.enqueue([row("user-1", "2025-01-11", 20.0)])
+    assert queue.status("user-1")[0] == 2
+    # The in-flight row is not sent a second time
+    assert queue.flush_once() == 1
+    assert time.monotonic() - began < 1
+
+    release.set()
+    flusher.join(timeout=5)
+    assert sorted(r["amount"] for r in flushed) == [10.0, 20.0]
+    assert queue.pending_rows("user-1") == []
+
+
+def test_failed_batch_is_rescheduled(queue_path):
+    def failing(rows):
+        raise ConnectionError("timeout")
+
+    queue = WriteQueue(queue_path, failing)
+    queue.enqueue([row("user-1", "2025-01-10"), row("user-1", "2025-01-11")])
+
+    assert queue.flush_once() == 0
+    pending, failing_rows, last_error = queue.status("user-1")
+    assert (pending, failing_rows, last_error) == (2, 2, "timeout")
+    # Backing off: nothing is due right away
+    assert queue.flush_once() == 0
+
+
+def test_partial_failure_does_not_resend_written_users(queue_path):
+    sent = []
+
+    def flush(rows):
+        if rows[0]["user_id"] == "user-2":
+            raise ConnectionError("timeout")
+        sent.extend(rows)
+
+    queue = WriteQueue(queue_path, flush)
+    queue.enqueue([row("user-1", "2025-01-10"), row("user-2", "2025-01-10"), row("user-1", "2025-01-11")])
+    queue.enqueue([row("user-3", "2025-01-12")])
+
+    # user-1 is written, user-2 fails, user-3 waits for the next batch
+    assert queue.flush_once() == 2
+    assert queue.flush_once() == 1
+    assert queue.flush_once() == 0
+    assert [(r["user_id"], r["payment_date"]) for r in sent] == [
+        ("user-1", "2025-01-10"), ("user-1", "2025-01-11"), ("user-3", "2025-01-12"),
+    ]
+    assert queue.status("user-1")[0] == 0
+    assert queue.status("user-2") == (1, 1, "timeout")
@@ -0,0 +1,107 @@
+"""
+FINANZAS PRO - Transaction Grid Edits
+Turns an edited copy of a month's transactions into one batch of changes
+
+The grid (views/transactions.py) shows get_monthly_transactions as a
+DataFrame indexed by transaction id. On save, the edited frame is compared
+with the original in one pass: rows whose editable columns differ become
+updates, ids missing from the edited frame become deletes. Validation runs
+as column operations over the changed rows only, and the whole batch goes
+out as one database.update_transactions and one database.delete_transactions
+call instead of a delete + re-entry per row.
+"""
+
+from typing import Dict, List, NamedTuple
+
+import pandas as pd
+
+from database import EDITABLE_COLUMNS
+from models import Transaction
+
+# Columns shown in the grid, in order (index: id)
+GRID_COLUMNS = ["date", "payment_date", "type", "card_name", "installment", *EDITABLE_COLUMNS]
+
+
+class GridChanges(NamedTuple):
+    """What a save has to send"""
+    updates: pd.DataFrame  # changed rows (index: id, columns: EDITABLE_COLUMNS)
+    deleted_ids: List[int]
+    errors: pd.Series  # message per invalid changed row (index: id)
+
+    @property
+    def empty(self) -> bool:
+        return self.updates.empty and not self.deleted_ids
+
+    def update_records(self) -> List[Dict]:
+        """Updates as database.update_transactions takes them"""
+        records = self.updates.reset_index().to_dict("records")
+        return [
+            {
+                "id": int(record["id"]),
+                "amount": float(record["amount"]),
+                "category": record["category"],
+                "description": record["description"]
+            }
+            for record in records
+        ]
+
+
+def to_frame(transactions: List[Transaction]) -> pd.DataFrame:
+    """Grid frame of saved transactions (pending rows have no id and are left out)"""
+    rows = [t for t in transactions if not t.pending]
+    return pd.DataFrame(
+        {
+            "date": [t.date for t in rows],
+            "payment_date": [t.payment_date for t in rows],
+            "type": [t.type for t in rows],
+            "card_name": [t.card_name or "" for t in rows],
+            "installment": [
+                f"{t.installment_number}/{t.installments_total}" if t.installments_total > 1 else ""
+                for t in rows
+            ],
+            "amount": [t.amount for t in rows],
+            "category": [t.category for t in rows],
+            "description": [t.description for t in rows],
+        },
+        index=pd.Index([t.id for t in rows], name="id"),
+        columns=GRID_COLUMNS
+    )
+
+
+def _normalize(frame: pd.DataFrame) -> pd.DataFrame:
+    """Editable columns as compared and saved: amounts to cents, text stripped"""
+    return pd.DataFrame(
+        {
+            "amount": pd.to_numeric(frame["amount"], errors="coerce").round(2),
+            "category": frame["category"].fillna("").astype(str).str.strip(),
+            "description": frame["description"].fillna("").astype(str).str.strip(),
+        },
+        index=frame.index
+    )
+
+
+def validate(updates: pd.DataFrame) -> pd.Series:
+    """Error message per invalid row of updates (empty Series when all are valid)"""
+    errors = pd.Series("", index=updates.index, dtype=object)
+    errors = errors.mask(updates["category"] == "", "La categoría no puede estar vacía")
+    errors = errors.mask(updates["amount"].isna() | (updates["amount"] <= 0), "El monto debe ser mayor a 0")
+    return errors[errors != ""]
+
+
+def diff(original: pd.DataFrame, edited: pd.DataFrame) -> GridChanges:
+    """
+    Compare the grid before and after editing.
+    Rows added in the grid (index not in original) are ignored: new
+    transactions go through the entry forms, which compute payment dates.
+    """
+    deleted_ids = [int(i) for i in original.index.difference(edited.index)]
+
+    kept = original.index.intersection(edited.index)
+    before = _normalize(original.loc[kept])
+    after = _normalize(edited.loc[kept])
+
+    # NaN amounts (a cleared cell) never equal anything, so they count as changed
+    changed = (after != before).any(axis=1)
+    updates = after[changed]
+
+    return GridChanges(updates, deleted_ids, validate(updates))
@@ -0,0 +1,193 @@
+"""
+Annual Report View - Yearly overview
+Totals, month-over-month evolution, categories, merchants and installments
+"""
+
+import streamlit as st
+from annual_report import get_annual_report, report_to_csv
+from columnar_store import get_available_months
+from views.ui import call
+
+TYPE_LABELS = {"Income": "Ingreso", "Fixed": "Gasto Fijo", "Debit": "Débito", "Card": "Tarjeta"}
+
+def main():
+    # Get authenticated user ID from session state
+    user_id = st.session_state.get('user_id')
+    if not user_id:
+        st.error("⚠️ Error: No user authenticated")
+        return
+    
+    st.title("📅 Reporte Anual")
+    st.markdown("---")
+    
+    # ============================================
+    # YEAR FILTER
+    # ============================================
+    
+    available_months = call(get_available_months, user_id, default=[])
+    
+    if not available_months:
+        st.info("👋 No hay transacciones registradas aún.")
+        return
+    
+    years = sorted({year for year, _, _ in available_months}, reverse=True)
+    selected_year = st.selectbox("📅 Seleccionar Año", options=years, index=0)
+    
+    report = call(get_annual_report, user_id, selected_year)
+    if report is None:
+        return
+    totals = report["totals"]
+    
+    st.download_button(
+        "⬇️ Descargar reporte (CSV)",
+        data=report_to_csv(report).encode("utf-8-sig"),
+        file_name=f"reporte_anual_{selected_year}.csv",
+        mime="text/csv"
+    )
+    
+    st.markdown("---")
+    
+    # ============================================
+    # YEARLY TOTALS
+    # ============================================
+    
+    st.markdown("### 💰 Resumen del Año")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Balance del Año", f"${totals['net_balance']:,.2f}")
+    
+    with col2:
+        st.metric("💵 Ingresos", f"${totals['income']:,.2f}")
+    
+    with col3:
+        st.metric("💸 Gastos Totales", f"${totals['expenses']:,.2f}")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("📌 Fijos", f"${totals['fixed']:,.2f}")
+    
+    with col2:
+        st.metric("💵 Débito", f"${totals['debit']:,.2f}")
+    
+    with col3:
+        st.metric("💳 Tarjetas", f"${totals['card']:,.2f}")
+    
+    st.markdown("---")
+    
+    # ============================================
+    # MONTH OVER MONTH
+    # ============================================
+    
+    st.markdown("### 📈 Evolución Mensual")
+    
+    months = report["months"]
+    
+    st.bar_chart(
+        {
+            "Mes": [f"{m['month']:02d} {m['label'][:3]}" for m in months],
+            "Ingresos": [m["income"] for m in months],
+            "Gastos": [m["expenses"] for m in months]
+        },
+        x="Mes",
+        y=["Ingresos", "Gastos"],
+        stack=False
+    )
+    
+    st.dataframe(
+        [
+            {
+                "Mes": m["label"],
+                "Ingresos": m["income"],
+                "Gastos": m["expenses"],
+                "Balance": m["net_balance"],
+                "Δ Ingresos": m["delta_income"],
+                "Δ Gastos": m["delta_expenses"],
+                "Δ Balance": m["delta_net_balance"]
+            }
+            for m in months
+        ],
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            column: st.column_config.NumberColumn(format="$%.2f")
+            for column in ["Ingresos", "Gastos", "Balance", "Δ Ingresos", "Δ Gastos", "Δ Balance"]
+        }
+    )
+    
+    st.markdown("---")
+    
+    # ============================================
+    # CARD VS CASH AND INSTALLMENTS
+    # ============================================
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        split = report["split"]
+        st.markdown("### 💳 Tarjeta vs Efectivo")
+        st.markdown(f"- 💳 Tarjetas: `${split['card']:,.2f}`")
+        st.markdown(f"- 💸 Efectivo/Débito/Fijos: `${split['cash']:,.2f}`")
+        st.progress(
+            min(max(split["card_share"], 0.0), 1.0),
+            text=f"{split['card_share'] * 100:.0f}% del gasto con tarjeta"
+        )
+    
+    with col2:
+        installments = report["installments"]
+        st.markdown("### 🧮 Carga de Cuotas")
+        st.markdown(f"- Pagado en cuotas: `${installments['amount']:,.2f}`")
+        st.markdown(f"- Cuotas pagadas: **{installments['rows']}** de **{installments['plans']}** compras")
+        st.markdown(f"- Compras con cuotas el año siguiente: **{installments['open_plans']}**")
+        st.progress(
+            min(max(installments["card_share"], 0.0), 1.0),
+            text=f"{installments['card_share'] * 100:.0f}% del gasto con tarjeta es en cuotas"
+        )
+    
+    st.markdown("---")
+    
+    # ============================================
+    # CATEGORIES AND MERCHANTS
+    # ============================================
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### 🏷️ Categorías")
+        st.dataframe(
+            [
+                {
+                    "Tipo": TYPE_LABELS.get(c["type"], c["type"]),
+                    "Categoría": c["category"],
+                    "Monto": c["amount"],
+                    "Movimientos": c["count"]
+                }
+                for c in report["categories"]
+            ],
+            hide_index=True,
+            use_container_width=True,
+            column_config={"Monto": st.column_config.NumberColumn(format="$%.2f")}
+        )
+    
+    with col2:
+        st.markdown("### 🏪 Comercios Principales")
+        if report["merchants"]:
+            st.dataframe(
+                [
+                    {"Comercio": m["merchant"], "Monto": m["amount"], "Movimientos": m["count"]}
+                    for m in report["merchants"]
+                ],
+                hide_index=True,
+                use_container_width=True,
+                column_config={"Monto": st.column_config.NumberColumn(format="$%.2f")}
+            )
+        else:
+            st.info("Agrega descripciones a tus gastos para ver los comercios principales.")
+    
+    st.markdown("---")
+    st.caption(f"📅 Año: {selected_year} | Total de registros: {report['tx_count']}")
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ Implements Logic B with installments
 import streamlit as st
 from datetime import datetime, date
 from database import get_all_cards, save_card_transaction
+from views.ui import call
 
 def main():
     # Get authenticated user ID from session state
@@ -21,7 +22,7 @@ def main():
     # LOAD CARDS
     # ============================================
     
-    cards = get_all_cards(user_id)
+    cards = call(get_all_cards, user_id, default=[])
     
     if not cards:
         st.error("⚠️ No hay tarjetas configuradas. Ve a Configuración para agregar tarjetas.")
@@ -38,7 +39,7 @@ def main():
         
         with col1:
             # Card selection
-            card_options = {f"{card['name']} (Cierre: día {card['closing_day']})": card['id'] 
+            card_options = {f"{card.name} (Cierre: día {card.closing_day})": card.id 
                           for card in cards}
             
             selected_card_display = st.selectbox(
@@ -86,6 +87,12 @@ def main():
                 height=100
             )
         
+        # Genuine repeats (same day, amount and description) need confirmation
+        allow_duplicate = st.checkbox(
+            "🔁 Registrar aunque ya exista uno idéntico",
+            help="Por defecto, un movimiento idéntico a uno ya guardado (doble clic, reenvío) no se guarda dos veces"
+        )
+        
         # Submit button
         submitted = st.form_submit_button("✅ Guardar Compra", use_container_width=True, type="primary")
         
@@ -97,14 +104,17 @@ def main():
             
             # Save transaction
             with st.spinner("Guardando..."):
-                success, affected_months = save_card_transaction(
+                success, affected_months = call(
+                    save_card_transaction,
                     user_id=user_id,
                     card_id=selected_card_id,
                     date=datetime.combine(purchase_date, datetime.min.time()),
                     amount=amount,
                     category=category,
                     description=description,
-                    installments=installments
+                    installments=installments,
+                    allow_duplicate=allow_duplicate,
+                    default=(False, [])
                 )
             
             if success:
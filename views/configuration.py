@@ -5,6 +5,60 @@ Add and delete credit cards
 
 import streamlit as st
 from database import get_all_cards, create_card, delete_card
+from views.ui import call
+
+# Cards deleted since the page last ran in full
+DELETED_CARDS_KEY = "deleted_cards"
+
+
+@st.fragment
+def render_card_row(user_id: str, card):
+    """
+    A card with its delete/confirm/cancel buttons.
+    A fragment: clicking them reruns only this row, not the card list query.
+    """
+    if card.id in st.session_state[DELETED_CARDS_KEY]:
+        st.caption(f"🗑️ Tarjeta '{card.name}' eliminada")
+        return
+    
+    with st.container():
+        col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
+        
+        with col1:
+            st.markdown(f"**💳 {card.name}**")
+        
+        with col2:
+            st.markdown(f"**Cierre:** Día {card.closing_day}")
+        
+        with col3:
+            st.caption(f"ID: {card.id}")
+        
+        with col4:
+            # Delete button
+            if st.button("🗑️", key=f"delete_{card.id}", help="Eliminar tarjeta"):
+                st.session_state[f"confirm_delete_card_{card.id}"] = True
+        
+        # Show confirmation if delete was clicked
+        if st.session_state.get(f"confirm_delete_card_{card.id}", False):
+            st.warning(f"⚠️ ¿Estás seguro de eliminar '{card.name}'?")
+            
+            col_a, col_b, col_c = st.columns([1, 1, 2])
+            
+            with col_a:
+                if st.button("✅ Sí, eliminar", key=f"confirm_yes_{card.id}", type="primary"):
+                    success = call(delete_card, user_id, card.id, default=False)
+                    if success:
+                        st.session_state[f"confirm_delete_card_{card.id}"] = False
+                        st.session_state[DELETED_CARDS_KEY].add(card.id)
+                        st.rerun(scope="fragment")
+            
+            with col_b:
+                if st.button("❌ Cancelar", key=f"confirm_no_{card.id}"):
+                    st.session_state[f"confirm_delete_card_{card.id}"] = False
+                    st.rerun(scope="fragment")
+        
+        st.markdown("---")
+
 
 def main():
     # Get authenticated user ID from session state
@@ -16,6 +70,9 @@ def main():
     st.title("💳 Configuración de Tarjetas")
     st.markdown("---")
     
+    # A full run reloads the card list, so earlier deletions are already gone
+    st.session_state[DELETED_CARDS_KEY] = set()
+    
     # ============================================
     # SECTION 1: MY CARDS LIST
     # ============================================
@@ -23,7 +80,7 @@ def main():
     st.markdown("### 🗂️ Mis Tarjetas")
     
     # Load user's cards
-    cards = get_all_cards(user_id)
+    cards = call(get_all_cards, user_id, default=[])
     
     if not cards:
         st.info("👋 No tienes tarjetas registradas. Agrega tu primera tarjeta abajo.")
@@ -32,43 +89,7 @@ def main():
         
         # Display cards in a table-like format
         for card in cards:
-            with st.container():
-                col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
-                
-                with col1:
-                    st.markdown(f"**💳 {card['name']}**")
-                
-                with col2:
-                    st.markdown(f"**Cierre:** Día {card['closing_day']}")
-                
-                with col3:
-                    st.caption(f"ID: {card['id']}")
-                
-                with col4:
-                    # Delete button
-                    if st.button("🗑️", key=f"delete_{card['id']}", help="Eliminar tarjeta"):
-                        st.session_state[f"confirm_delete_card_{card['id']}"] = True
-                        st.rerun()
-                
-                # Show confirmation if delete was clicked
-                if st.session_state.get(f"confirm_delete_card_{card['id']}", False):
-                    st.warning(f"⚠️ ¿Estás seguro de eliminar '{card['name']}'?")
-                    
-                    col_a, col_b, col_c = st.columns([1, 1, 2])
-                    
-                    with col_a:
-                        if st.button("✅ Sí, eliminar", key=f"confirm_yes_{card['id']}", type="primary"):
-                            success = delete_card(user_id, card['id'])
-                            if success:
-                                st.session_state[f"confirm_delete_card_{card['id']}"] = False
-                                st.rerun()
-                    
-                    with col_b:
-                        if st.button("❌ Cancelar", key=f"confirm_no_{card['id']}"):
-                            st.session_state[f"confirm_delete_card_{card['id']}"] = False
-                            st.rerun()
-                
-                st.markdown("---")
+            render_card_row(user_id, card)
     
     # ============================================
     # SECTION 2: ADD NEW CARD FORM
@@ -119,7 +140,7 @@ def main():
                 st.error("⚠️ Por favor ingresa un nombre para la tarjeta")
             else:
                 # Create the card
-                success = create_card(user_id, card_name, closing_day)
+                success = call(create_card, user_id, card_name, closing_day, default=False)
                 
                 if success:
                     st.success(f"✅ Tarjeta '{card_name}' creada exitosamente!")
@@ -4,8 +4,12 @@ Shows visual separation of Cash vs Card expenses
 """
 
 import streamlit as st
-from datetime import datetime
-from database import get_available_months, get_monthly_summary, get_monthly_transactions
+from datetime import datetime, date
+from dateutil.relativedelta import relativedelta
+from columnar_store import get_available_months, get_monthly_summary, get_monthly_transactions, prefetch_adjacent_months
+from analytics import get_category_totals, get_category_month_totals
+from database import get_budget_status
+from views.ui import call
 
 def main():
     # Get authenticated user ID from session state
@@ -21,7 +25,7 @@ def main():
     # MONTH FILTER
     # ============================================
     
-    available_months = get_available_months(user_id)
+    available_months = call(get_available_months, user_id, default=[])
     
     if not available_months:
         st.info("👋 No hay transacciones registradas aún. ¡Comienza agregando ingresos o gastos!")
@@ -44,7 +48,9 @@ def main():
     # MONTHLY SUMMARY
     # ============================================
     
-    summary = get_monthly_summary(user_id, selected_year, selected_month)
+    summary = call(get_monthly_summary, user_id, selected_year, selected_month)
+    if summary is None:
+        return
     
     # Row 1: Net Balance (Hero Metric)
     st.markdown("### 💰 Balance Neto")
@@ -87,18 +93,18 @@ def main():
         st.caption("Compras realizadas en períodos anteriores")
         
         # Show card transactions
-        card_trans = get_monthly_transactions(user_id, selected_year, selected_month, "Card")
+        card_trans = call(get_monthly_transactions, user_id, selected_year, selected_month, "Card", default=[])
         if card_trans:
             with st.expander(f"📋 Ver {len(card_trans)} movimientos"):
                 for trans in card_trans:
-                    card_name = trans.get("credit_cards", {}).get("name", "N/A") if trans.get("credit_cards") else "N/A"
+                    card_name = trans.card_name or "N/A"
                     installment_info = ""
-                    if trans["installments_total"] > 1:
-                        installment_info = f" (Cuota {trans['installment_number']}/{trans['installments_total']})"
+                    if trans.installments_total > 1:
+                        installment_info = f" (Cuota {trans.installment_number}/{trans.installments_total})"
                     
-                    st.markdown(f"- **{card_name}**: {trans['category']} - ${trans['amount']:,.2f}{installment_info}")
-                    if trans['description']:
-                        st.caption(f"  ↳ {trans['description']}")
+                    st.markdown(f"- **{card_name}**: {trans.category} - ${trans.amount:,.2f}{installment_info}")
+                    if trans.description:
+                        st.caption(f"  ↳ {trans.description}")
     
     with col2:
         st.markdown("#### 💸 Gastos Diarios (Efectivo/Débito)")
@@ -111,16 +117,16 @@ def main():
         st.markdown(f"- 💵 Débito: `${summary['debit']:,.2f}`")
         
         # Show recent transactions
-        cash_trans = get_monthly_transactions(user_id, selected_year, selected_month)
-        cash_trans = [t for t in cash_trans if t["type"] in ["Fixed", "Debit"]]
+        cash_trans = call(get_monthly_transactions, user_id, selected_year, selected_month, default=[])
+        cash_trans = [t for t in cash_trans if t.type in ["Fixed", "Debit"]]
         
         if cash_trans:
             with st.expander(f"📋 Ver {len(cash_trans)} movimientos"):
                 for trans in cash_trans:
-                    icon = "📌" if trans["type"] == "Fixed" else "💵"
-                    st.markdown(f"- **{icon} {trans['category']}**: ${trans['amount']:,.2f}")
-                    if trans['description']:
-                        st.caption(f"  ↳ {trans['description']}")
+                    icon = "📌" if trans.type == "Fixed" else "💵"
+                    st.markdown(f"- **{icon} {trans.category}**: ${trans.amount:,.2f}")
+                    if trans.description:
+                        st.caption(f"  ↳ {trans.description}")
     
     st.markdown("---")
     
@@ -137,6 +143,70 @@ def main():
     
     st.bar_chart(chart_data, x="Categoría", y="Monto", color="#4F46E5")
     
+    st.markdown("---")
+    
+    # ============================================
+    # CATEGORY BREAKDOWN
+    # ============================================
+    
+    st.markdown("### 🏷️ Gastos por Categoría")
+    
+    month_start = date(selected_year, selected_month, 1)
+    month_end = month_start + relativedelta(months=1)
+    
+    category_totals = call(get_category_totals, user_id, month_start, month_end)
+    
+    if category_totals is None or category_totals.empty:
+        st.info("No hay gastos registrados en este período.")
+    else:
+        col1, col2 = st.columns([3, 2])
+        
+        with col1:
+            st.bar_chart(category_totals, x="category", y="amount", color="#4F46E5", horizontal=True)
+        
+        with col2:
+            st.dataframe(
+                category_totals.assign(share=category_totals["share"] * 100),
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "category": "Categoría",
+                    "amount": st.column_config.NumberColumn("Monto", format="$%.2f"),
+                    "share": st.column_config.ProgressColumn("% del Gasto", format="%.0f%%", min_value=0, max_value=100)
+                }
+            )
+        
+        with st.expander("📆 Evolución por categoría (últimos 12 meses)"):
+            history_start = month_start - relativedelta(months=11)
+            month_totals = call(get_category_month_totals, user_id, history_start, month_end, top=8)
+            if month_totals is not None:
+                st.bar_chart(month_totals)
+    
+    # ============================================
+    # CATEGORY BUDGETS
+    # ============================================
+    
+    budget_status = call(get_budget_status, user_id, selected_year, selected_month, default=[])
+    
+    if budget_status:
+        st.markdown("---")
+        st.markdown("### 🎯 Presupuestos")
+        
+        for budget in budget_status:
+            if budget["status"] == "exceeded":
+                st.error(f"🚨 **{budget['category']}**: presupuesto excedido por ${-budget['remaining']:,.2f}")
+            elif budget["status"] == "warning":
+                st.warning(f"🔔 **{budget['category']}**: {budget['ratio'] * 100:.0f}% usado, quedan ${budget['remaining']:,.2f}")
+        
+        for budget in budget_status:
+            st.progress(
+                min(budget["ratio"], 1.0),
+                text=f"{budget['category']}: ${budget['spent']:,.2f} de ${budget['limit']:,.2f} ({budget['ratio'] * 100:.0f}%)"
+            )
+    
+    # Page is on screen: warm the previous/next month in the background
+    prefetch_adjacent_months(user_id, selected_year, selected_month, available_months)
+    
     # ============================================
     # FOOTER STATS
     # ============================================
@@ -6,6 +6,20 @@ Implements Logic A (Immediate payment_date)
 import streamlit as st
 from datetime import datetime, date
 from database import save_cash_transaction
+from views.ui import call
+from views.recurring_rules import render_recurring_section
+
+CATEGORY_OPTIONS = [
+    "Alquiler",
+    "Expensas",
+    "Servicios (Luz/Gas/Agua)",
+    "Internet/Cable",
+    "Teléfono",
+    "Suscripciones",
+    "Seguro",
+    "Transporte",
+    "Otro"
+]
 
 def main():
     # Get authenticated user ID from session state
@@ -44,21 +58,9 @@ def main():
         
         with col2:
             # Category
-            category_options = [
-                "Alquiler",
-                "Expensas",
-                "Servicios (Luz/Gas/Agua)",
-                "Internet/Cable",
-                "Teléfono",
-                "Suscripciones",
-                "Seguro",
-                "Transporte",
-                "Otro"
-            ]
-            
             category = st.selectbox(
                 "🏷️ Categoría",
-                options=category_options
+                options=CATEGORY_OPTIONS
             )
             
             # Custom category
@@ -75,6 +77,12 @@ def main():
                 height=100
             )
         
+        # Genuine repeats (same day, amount and description) need confirmation
+        allow_duplicate = st.checkbox(
+            "🔁 Registrar aunque ya exista uno idéntico",
+            help="Por defecto, un movimiento idéntico a uno ya guardado (doble clic, reenvío) no se guarda dos veces"
+        )
+        
         # Submit button
         submitted = st.form_submit_button("✅ Guardar Gasto Fijo", use_container_width=True, type="primary")
         
@@ -86,13 +94,16 @@ def main():
             
             # Save transaction
             with st.spinner("Guardando..."):
-                success = save_cash_transaction(
+                success = call(
+                    save_cash_transaction,
                     user_id=user_id,
                     trans_type="Fixed",
                     date=datetime.combine(expense_date, datetime.min.time()),
                     amount=amount,
                     category=category,
-                    description=description
+                    description=description,
+                    allow_duplicate=allow_duplicate,
+                    default=False
                 )
             
             if success:
@@ -104,6 +115,14 @@ def main():
     # INFO SECTION
     # ============================================
     
+    # ============================================
+    # RECURRING RULES
+    # ============================================
+    
+    render_recurring_section(user_id, "Fixed", CATEGORY_OPTIONS, "Gastos Fijos Recurrentes")
+    
+    st.markdown("---")
+    
     st.markdown("### 📋 Categorías Comunes de Gastos Fijos")
     
     col1, col2, col3 = st.columns(3)
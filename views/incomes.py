@@ -6,6 +6,17 @@ Implements Logic A (Immediate payment_date)
 import streamlit as st
 from datetime import datetime, date
 from database import save_cash_transaction
+from views.ui import call
+from views.recurring_rules import render_recurring_section
+
+CATEGORY_OPTIONS = [
+    "Salario",
+    "Freelance",
+    "Inversiones",
+    "Venta",
+    "Bono",
+    "Otro"
+]
 
 def main():
     # Get authenticated user ID from session state
@@ -44,18 +55,9 @@ def main():
         
         with col2:
             # Category
-            category_options = [
-                "Salario",
-                "Freelance",
-                "Inversiones",
-                "Venta",
-                "Bono",
-                "Otro"
-            ]
-            
             category = st.selectbox(
                 "🏷️ Categoría",
-                options=category_options
+                options=CATEGORY_OPTIONS
             )
             
             # Custom category
@@ -72,6 +74,12 @@ def main():
                 height=100
             )
         
+        # Genuine repeats (same day, amount and description) need confirmation
+        allow_duplicate = st.checkbox(
+            "🔁 Registrar aunque ya exista uno idéntico",
+            help="Por defecto, un movimiento idéntico a uno ya guardado (doble clic, reenvío) no se guarda dos veces"
+        )
+        
         # Submit button
         submitted = st.form_submit_button("✅ Guardar Ingreso", use_container_width=True, type="primary")
         
@@ -83,13 +91,16 @@ def main():
             
             # Save transaction
             with st.spinner("Guardando..."):
-                success = save_cash_transaction(
+                success = call(
+                    save_cash_transaction,
                     user_id=user_id,
                     trans_type="Income",
                     date=datetime.combine(income_date, datetime.min.time()),
                     amount=amount,
                     category=category,
-                    description=description
+                    description=description,
+                    allow_duplicate=allow_duplicate,
+                    default=False
                 )
             
             if success:
@@ -102,6 +113,14 @@ def main():
     # INFO SECTION
     # ============================================
     
+    # ============================================
+    # RECURRING RULES
+    # ============================================
+    
+    render_recurring_section(user_id, "Income", CATEGORY_OPTIONS, "Ingresos Recurrentes")
+    
+    st.markdown("---")
+    
     st.markdown("### 💡 Gestión de Ingresos")
     
     col1, col2 = st.columns(2)
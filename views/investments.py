@@ -6,6 +6,7 @@ Implements Logic A (Immediate payment_date)
 import streamlit as st
 from datetime import datetime, date
 from database import save_cash_transaction
+from views.ui import call
 
 def main():
     # Get authenticated user ID from session state
@@ -95,6 +96,12 @@ def main():
                 height=100
             )
         
+        # Genuine repeats (same day, amount and description) need confirmation
+        allow_duplicate = st.checkbox(
+            "🔁 Registrar aunque ya exista uno idéntico",
+            help="Por defecto, un movimiento idéntico a uno ya guardado (doble clic, reenvío) no se guarda dos veces"
+        )
+        
         # Submit button
         submitted = st.form_submit_button(
             "✅ Guardar Operación", 
@@ -110,13 +117,16 @@ def main():
             
             # Save transaction
             with st.spinner("Guardando..."):
-                success = save_cash_transaction(
+                success = call(
+                    save_cash_transaction,
                     user_id=user_id,
                     trans_type=trans_type,
                     date=datetime.combine(investment_date, datetime.min.time()),
                     amount=amount,
                     category=category,
-                    description=description
+                    description=description,
+                    allow_duplicate=allow_duplicate,
+                    default=False
                 )
             
             if success:
@@ -4,7 +4,7 @@ Handles Sign Up and Sign In with Supabase Auth
 """
 
 import streamlit as st
-from database import get_supabase_client
+from views.ui import sign_in, sign_up
 import re
 
 def validate_email(email: str) -> bool:
@@ -70,13 +70,8 @@ def render_login():
                         st.error("⚠️ Email inválido")
                     else:
                         try:
-                            supabase = get_supabase_client()
-                            
-                            # Attempt sign in
-                            response = supabase.auth.sign_in_with_password({
-                                "email": email,
-                                "password": password
-                            })
+                            # Attempt sign in (on this user's own client)
+                            response = sign_in(email, password)
                             
                             if response.user:
                                 # Store user in session state
@@ -150,13 +145,8 @@ def render_login():
                             st.error(f"⚠️ {error_msg}")
                         else:
                             try:
-                                supabase = get_supabase_client()
-                                
                                 # Attempt sign up
-                                response = supabase.auth.sign_up({
-                                    "email": signup_email,
-                                    "password": signup_password
-                                })
+                                response = sign_up(signup_email, signup_password)
                                 
                                 if response.user:
                                     st.success("✅ ¡Cuenta creada exitosamente!")
@@ -0,0 +1,112 @@
+"""
+Recurring Rules Section - shared by Fixed Expenses and Incomes views
+Create/delete monthly rules that are materialized automatically
+"""
+
+import streamlit as st
+from datetime import datetime, date
+from database import get_recurring_rules, create_recurring_rule, delete_recurring_rule
+from recurring import materialize_user
+from views.ui import call
+
+
+def render_recurring_section(user_id: str, trans_type: str, category_options: list, title: str):
+    """
+    Render the list of recurring rules for a type plus a creation form.
+
+    Args:
+        user_id: Authenticated user's ID
+        trans_type: 'Fixed' or 'Income'
+        category_options: Suggested categories (last one must be "Otro")
+        title: Section title
+    """
+    st.markdown(f"### 🔁 {title}")
+    st.caption("Se registran automáticamente cada mes al iniciar sesión, sin cargarlos a mano.")
+
+    # ============================================
+    # EXISTING RULES
+    # ============================================
+
+    rules = call(get_recurring_rules, user_id, trans_type, default=[])
+
+    for rule in rules:
+        col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
+
+        with col1:
+            st.markdown(f"**{rule['category']}**")
+            if rule.get("description"):
+                st.caption(rule["description"])
+
+        with col2:
+            st.markdown(f"${float(rule['amount']):,.2f} · día {rule['day_of_month']}")
+            if float(rule.get("indexation_pct") or 0) > 0:
+                st.caption(f"📈 +{float(rule['indexation_pct']):g}% cada {rule['indexation_every_months']} meses")
+
+        with col3:
+            until = rule["end_date"] or "sin fin"
+            st.caption(f"Desde {rule['start_date']} hasta {until}")
+
+        with col4:
+            if st.button("🗑️", key=f"delete_rule_{rule['id']}", help="Eliminar regla"):
+                if call(delete_recurring_rule, user_id, rule["id"], default=False):
+                    st.rerun()
+
+    # ============================================
+    # NEW RULE FORM
+    # ============================================
+
+    with st.expander("➕ Agregar regla recurrente"):
+        with st.form(f"recurring_rule_form_{trans_type}", clear_on_submit=True):
+            col1, col2 = st.columns(2)
+
+            with col1:
+                amount = st.number_input("💰 Monto", min_value=0.01, value=1000.00, step=100.00, format="%.2f")
+                day_of_month = st.number_input(
+                    "📅 Día del mes", min_value=1, max_value=31, value=1, step=1,
+                    help="Si el mes tiene menos días, se usa el último día del mes"
+                )
+                start_date = st.date_input("Desde", value=date.today().replace(day=1))
+                end_date = st.date_input("Hasta (opcional)", value=None)
+
+            with col2:
+                category = st.selectbox("🏷️ Categoría", options=category_options)
+                custom_category = st.text_input("Especificar categoría (si elegiste Otro)")
+                description = st.text_input("📋 Descripción (opcional)")
+                indexation_pct = st.number_input(
+                    "📈 Indexación (%)", min_value=0.0, value=0.0, step=1.0,
+                    help="Aumento automático del monto cada período de indexación"
+                )
+                indexation_every_months = st.number_input(
+                    "Cada cuántos meses", min_value=1, max_value=24, value=12, step=1
+                )
+
+            submitted = st.form_submit_button("🔁 Guardar Regla", use_container_width=True, type="primary")
+
+            if submitted:
+                if category == "Otro":
+                    category = custom_category.strip()
+
+                if not category:
+                    st.error("⚠️ Por favor selecciona o especifica una categoría")
+                    return
+
+                success = call(
+                    create_recurring_rule,
+                    user_id=user_id,
+                    trans_type=trans_type,
+                    amount=amount,
+                    category=category,
+                    day_of_month=int(day_of_month),
+                    start_date=datetime.combine(start_date, datetime.min.time()),
+                    end_date=datetime.combine(end_date, datetime.min.time()) if end_date else None,
+                    description=description,
+                    indexation_pct=indexation_pct,
+                    indexation_every_months=int(indexation_every_months),
+                    default=False
+                )
+
+                if success:
+                    # Register this month's occurrence right away
+                    created = call(materialize_user, user_id, default=0)
+                    st.success(f"✅ Regla guardada ({created} movimiento(s) registrados hasta fin de mes)")
+                    st.rerun()
@@ -0,0 +1,133 @@
+"""
+Search View - Find transactions by description or category
+Free text plus amount, date and type filters, paginated
+"""
+
+import time
+
+import streamlit as st
+from search import PAGE_SIZE, search_transactions
+from views.ui import call
+
+TYPE_OPTIONS = {
+    "Todos": None,
+    "💵 Ingreso": "Income",
+    "📌 Gasto Fijo": "Fixed",
+    "💸 Débito": "Debit",
+    "💳 Tarjeta": "Card"
+}
+
+PAGE_KEY = "search_page"
+
+def main():
+    # Get authenticated user ID from session state
+    user_id = st.session_state.get('user_id')
+    if not user_id:
+        st.error("⚠️ Error: No user authenticated")
+        return
+
+    st.title("🔎 Buscar Transacciones")
+    st.markdown("---")
+
+    # ============================================
+    # QUERY AND FILTERS
+    # ============================================
+
+    query = st.text_input(
+        "Buscar",
+        placeholder="Ej: mercado libre, supermercado, netflix...",
+        help="Busca en descripción y categoría. Cada palabra debe coincidir con el comienzo de una palabra; no distingue acentos ni mayúsculas."
+    )
+
+    with st.expander("🎛️ Filtros"):
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            type_label = st.selectbox("Tipo", options=list(TYPE_OPTIONS.keys()))
+
+        with col2:
+            min_amount = st.number_input("Monto mínimo", min_value=0.0, value=0.0, step=100.0, format="%.2f")
+
+        with col3:
+            max_amount = st.number_input("Monto máximo (0 = sin límite)", min_value=0.0, value=0.0, step=100.0, format="%.2f")
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            start_date = st.date_input("Desde (fecha de compra)", value=None, format="DD/MM/YYYY")
+
+        with col2:
+            end_date = st.date_input("Hasta (fecha de compra)", value=None, format="DD/MM/YYYY")
+
+    filters = dict(
+        min_amount=min_amount or None,
+        max_amount=max_amount or None,
+        start_date=start_date,
+        end_date=end_date,
+        trans_type=TYPE_OPTIONS[type_label]
+    )
+
+    if not query.strip() and not any(value is not None for value in filters.values()):
+        st.info("Escribe algo para buscar o aplica un filtro.")
+        return
+
+    # Back to the first page whenever the search changes
+    signature = (query, tuple(filters.values()))
+    if st.session_state.get(f"{PAGE_KEY}_signature") != signature:
+        st.session_state[f"{PAGE_KEY}_signature"] = signature
+        st.session_state[PAGE_KEY] = 0
+    page = st.session_state.get(PAGE_KEY, 0)
+
+    # ============================================
+    # RESULTS
+    # ============================================
+
+    start = time.perf_counter()
+    results, total = call(search_transactions, user_id, query, page=page, page_size=PAGE_SIZE, default=([], 0), **filters)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if not total:
+        st.warning("No se encontraron transacciones.")
+        return
+
+    pages = (total + PAGE_SIZE - 1) // PAGE_SIZE
+
+    st.dataframe(
+        [
+            {
+                "Fecha": trans.date.strftime("%d/%m/%Y"),
+                "Pago": trans.payment_date.strftime("%d/%m/%Y"),
+                "Tipo": trans.type,
+                "Categoría": trans.category,
+                "Descripción": trans.description or "",
+                "Tarjeta": trans.card_name or "",
+                "Cuota": f"{trans.installment_number}/{trans.installments_total}" if trans.installments_total > 1 else "",
+                "Monto": trans.amount
+            }
+            for trans in results
+        ],
+        hide_index=True,
+        use_container_width=True,
+        column_config={"Monto": st.column_config.NumberColumn(format="$%.2f")}
+    )
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+
+    with col1:
+        if st.button("⬅️ Anterior", disabled=page == 0, use_container_width=True):
+            st.session_state[PAGE_KEY] = page - 1
+            st.rerun()
+
+    with col2:
+        st.markdown(f"<div style='text-align: center'>Página {page + 1} de {pages}</div>", unsafe_allow_html=True)
+
+    with col3:
+        if st.button("Siguiente ➡️", disabled=page + 1 >= pages, use_container_width=True):
+            st.session_state[PAGE_KEY] = page + 1
+            st.rerun()
+
+    st.markdown("---")
+    st.caption(f"🔎 {total} resultados | {elapsed_ms:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,116 @@ Card closing day updates
 """
 
 import streamlit as st
-from database import get_all_cards, update_card_closing
+from database import (
+    get_all_cards, update_card_closing, reschedule_card_installments, format_month,
+    get_category_budgets, save_category_budget, delete_category_budget
+)
+from columnar_store import LOCAL_MODE_KEY
+from views.ui import call
+
+# Closing days saved since the page last ran in full (card id -> day)
+SAVED_CLOSING_DAYS_KEY = "saved_closing_days"
+
+
+@st.fragment
+def render_card_settings(user_id: str, card):
+    """
+    A card's closing day with its edit form.
+    A fragment: editing, saving or cancelling reruns only this card, not the
+    card list and budget queries of the rest of the page.
+    """
+    closing_day = st.session_state[SAVED_CLOSING_DAYS_KEY].get(card.id, card.closing_day)
+    
+    with st.expander(f"💳 {card.name}", expanded=True):
+        col1, col2, col3 = st.columns([2, 1, 1])
+        
+        with col1:
+            st.markdown(f"**Tarjeta:** {card.name}")
+            st.caption(f"ID: {card.id}")
+        
+        with col2:
+            st.metric("Día de Cierre Actual", closing_day)
+        
+        with col3:
+            # Edit button
+            if st.button(f"✏️ Editar", key=f"edit_{card.id}"):
+                st.session_state[f"editing_{card.id}"] = True
+        
+        # Result of the last reschedule (kept across the rerun that follows saving)
+        reschedule_result = st.session_state.pop(f"reschedule_result_{card.id}", None)
+        if reschedule_result is not None:
+            if reschedule_result["updated"] == 0:
+                st.info("🔁 No había cuotas futuras que cambien de fecha")
+            else:
+                st.success(f"🔁 {reschedule_result['updated']} cuota(s) reprogramada(s)")
+                st.dataframe(
+                    [
+                        {
+                            "Mes": format_month(int(m["month"][:4]), int(m["month"][5:7])),
+                            "Antes": m["before"],
+                            "Después": m["after"]
+                        }
+                        for m in reschedule_result["months"]
+                    ],
+                    hide_index=True,
+                    use_container_width=True,
+                    column_config={
+                        "Antes": st.column_config.NumberColumn(format="$%.2f"),
+                        "Después": st.column_config.NumberColumn(format="$%.2f")
+                    }
+                )
+        
+        # Edit form
+        if st.session_state.get(f"editing_{card.id}", False):
+            st.markdown("---")
+            
+            with st.form(f"update_card_{card.id}"):
+                new_closing_day = st.number_input(
+                    "Nuevo Día de Cierre",
+                    min_value=1,
+                    max_value=31,
+                    value=closing_day,
+                    step=1,
+                    help="Día del mes en que cierra el resumen de la tarjeta"
+                )
+                
+                reschedule = st.checkbox(
+                    "🔁 Reprogramar cuotas futuras con el nuevo cierre",
+                    value=False,
+                    help="Recalcula la fecha de pago de las cuotas que todavía no vencieron. "
+                         "Las cuotas ya vencidas no se modifican."
+                )
+                
+                col_a, col_b = st.columns(2)
+                
+                with col_a:
+                    save_btn = st.form_submit_button("💾 Guardar", type="primary", use_container_width=True)
+                
+                with col_b:
+                    cancel_btn = st.form_submit_button("❌ Cancelar", use_container_width=True)
+                
+                if save_btn:
+                    if new_closing_day != closing_day:
+                        with st.spinner("Actualizando..."):
+                            success = call(update_card_closing, user_id, card.id, new_closing_day, default=False)
+                            
+                            if success and reschedule:
+                                result = call(reschedule_card_installments, user_id, card.id)
+                                if result is not None:
+                                    st.session_state[f"reschedule_result_{card.id}"] = result
+                        
+                        if success:
+                            st.session_state[SAVED_CLOSING_DAYS_KEY][card.id] = new_closing_day
+                            st.session_state[f"editing_{card.id}"] = False
+                            st.rerun(scope="fragment")
+                    else:
+                        st.info("No hay cambios para guardar")
+                        st.session_state[f"editing_{card.id}"] = False
+                
+                if cancel_btn:
+                    st.session_state[f"editing_{card.id}"] = False
+                    st.rerun(scope="fragment")
+
 
 def main():
     # Get authenticated user ID from session state
@@ -16,6 +125,9 @@ def main():
     st.title("⚙️ Configuración")
     st.markdown("---")
     
+    # A full run reloads the cards with their saved closing days
+    st.session_state[SAVED_CLOSING_DAYS_KEY] = {}
+    
     # ============================================
     # CARD SETTINGS
     # ============================================
@@ -28,13 +140,14 @@ def main():
     
     Los cambios en el día de cierre solo afectan a las **nuevas transacciones**.
     
-    Las compras ya registradas mantienen su fecha de pago original (Snapshot Date Logic).
+    Las compras ya registradas mantienen su fecha de pago original (Snapshot Date Logic),
+    salvo que elijas **reprogramar las cuotas futuras** al guardar el nuevo cierre.
     """)
     
     st.markdown("---")
     
     # Load cards
-    cards = get_all_cards(user_id)
+    cards = call(get_all_cards, user_id, default=[])
     
     if not cards:
         st.info("No hay tarjetas configuradas en el sistema.")
@@ -42,59 +155,50 @@ def main():
     
     # Display each card with edit option
     for card in cards:
-        with st.expander(f"💳 {card['name']}", expanded=True):
-            col1, col2, col3 = st.columns([2, 1, 1])
-            
-            with col1:
-                st.markdown(f"**Tarjeta:** {card['name']}")
-                st.caption(f"ID: {card['id']}")
-            
-            with col2:
-                st.metric("Día de Cierre Actual", card['closing_day'])
-            
-            with col3:
-                # Edit button
-                if st.button(f"✏️ Editar", key=f"edit_{card['id']}"):
-                    st.session_state[f"editing_{card['id']}"] = True
-            
-            # Edit form
-            if st.session_state.get(f"editing_{card['id']}", False):
-                st.markdown("---")
-                
-                with st.form(f"update_card_{card['id']}"):
-                    new_closing_day = st.number_input(
-                        "Nuevo Día de Cierre",
-                        min_value=1,
-                        max_value=31,
-                        value=card['closing_day'],
-                        step=1,
-                        help="Día del mes en que cierra el resumen de la tarjeta"
-                    )
-                    
-                    col_a, col_b = st.columns(2)
-                    
-                    with col_a:
-                        save_btn = st.form_submit_button("💾 Guardar", type="primary", use_container_width=True)
-                    
-                    with col_b:
-                        cancel_btn = st.form_submit_button("❌ Cancelar", use_container_width=True)
-                    
-                    if save_btn:
-                        if new_closing_day != card['closing_day']:
-                            with st.spinner("Actualizando..."):
-                                success = update_card_closing(user_id, card['id'], new_closing_day)
-                            
-                            if success:
-                                st.success(f"✅ Día de cierre actualizado a {new_closing_day}")
-                                st.session_state[f"editing_{card['id']}"] = False
-                                st.rerun()
-                        else:
-                            st.info("No hay cambios para guardar")
-                            st.session_state[f"editing_{card['id']}"] = False
-                    
-                    if cancel_btn:
-                        st.session_state[f"editing_{card['id']}"] = False
-                        st.rerun()
+        render_card_settings(user_id, card)
+    
+    st.markdown("---")
+    
+    # ============================================
+    # CATEGORY BUDGETS
+    # ============================================
+    
+    st.markdown("### 🎯 Presupuestos por Categoría")
+    st.caption("Límite mensual de gasto (Fijos, Débito y Tarjetas, por mes de pago). El Dashboard avisa al llegar al % de alerta.")
+    
+    budgets = call(get_category_budgets, user_id, default=[])
+    
+    for budget in budgets:
+        col1, col2, col3 = st.columns([3, 2, 1])
+        
+        with col1:
+            st.markdown(f"**{budget['category']}**")
+        
+        with col2:
+            st.markdown(f"${float(budget['monthly_limit']):,.2f} / mes · alerta al {budget['alert_pct']}%")
+        
+        with col3:
+            if st.button("🗑️", key=f"delete_budget_{budget['category']}", help="Eliminar presupuesto"):
+                if call(delete_category_budget, user_id, budget["category"], default=False):
+                    st.rerun()
+    
+    with st.form("budget_form", clear_on_submit=True):
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            budget_category = st.text_input("🏷️ Categoría", placeholder="ej: Supermercado")
+        
+        with col2:
+            budget_limit = st.number_input("💰 Límite mensual", min_value=1.0, value=10000.0, step=500.0, format="%.2f")
+        
+        with col3:
+            budget_alert = st.slider("🔔 Alerta al (%)", min_value=10, max_value=100, value=80, step=5)
+        
+        if st.form_submit_button("💾 Guardar Presupuesto", use_container_width=True):
+            if not budget_category.strip():
+                st.error("⚠️ Por favor ingresa una categoría")
+            elif call(save_category_budget, user_id, budget_category.strip(), budget_limit, budget_alert, default=False):
+                st.rerun()
     
     st.markdown("---")
     
@@ -146,18 +250,32 @@ def main():
         2. Registras tus compras → El sistema calcula la fecha de pago
         3. Si cambias el día de cierre más adelante, solo afecta a compras NUEVAS
         
-        **¿Qué hacer si me equivoqué?**
-        
-        Si necesitas corregir compras ya registradas, por ahora deberás:
-        1. Eliminarlas manualmente desde la base de datos
-        2. Configurar el día de cierre correcto
-        3. Volver a registrarlas
+        **¿Qué hacer si me equivoqué o el banco cambió el cierre?**
         
-        (Funcionalidad de edición vendrá en futuras versiones)
+        Al editar el día de cierre, marca **"Reprogramar cuotas futuras"**: todas las cuotas
+        que todavía no vencieron se recalculan con el nuevo cierre en una sola operación,
+        y verás cómo cambia el total de cada mes afectado.
         """)
     
     st.markdown("---")
     
+    # ============================================
+    # PERFORMANCE SETTINGS
+    # ============================================
+    
+    st.markdown("### ⚡ Rendimiento")
+    
+    # Stored under a plain session key (not the widget key) so the choice
+    # survives navigating to pages where this toggle is not rendered
+    st.session_state[LOCAL_MODE_KEY] = st.toggle(
+        "Modo local: cargar todo el historial en memoria",
+        value=st.session_state.get(LOCAL_MODE_KEY, False),
+        help="Descarga tus transacciones una sola vez por sesión. "
+             "Cambiar de mes en el Dashboard y en Ver/Eliminar se vuelve instantáneo."
+    )
+    
+    st.markdown("---")
+    
     # Database info
     with st.expander("🗄️ Información de Base de Datos"):
         st.markdown(f"""
@@ -0,0 +1,129 @@
+"""
+Card Statements View - Per-card statement cycles
+Shows what is on each card's statement, cycle by cycle
+"""
+
+import streamlit as st
+from datetime import date
+from dateutil.relativedelta import relativedelta
+from database import get_all_cards, format_month
+from statements import get_card_statements
+from views.ui import call
+
+# Cycles shown in the selector: past months and upcoming months
+PAST_CYCLES = 11
+FUTURE_CYCLES = 6
+
+def main():
+    # Get authenticated user ID from session state
+    user_id = st.session_state.get('user_id')
+    if not user_id:
+        st.error("⚠️ Error: No user authenticated")
+        return
+    
+    st.title("🧾 Resúmenes de Tarjeta")
+    st.markdown("---")
+    
+    # ============================================
+    # CARD SELECTION
+    # ============================================
+    
+    cards = call(get_all_cards, user_id, default=[])
+    
+    if not cards:
+        st.info("No hay tarjetas configuradas. Ve a Mis Tarjetas para agregar una.")
+        return
+    
+    card_options = {f"{card.name} (Cierre: día {card.closing_day})": card for card in cards}
+    selected_card = card_options[st.selectbox("💳 Tarjeta", options=list(card_options.keys()))]
+    
+    # ============================================
+    # LOAD CYCLES (one range query for all of them)
+    # ============================================
+    
+    today = date.today()
+    statements = call(
+        get_card_statements,
+        user_id,
+        selected_card,
+        today - relativedelta(months=PAST_CYCLES),
+        today + relativedelta(months=FUTURE_CYCLES),
+        default=[]
+    )
+    if not statements:
+        return
+    
+    # Most recent first, defaulting to the first cycle not yet closed
+    statements = list(reversed(statements))
+    labels = [
+        f"Cierre {format_month(s['closing_date'].year, s['closing_date'].month)}"
+        f" ({s['closing_date'].strftime('%d/%m')}){'' if s['closed'] else ' · abierto'}"
+        for s in statements
+    ]
+    open_cycles = [i for i, s in enumerate(statements) if not s["closed"]]
+    default_index = open_cycles[-1] if open_cycles else 0
+    
+    selected_label = st.selectbox("📅 Resumen", options=labels, index=default_index)
+    statement = statements[labels.index(selected_label)]
+    
+    st.markdown("---")
+    
+    # ============================================
+    # STATEMENT DETAIL
+    # ============================================
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("💰 Total del Resumen", f"${statement['total']:,.2f}")
+    
+    with col2:
+        st.metric("📅 Cierre", statement['closing_date'].strftime('%d/%m/%Y'))
+    
+    with col3:
+        st.metric("💳 Vencimiento", statement['due_date'].strftime('%d/%m/%Y'))
+    
+    st.caption(
+        f"Compras del {statement['period_start'].strftime('%d/%m/%Y')} "
+        f"al {statement['closing_date'].strftime('%d/%m/%Y')} más cuotas de compras anteriores"
+    )
+    
+    if not statement["items"]:
+        st.info("No hay movimientos en este resumen.")
+    else:
+        st.dataframe(
+            [
+                {
+                    "Fecha": item.date,
+                    "Categoría": item.category,
+                    "Descripción": item.description,
+                    "Cuota": f"{item.installment_number}/{item.installments_total}",
+                    "Monto": item.amount
+                }
+                for item in statement["items"]
+            ],
+            hide_index=True,
+            use_container_width=True,
+            column_config={"Monto": st.column_config.NumberColumn(format="$%.2f")}
+        )
+    
+    st.markdown("---")
+    
+    # ============================================
+    # CYCLE HISTORY
+    # ============================================
+    
+    st.markdown("### 📈 Evolución de Resúmenes")
+    
+    st.bar_chart(
+        {
+            "Cierre": [s["closing_date"].strftime("%Y-%m") for s in reversed(statements)],
+            "Total": [s["total"] for s in reversed(statements)]
+        },
+        x="Cierre",
+        y="Total",
+        color="#4F46E5"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,185 @@ Transaction Management View - View and Delete Transactions
 
 import streamlit as st
 from datetime import datetime
-from database import get_available_months, get_monthly_transactions, delete_transaction
+import transaction_editor
+from database import EDITABLE_COLUMNS, delete_transaction, delete_transactions, get_data_version, update_transactions
+from columnar_store import get_available_months, get_monthly_transactions, prefetch_adjacent_months
+from views.ui import call
+
+# Type icons and colors
+TYPE_CONFIG = {
+    "Income": {"icon": "💵", "color": "green", "label": "Ingreso"},
+    "Fixed": {"icon": "📌", "color": "orange", "label": "Gasto Fijo"},
+    "Debit": {"icon": "💸", "color": "red", "label": "Débito"},
+    "Card": {"icon": "💳", "color": "blue", "label": "Tarjeta"}
+}
+
+# IDs deleted since the page last ran in full (their rows rerun on their own)
+DELETED_KEY = "deleted_transactions"
+
+
+@st.fragment
+def render_transaction_row(user_id: str, trans):
+    """
+    One transaction with its delete/confirm/cancel buttons.
+    A fragment: clicking them reruns only this row, not the month list and
+    the data fetch above it. Totals catch up on the next full run.
+    """
+    if trans.id in st.session_state[DELETED_KEY]:
+        st.caption(f"🗑️ Transacción eliminada: {trans.category} - ${trans.amount:,.2f} ({trans.date})")
+        return
+    
+    trans_type = trans.type
+    config = TYPE_CONFIG.get(trans_type, {"icon": "❓", "color": "gray", "label": trans_type})
+    
+    # Rows still in the local write queue are flagged as pending
+    pending_mark = "⏳ " if trans.pending else ""
+    
+    # Create expander for each transaction
+    with st.expander(
+        f"{pending_mark}{config['icon']} {trans.category} - ${trans.amount:,.2f} ({trans.date})",
+        expanded=False
+    ):
+        # Transaction details
+        col1, col2, col3 = st.columns([2, 2, 1])
+        
+        with col1:
+            st.markdown(f"**Tipo:** {config['label']}")
+            st.markdown(f"**Categoría:** {trans.category}")
+            st.markdown(f"**Monto:** ${trans.amount:,.2f}")
+        
+        with col2:
+            st.markdown(f"**Fecha Transacción:** {trans.date}")
+            st.markdown(f"**Fecha Pago:** {trans.payment_date}")
+            
+            # Show card info if it's a card transaction
+            if trans_type == "Card" and trans.card_name:
+                st.markdown(f"**Tarjeta:** {trans.card_name}")
+            
+            # Show installment info
+            if trans.installments_total > 1:
+                st.markdown(
+                    f"**Cuota:** {trans.installment_number}/{trans.installments_total}"
+                )
+        
+        with col3:
+            st.markdown(f"**ID:** {trans.id}")
+            st.caption(f"Creado: {(trans.created_at or '')[:10]}")
+        
+        # Description
+        if trans.description:
+            st.markdown(f"**📝 Descripción:** {trans.description}")
+        
+        st.markdown("---")
+        
+        # Pending rows have no database ID yet, so they can't be deleted
+        if trans.pending:
+            st.info("⏳ Pendiente de sincronizar. Podrás eliminarla cuando se guarde en la base de datos.")
+            return
+        
+        # Delete button
+        col_a, col_b, col_c = st.columns([1, 1, 2])
+        
+        with col_a:
+            if st.button(
+                "🗑️ Eliminar",
+                key=f"delete_{trans.id}",
+                type="primary",
+                use_container_width=True
+            ):
+                # Store the ID to delete in session state (the confirmation renders below)
+                st.session_state[f"confirm_delete_{trans.id}"] = True
+        
+        # Confirmation step
+        if st.session_state.get(f"confirm_delete_{trans.id}", False):
+            with col_b:
+                if st.button(
+                    "✅ Confirmar",
+                    key=f"confirm_{trans.id}",
+                    type="secondary",
+                    use_container_width=True
+                ):
+                    # Perform the deletion
+                    success = call(delete_transaction, user_id, trans.id, default=False)
+                    
+                    if success:
+                        # Clear confirmation state and collapse this row only
+                        st.session_state[f"confirm_delete_{trans.id}"] = False
+                        st.session_state[DELETED_KEY].add(trans.id)
+                        st.rerun(scope="fragment")
+            
+            with col_c:
+                if st.button(
+                    "❌ Cancelar",
+                    key=f"cancel_{trans.id}",
+                    use_container_width=True
+                ):
+                    # Clear confirmation state
+                    st.session_state[f"confirm_delete_{trans.id}"] = False
+                    st.rerun(scope="fragment")
+            
+            st.warning("⚠️ ¿Estás seguro? Esta acción no se puede deshacer.")
+
+
+@st.fragment
+def render_transaction_editor(user_id: str, transactions, grid_key: str):
+    """
+    The month as an editable grid (amount, category, description; rows can be deleted).
+    A fragment: cell edits rerun only the grid. Saving sends every change at
+    once, as one batched update and one batched delete.
+    """
+    original = transaction_editor.to_frame(transactions)
+    if original.empty:
+        st.info("No hay transacciones guardadas para editar en este período.")
+        return
+    
+    pending = len(transactions) - len(original)
+    if pending:
+        st.caption(f"⏳ {pending} transacción(es) pendiente(s) de sincronizar no se muestran.")
+    
+    edited = st.data_editor(
+        original,
+        key=grid_key,
+        num_rows="dynamic",
+        disabled=[column for column in transaction_editor.GRID_COLUMNS if column not in EDITABLE_COLUMNS],
+        use_container_width=True,
+        column_config={
+            "date": st.column_config.DateColumn("Fecha"),
+            "payment_date": st.column_config.DateColumn("Fecha Pago"),
+            "type": "Tipo",
+            "card_name": "Tarjeta",
+            "installment": "Cuota",
+            "amount": st.column_config.NumberColumn("Monto", format="$%.2f", min_value=0.01, required=True),
+            "category": st.column_config.TextColumn("Categoría", required=True),
+            "description": "Descripción"
+        }
+    )
+    
+    changes = transaction_editor.diff(original, edited)
+    st.caption(
+        f"✏️ {len(changes.updates)} modificada(s) · 🗑️ {len(changes.deleted_ids)} eliminada(s). "
+        "Para cambiar fecha o tipo, eliminá la transacción y cargala de nuevo."
+    )
+    
+    for transaction_id, message in changes.errors.items():
+        st.error(f"⚠️ ID {transaction_id}: {message}")
+    
+    if st.button(
+        "💾 Guardar cambios",
+        key=f"save_{grid_key}",
+        type="primary",
+        disabled=changes.empty or not changes.errors.empty,
+        use_container_width=True
+    ):
+        # Stop at the first failure: call() already showed its error
+        if call(update_transactions, user_id, changes.update_records()) is None:
+            return
+        if call(delete_transactions, user_id, changes.deleted_ids) is None:
+            return
+        
+        # Full rerun: the month's rows, totals and month list changed
+        st.rerun()
+
 
 def main():
     # Get authenticated user ID from session state
@@ -16,11 +194,14 @@ def main():
     st.title("🗂️ Gestión de Transacciones")
     st.markdown("---")
     
+    # A full run refetches the month, so earlier deletions are already gone
+    st.session_state[DELETED_KEY] = set()
+    
     # ============================================
     # MONTH FILTER
     # ============================================
     
-    available_months = get_available_months(user_id)
+    available_months = call(get_available_months, user_id, default=[])
     
     if not available_months:
         st.info("👋 No hay transacciones registradas aún.")
@@ -61,9 +242,12 @@ def main():
     
     # Get transactions
     if filter_type == "Todas":
-        transactions = get_monthly_transactions(user_id, selected_year, selected_month)
+        transactions = call(get_monthly_transactions, user_id, selected_year, selected_month, default=[])
     else:
-        transactions = get_monthly_transactions(user_id, selected_year, selected_month, filter_type)
+        transactions = call(get_monthly_transactions, user_id, selected_year, selected_month, filter_type, default=[])
+    
+    # Warm the previous/next month while this one renders
+    prefetch_adjacent_months(user_id, selected_year, selected_month, available_months)
     
     if not transactions:
         st.info("No hay transacciones para este período con los filtros seleccionados.")
@@ -75,99 +259,20 @@ def main():
     
     st.caption(f"Mostrando {len(transactions)} transacciones")
     
-    # Type icons and colors
-    type_config = {
-        "Income": {"icon": "💵", "color": "green", "label": "Ingreso"},
-        "Fixed": {"icon": "📌", "color": "orange", "label": "Gasto Fijo"},
-        "Debit": {"icon": "💸", "color": "red", "label": "Débito"},
-        "Card": {"icon": "💳", "color": "blue", "label": "Tarjeta"}
-    }
-    
-    for trans in transactions:
-        trans_type = trans["type"]
-        config = type_config.get(trans_type, {"icon": "❓", "color": "gray", "label": trans_type})
-        
-        # Create expander for each transaction
-        with st.expander(
-            f"{config['icon']} {trans['category']} - ${trans['amount']:,.2f} ({trans['date']})",
-            expanded=False
-        ):
-            # Transaction details
-            col1, col2, col3 = st.columns([2, 2, 1])
-            
-            with col1:
-                st.markdown(f"**Tipo:** {config['label']}")
-                st.markdown(f"**Categoría:** {trans['category']}")
-                st.markdown(f"**Monto:** ${trans['amount']:,.2f}")
-            
-            with col2:
-                st.markdown(f"**Fecha Transacción:** {trans['date']}")
-                st.markdown(f"**Fecha Pago:** {trans['payment_date']}")
-                
-                # Show card info if it's a card transaction
-                if trans_type == "Card" and trans.get("credit_cards"):
-                    card_name = trans["credit_cards"]["name"]
-                    st.markdown(f"**Tarjeta:** {card_name}")
-                
-                # Show installment info
-                if trans.get("installments_total", 1) > 1:
-                    st.markdown(
-                        f"**Cuota:** {trans['installment_number']}/{trans['installments_total']}"
-                    )
-            
-            with col3:
-                st.markdown(f"**ID:** {trans['id']}")
-                st.caption(f"Creado: {trans['created_at'][:10]}")
-            
-            # Description
-            if trans.get("description"):
-                st.markdown(f"**📝 Descripción:** {trans['description']}")
-            
-            st.markdown("---")
-            
-            # Delete button
-            col_a, col_b, col_c = st.columns([1, 1, 2])
-            
-            with col_a:
-                if st.button(
-                    "🗑️ Eliminar",
-                    key=f"delete_{trans['id']}",
-                    type="primary",
-                    use_container_width=True
-                ):
-                    # Store the ID to delete in session state
-                    st.session_state[f"confirm_delete_{trans['id']}"] = True
-                    st.rerun()
-            
-            # Confirmation step
-            if st.session_state.get(f"confirm_delete_{trans['id']}", False):
-                with col_b:
-                    if st.button(
-                        "✅ Confirmar",
-                        key=f"confirm_{trans['id']}",
-                        type="secondary",
-                        use_container_width=True
-                    ):
-                        # Perform the deletion
-                        success = delete_transaction(user_id, trans['id'])
-                        
-                        if success:
-                            # Clear confirmation state
-                            st.session_state[f"confirm_delete_{trans['id']}"] = False
-                            # Rerun to refresh the list
-                            st.rerun()
-                
-                with col_c:
-                    if st.button(
-                        "❌ Cancelar",
-                        key=f"cancel_{trans['id']}",
-                        use_container_width=True
-                    ):
-                        # Clear confirmation state
-                        st.session_state[f"confirm_delete_{trans['id']}"] = False
-                        st.rerun()
-                
-                st.warning("⚠️ ¿Estás seguro? Esta acción no se puede deshacer.")
+    edit_mode = st.toggle(
+        "✏️ Editar en tabla",
+        key="transactions_edit_mode",
+        help="Corregí montos, categorías y descripciones (o eliminá filas) y guardá todo junto"
+    )
+    
+    if edit_mode:
+        # Keyed by data version: a save (or any write to the month) starts a clean grid
+        version = get_data_version(user_id, selected_year, selected_month)
+        grid_key = f"transaction_grid_{selected_year}_{selected_month}_{filter_type}_{version}"
+        render_transaction_editor(user_id, transactions, grid_key)
+    else:
+        for trans in transactions:
+            render_transaction_row(user_id, trans)
     
     st.markdown("---")
     
@@ -177,8 +282,8 @@ def main():
     
     st.markdown("### 📊 Resumen del Período")
     
-    total_income = sum(t['amount'] for t in transactions if t['type'] == 'Income')
-    total_expenses = sum(t['amount'] for t in transactions if t['type'] in ['Fixed', 'Debit', 'Card'])
+    total_income = sum(t.amount for t in transactions if t.type == 'Income')
+    total_expenses = sum(t.amount for t in transactions if t.type in ['Fixed', 'Debit', 'Card'])
     
     col1, col2, col3 = st.columns(3)
     
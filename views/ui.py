@@ -0,0 +1,85 @@
+"""
+Streamlit Adapter for the Data Layer
+Configures database.py from the app's secrets, keeps the signed-in user's
+session in st.session_state, and renders data layer errors on the page
+
+database.py is imported on first use, not with this module, so the login
+page does not load the data layer until the user submits the form.
+"""
+
+import streamlit as st
+
+from errors import ConflictError, DataError, DuplicateError, NotFoundError
+
+# Session state key holding the signed-in user's database.UserSession
+SESSION_KEY = "user_session"
+
+
+def _session_from_state():
+    return st.session_state.get(SESSION_KEY)
+
+
+def _data_layer():
+    """database.py, configured for this server and bound to the session state"""
+    import database
+    from database import Settings
+    
+    if not database.is_configured():
+        try:
+            secrets = st.secrets["supabase"]
+            url, key = secrets["url"], secrets["key"]
+        except Exception:
+            # No secrets.toml (or no [supabase] table): environment only
+            url = key = None
+        database.configure(Settings.from_env(url, key))
+
+    database.set_session_provider(_session_from_state)
+    return database
+
+
+def setup() -> None:
+    """Configure the data layer for this server (first run) and bind it to the session state"""
+    _data_layer()
+
+# ============================================
+# ERROR RENDERING
+# ============================================
+
+def report(error: DataError) -> None:
+    """Show a data layer error: expected outcomes as warnings, failures as errors"""
+    if isinstance(error, (NotFoundError, DuplicateError, ConflictError)):
+        st.warning(f"⚠️ {error}")
+    else:
+        st.error(str(error))
+
+
+def call(func, *args, default=None, **kwargs):
+    """Run a data layer call; on error, render it and return default"""
+    try:
+        return func(*args, **kwargs)
+    except DataError as e:
+        report(e)
+        return default
+
+# ============================================
+# AUTH
+# ============================================
+
+def sign_in(email: str, password: str):
+    """Sign in and keep the user's session. Returns: gotrue AuthResponse"""
+    response, session = _data_layer().sign_in(email, password)
+    st.session_state[SESSION_KEY] = session
+    return response
+
+
+def sign_up(email: str, password: str):
+    """Register; signs in right away when Supabase returns a session. Returns: gotrue AuthResponse"""
+    response, session = _data_layer().sign_up(email, password)
+    if session:
+        st.session_state[SESSION_KEY] = session
+    return response
+
+
+def sign_out(user_id: str) -> None:
+    st.session_state.pop(SESSION_KEY, None)
+    _data_layer().sign_out(user_id)
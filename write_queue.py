@@ -0,0 +1,270 @@
+"""
+FINANZAS PRO - Local Write-Ahead Queue
+Durable SQLite queue for transaction inserts with background batch flush
+
+Form submits write here and return immediately; a daemon worker pushes the
+queued rows to Supabase in batches, retrying with exponential backoff.
+Rows stay in the queue file until the backend accepts them, so a failed
+call or a server restart never loses a save.
+
+The backend call runs without the queue lock: the batch is marked in flight
+under the lock, sent, then deleted (or rescheduled) under the lock. A batch
+is sent one user at a time and each user's rows are deleted as soon as the
+backend accepts them, so a failure partway never sends written rows again
+(rows without a content_hash have nothing to dedupe them). Readers
+and producers only ever wait for local SQLite work, never for the network.
+A row stays visible to readers until its delete, so between the backend
+accepting it and that delete a read can briefly see it twice; it is never
+missing.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_writes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    payment_date TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    card_name TEXT,
+    enqueued_at TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pending_writes_user_date
+    ON pending_writes (user_id, payment_date);
+"""
+
+
+class WriteQueue:
+    """
+    Append-only queue of transaction rows waiting to be inserted.
+
+    Args:
+        path: SQLite file holding the queue (created if missing)
+        flush_fn: Callable that inserts a list of one user's rows in one backend call
+        batch_size: Maximum rows sent per flush
+        flush_interval: Seconds the worker sleeps when the queue is idle
+        max_backoff: Upper bound (seconds) for the retry delay of a failing row
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_fn: Callable[[List[Dict]], None],
+        batch_size: int = 200,
+        flush_interval: float = 2.0,
+        max_backoff: float = 300.0
+    ):
+        self.path = path
+        self.flush_fn = flush_fn
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+
+        # A failing batch is split in halves on every retry so a single bad
+        # row ends up isolated instead of blocking the rows queued behind it
+        self._current_batch_size = batch_size
+
+        self._lock = threading.Lock()
+        # Queue ids of the batch being sent (not picked again until it settles)
+        self._in_flight: set = set()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(SCHEMA)
+
+    # ============================================
+    # PRODUCER SIDE
+    # ============================================
+
+    def enqueue(self, rows: List[Dict], card_name: Optional[str] = None) -> int:
+        """
+        Durably append rows (all-or-nothing) and wake the worker.
+        Returns: Number of rows queued
+        """
+        now = datetime.now().isoformat(timespec="seconds")
+        records = [
+            (row["user_id"], row["payment_date"], json.dumps(row), card_name, now)
+            for row in rows
+        ]
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO pending_writes (user_id, payment_date, payload, card_name, enqueued_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    records
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        self._wakeup.set()
+        return len(records)
+
+    # ============================================
+    # READ SIDE (merged into dashboard queries)
+    # ============================================
+
+    def pending_rows(
+        self,
+        user_id: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Get queued rows for a user, optionally within [start_date, end_date).
+        Rows are shaped like `transactions` query results and flagged with
+        pending=True; their id is a "pending-<n>" placeholder.
+        """
+        query = "SELECT id, payload, card_name, enqueued_at FROM pending_writes WHERE user_id = ?"
+        params: list = [user_id]
+
+        if start_date:
+            query += " AND payment_date >= ?"
+            params.append(start_date)
+        if end_date:
+            query += " AND payment_date < ?"
+            params.append(end_date)
+
+        with self._lock:
+            records = self._conn.execute(query + " ORDER BY id", params).fetchall()
+
+        rows = []
+        for queue_id, payload, card_name, enqueued_at in records:
+            row = json.loads(payload)
+            row["id"] = f"pending-{queue_id}"
+            row["created_at"] = enqueued_at
+            row["credit_cards"] = {"name": card_name} if card_name else None
+            row["pending"] = True
+            rows.append(row)
+
+        return rows
+
+    def status(self, user_id: str) -> Tuple[int, int, Optional[str]]:
+        """
+        Get sync status for a user.
+        Returns: (pending_rows, failing_rows, last_error)
+        """
+        with self._lock:
+            pending, failing = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(attempts > 0), 0) FROM pending_writes WHERE user_id = ?",
+                (user_id,)
+            ).fetchone()
+            last_error = self._conn.execute(
+                "SELECT last_error FROM pending_writes WHERE user_id = ? AND last_error IS NOT NULL "
+                "ORDER BY id DESC LIMIT 1",
+                (user_id,)
+            ).fetchone()
+
+        return pending, failing, last_error[0] if last_error else None
+
+    # ============================================
+    # CONSUMER SIDE (background worker)
+    # ============================================
+
+    def flush_once(self) -> int:
+        """
+        Send one batch of due rows to the backend, one flush_fn call per user.
+        Returns: Number of rows flushed (0 if nothing was due or the batch failed)
+        """
+        with self._lock:
+            exclude = ", ".join("?" * len(self._in_flight))
+            records = self._conn.execute(
+                "SELECT id, payload, attempts FROM pending_writes "
+                f"WHERE next_attempt_at <= ? AND id NOT IN ({exclude}) ORDER BY id LIMIT ?",
+                (time.time(), *self._in_flight, self._current_batch_size)
+            ).fetchall()
+
+            if not records:
+                return 0
+
+            ids = [record[0] for record in records]
+            self._in_flight.update(ids)
+
+        by_user: Dict[str, List[tuple]] = {}
+        for record in records:
+            row = json.loads(record[1])
+            by_user.setdefault(row["user_id"], []).append((record, row))
+
+        flushed = 0
+        try:
+            for user_records in by_user.values():
+                user_ids = [record[0] for record, _ in user_records]
+
+                # Network call without the lock: reads and enqueues go on meanwhile
+                try:
+                    self.flush_fn([row for _, row in user_records])
+                except Exception as e:
+                    # Users already written stay deleted; the rest are picked up again
+                    with self._lock:
+                        self._record_failure([record for record, _ in user_records], e)
+                    return flushed
+
+                with self._lock:
+                    self._conn.executemany("DELETE FROM pending_writes WHERE id = ?", [(i,) for i in user_ids])
+                    self._in_flight.difference_update(user_ids)
+                flushed += len(user_ids)
+        finally:
+            with self._lock:
+                self._in_flight.difference_update(ids)
+
+        with self._lock:
+            self._current_batch_size = self.batch_size
+        return flushed
+
+    def _record_failure(self, records: List[tuple], error: Exception) -> None:
+        """Schedule a retry with exponential backoff and shrink the next batch (lock held)"""
+        now = time.time()
+        updates = []
+        for queue_id, _, attempts in records:
+            delay = min(self.max_backoff, 2 ** attempts)
+            updates.append((now + delay, str(error)[:500], queue_id))
+
+        self._conn.executemany(
+            "UPDATE pending_writes SET attempts = attempts + 1, next_attempt_at = ?, last_error = ? "
+            "WHERE id = ?",
+            updates
+        )
+        self._current_batch_size = max(1, len(records) // 2)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                # Drain everything that is due, one batch per backend call
+                while self.flush_once():
+                    pass
+            except Exception:
+                pass  # Never let the worker die; rows stay queued
+
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        """Start the background flush worker (idempotent)"""
+        if self._worker and self._worker.is_alive():
+            return
+
+        self._stopped.clear()
+        self._worker = threading.Thread(target=self._run, name="write-queue-flush", daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the worker after its current batch"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._worker:
+            self._worker.join(timeout)